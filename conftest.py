@@ -0,0 +1 @@
+# Makes the repository root importable (as ``src``) when running ``pytest`` from it.
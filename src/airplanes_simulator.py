@@ -44,8 +44,9 @@ class AirplanesSimulator:
 
         for ev in self.current_state.airplanes.values():
             intermediate_time = deepcopy(prev_time)
+            n_reached_waypoints = 0
 
-            for i, waypoint in enumerate(ev.waypoints):
+            for waypoint in ev.waypoints:
                 ev.set_heading(to_waypoint=waypoint)
 
                 if waypoint.TIME_INTO_SIMULATION > intermediate_time:
@@ -73,7 +74,7 @@ class AirplanesSimulator:
                         elif "_on_airliner_undocking_point" in tag:
                             self.current_state.airplanes["Airliner"].docked_uav = None
                     # 'Clear' the waypoint:
-                    ev.waypoints[i] = None  # Marked to be removed from waypoints.
+                    n_reached_waypoints += 1
                 else:
                     # Otherwise, set the EV's new location to be an en route location between its
                     #     old location and the waypoint's location based on how far it can travel
@@ -89,8 +90,9 @@ class AirplanesSimulator:
                     break
                 intermediate_time = waypoint_direct_arrival_time
 
-            # Clean up by removing waypoints that were marked for removal:
-            ev.waypoints = [wp for wp in ev.waypoints if wp is not None]
+            # Clean up by removing the reached waypoints, which are always at the front, in place
+            #     (rather than rebuilding the whole list every time step):
+            del ev.waypoints[:n_reached_waypoints]
 
     def _update_evs_refueling(self, prev_time: dt.timedelta) -> None:
         """Update the SoCs of EVs that are charging (at a charge point's connector at a charging
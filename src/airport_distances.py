@@ -0,0 +1,121 @@
+"""All-pairs direct distances between the airports in the airport table, for O(1) lookup of the
+distance between any two airports by their codes.
+
+The distance matrix is computed block of rows by block of rows (so that memory use is bounded for
+large airport tables) and cached as a ``.npy`` file, which later lookups memory-map rather than
+load.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import hashlib
+import os
+
+import numpy as np
+
+from src.airport_table import CACHE_DIR, KM_PER_LAT_LON, AirportCode, get_airport_table
+from src.utils.geodesy import haversine_distance_km
+
+
+@dataclasses.dataclass
+class AirportDistanceMatrix:
+    """Direct distances between airports, either along great circles (``true_lat_lon``) or between
+    (lat, lon) coordinates treated as cartesian coordinates (as in ``Location``).
+    """
+
+    airport_codes: list[AirportCode]
+    distances_km: np.ndarray
+    true_lat_lon: bool
+    airport_idxs: dict[AirportCode, int] = dataclasses.field(init=False)
+
+    def __post_init__(self):
+        self.airport_idxs = {code: i for i, code in enumerate(self.airport_codes)}
+
+    def __getitem__(self, airport_codes: tuple[AirportCode, AirportCode]) -> float:
+        a, b = airport_codes
+        return float(self.distances_km[self.airport_idxs[a], self.airport_idxs[b]])
+
+    def distances_km_from(self, airport_code: AirportCode) -> np.ndarray:
+        """Get the distances from an airport to all airports, in the order of
+        ``airport_codes``.
+        """
+
+        return self.distances_km[self.airport_idxs[airport_code]]
+
+    @classmethod
+    def compute(
+        cls,
+        airport_codes: list[AirportCode],
+        lat: np.ndarray,
+        lon: np.ndarray,
+        true_lat_lon: bool,
+        cache_dir: str | None = CACHE_DIR,
+        block_size: int = 1024,
+    ) -> AirportDistanceMatrix:
+        """Compute the distance matrix for airports at the given (lat, lon) coordinates (in
+        degrees), or memory-map it from ``cache_dir`` if it has already been computed for the same
+        airports.
+        """
+
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        n_airports = len(airport_codes)
+
+        if cache_dir is not None:
+            key = hashlib.sha1()
+            key.update("\n".join(airport_codes).encode())
+            key.update(lat.tobytes())
+            key.update(lon.tobytes())
+            mode = "geodesic" if true_lat_lon else "planar"
+            cache_path = os.path.join(
+                cache_dir, f"airport_distances_{mode}_{key.hexdigest()[:16]}.npy"
+            )
+            if os.path.exists(cache_path):
+                return cls(
+                    airport_codes, np.load(cache_path, mmap_mode="r"), true_lat_lon
+                )
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first such that an interrupted computation does not leave
+            #     behind a partial cache file:
+            tmp_cache_path = f"{cache_path}.{os.getpid()}.tmp"
+            distances_km = np.lib.format.open_memmap(
+                tmp_cache_path, mode="w+", dtype=float, shape=(n_airports, n_airports)
+            )
+        else:
+            distances_km = np.empty((n_airports, n_airports))
+
+        for start in range(0, n_airports, block_size):
+            rows = slice(start, start + block_size)
+            if true_lat_lon:
+                distances_km[rows] = haversine_distance_km(
+                    lat[rows, np.newaxis], lon[rows, np.newaxis], lat, lon
+                )
+            else:
+                distances_km[rows] = KM_PER_LAT_LON * np.hypot(
+                    lat - lat[rows, np.newaxis], lon - lon[rows, np.newaxis]
+                )
+
+        if cache_dir is not None:
+            distances_km.flush()
+            del distances_km
+            os.replace(tmp_cache_path, cache_path)
+            distances_km = np.load(cache_path, mmap_mode="r")
+
+        return cls(airport_codes, distances_km, true_lat_lon)
+
+
+@functools.cache
+def get_airport_distance_matrix(true_lat_lon: bool = True) -> AirportDistanceMatrix:
+    """Get the distance matrix for all airports in the airport table (great-circle distances by
+    default).
+    """
+
+    airport_table = get_airport_table()
+    return AirportDistanceMatrix.compute(
+        airport_codes=airport_table.codes.tolist(),
+        lat=airport_table.lat,
+        lon=airport_table.lon,
+        true_lat_lon=true_lat_lon,
+    )
@@ -0,0 +1,226 @@
+"""A spatial index (k-d tree) over the airport table, for finding airports within range of a point or
+within some distance of a flight leg without scanning every airport.
+
+In geodesic mode (``true_lat_lon``), airports are indexed as points on the surface of a spherical
+Earth in 3D, where straight-line (chord) distances increase monotonically with great-circle
+distances, such that range queries are exact. Otherwise, airports are indexed by their (lat, lon)
+coordinates treated as cartesian coordinates (as in ``Location``).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import KDTree
+
+from src.airport_table import (
+    KM_PER_LAT_LON,
+    AirportCode,
+    AirportTable,
+    get_airport_table,
+)
+from src.utils.geodesy import EARTH_RADIUS_KM, great_circle_interpolate, unit_vectors
+
+MAX_N_SEGMENT_QUERY_POINTS = 256
+
+LatLon = tuple[float, float]
+
+
+@dataclasses.dataclass
+class AirportSpatialIndex:
+    airport_table: AirportTable
+    true_lat_lon: bool
+    points_km: np.ndarray = dataclasses.field(init=False)
+    tree: KDTree = dataclasses.field(init=False)
+
+    def __post_init__(self):
+        self.points_km = self._to_points_km(
+            self.airport_table.lat, self.airport_table.lon
+        )
+        self.tree = KDTree(self.points_km)
+
+    def _to_points_km(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        if self.true_lat_lon:
+            return EARTH_RADIUS_KM * unit_vectors(lat, lon)
+        else:
+            return KM_PER_LAT_LON * np.stack([lat, lon], axis=-1)
+
+    def _to_point_km(self, location: AirportCode | LatLon) -> np.ndarray:
+        if isinstance(location, AirportCode):
+            return self.points_km[self.airport_table.idxs[location]]
+        else:
+            lat, lon = location
+            return self._to_points_km(np.asarray(lat), np.asarray(lon))
+
+    def _query_radius(self, distance_km: float) -> float:
+        """Convert a (great-circle) distance into the radius to query the tree with."""
+
+        if self.true_lat_lon:
+            angle = min(distance_km / EARTH_RADIUS_KM, np.pi)
+            return 2 * EARTH_RADIUS_KM * np.sin(angle / 2)
+        else:
+            return distance_km
+
+    def _distances_km(self, points_km: np.ndarray, point_km: np.ndarray) -> np.ndarray:
+        chord_lengths_km = np.linalg.norm(points_km - point_km, axis=-1)
+        if self.true_lat_lon:
+            return (
+                2
+                * EARTH_RADIUS_KM
+                * np.arcsin(np.clip(chord_lengths_km / (2 * EARTH_RADIUS_KM), 0, 1))
+            )
+        else:
+            return chord_lengths_km
+
+    def distances_km_to(
+        self, idxs: np.ndarray, location: AirportCode | LatLon
+    ) -> np.ndarray:
+        """Get the distances from the airports at the given indices (into the airport table) to
+        an airport or (lat, lon) point.
+        """
+
+        return self._distances_km(self.points_km[idxs], self._to_point_km(location))
+
+    def airport_idxs_within_range(
+        self, center: AirportCode | LatLon, range_km: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the indices (into the airport table) of the airports within ``range_km`` of an
+        airport or (lat, lon) point, and their distances from it, in no particular order.
+        """
+
+        center_km = self._to_point_km(center)
+        idxs = np.asarray(
+            self.tree.query_ball_point(center_km, self._query_radius(range_km)),
+            dtype=int,
+        )
+        distances_km = self._distances_km(self.points_km[idxs], center_km)
+        # Exclude airports admitted by the tree only due to rounding:
+        within = distances_km <= range_km
+        return idxs[within], distances_km[within]
+
+    def airports_within_range(
+        self, center: AirportCode | LatLon, range_km: float
+    ) -> pd.Series:
+        """Get the airports within ``range_km`` of an airport or (lat, lon) point, as their
+        distances from it, indexed by airport code and sorted nearest first.
+        """
+
+        idxs, distances_km = self.airport_idxs_within_range(center, range_km)
+        order = np.argsort(distances_km, kind="stable")
+        return pd.Series(
+            distances_km[order],
+            index=pd.Index(self.airport_table.codes[idxs[order]], name="airport_code"),
+            name="distance_km",
+        )
+
+    def airports_near_segment(
+        self, a: AirportCode | LatLon, b: AirportCode | LatLon, max_offset_km: float
+    ) -> pd.DataFrame:
+        """Get the airports within ``max_offset_km`` of the (great-circle or straight) segment from
+        a to b, indexed by airport code and ordered by their distances along the segment.
+
+        Columns:
+            along_track_km: Distance along the segment of the airport's closest point on the line
+                through a and b (negative behind a).
+            offset_km: Distance from the airport to the segment.
+        """
+
+        a_km, b_km = self._to_point_km(a), self._to_point_km(b)
+        segment_length_km = self._distances_km(b_km, a_km)
+
+        # Cover the corridor around the segment with balls centered at evenly spaced points along
+        #     it, such that only airports in the vicinity of the segment are considered:
+        n_query_points = int(
+            min(
+                np.ceil(segment_length_km / max(2 * max_offset_km, 1e-9)) + 1,
+                MAX_N_SEGMENT_QUERY_POINTS,
+            )
+        )
+        spacing_km = segment_length_km / max(n_query_points - 1, 1)
+        fractions = np.linspace(0, 1, n_query_points)
+        if self.true_lat_lon:
+            lat_a, lon_a = self._to_lat_lon(a_km)
+            lat_b, lon_b = self._to_lat_lon(b_km)
+            query_points_km = self._to_points_km(
+                *great_circle_interpolate(lat_a, lon_a, lat_b, lon_b, fractions)
+            )
+        else:
+            query_points_km = a_km + fractions[:, np.newaxis] * (b_km - a_km)
+        idx_lists = self.tree.query_ball_point(
+            query_points_km,
+            self._query_radius(np.hypot(spacing_km / 2, max_offset_km)),
+            return_sorted=False,
+        )
+        idxs = np.unique(np.concatenate([np.asarray(x, dtype=int) for x in idx_lists]))
+
+        along_track_km, cross_track_km = self._along_and_cross_track_km(
+            self.points_km[idxs], a_km, b_km
+        )
+        offsets_km = np.where(
+            along_track_km < 0,
+            self._distances_km(self.points_km[idxs], a_km),
+            np.where(
+                along_track_km > segment_length_km,
+                self._distances_km(self.points_km[idxs], b_km),
+                np.abs(cross_track_km),
+            ),
+        )
+        within = offsets_km <= max_offset_km
+        idxs, along_track_km, offsets_km = (
+            idxs[within],
+            along_track_km[within],
+            offsets_km[within],
+        )
+        order = np.argsort(along_track_km, kind="stable")
+        return pd.DataFrame(
+            {"along_track_km": along_track_km[order], "offset_km": offsets_km[order]},
+            index=pd.Index(self.airport_table.codes[idxs[order]], name="airport_code"),
+        )
+
+    def _along_and_cross_track_km(
+        self, points_km: np.ndarray, a_km: np.ndarray, b_km: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self.true_lat_lon:
+            normal = np.cross(a_km, b_km)
+            normal_norm = np.linalg.norm(normal)
+            if normal_norm < 1e-9:
+                # a and b (nearly) coincide; measure from a:
+                return (
+                    np.zeros(len(points_km)),
+                    self._distances_km(points_km, a_km),
+                )
+            normal /= normal_norm
+            a_unit = a_km / EARTH_RADIUS_KM
+            tangent = np.cross(normal, a_unit)
+            p = points_km / EARTH_RADIUS_KM
+            along_track_km = EARTH_RADIUS_KM * np.arctan2(p @ tangent, p @ a_unit)
+            cross_track_km = EARTH_RADIUS_KM * np.arcsin(np.clip(p @ normal, -1, 1))
+        else:
+            ab = b_km - a_km
+            ab_length = np.linalg.norm(ab)
+            if ab_length < 1e-9:
+                return (
+                    np.zeros(len(points_km)),
+                    self._distances_km(points_km, a_km),
+                )
+            direction = ab / ab_length
+            ap = points_km - a_km
+            along_track_km = ap @ direction
+            cross_track_km = ap[:, 0] * direction[1] - ap[:, 1] * direction[0]
+        return along_track_km, cross_track_km
+
+    def _to_lat_lon(self, point_km: np.ndarray) -> LatLon:
+        x, y, z = point_km / EARTH_RADIUS_KM
+        return np.rad2deg(np.arcsin(np.clip(z, -1, 1))), np.rad2deg(np.arctan2(y, x))
+
+
+@functools.cache
+def get_airport_spatial_index(true_lat_lon: bool = True) -> AirportSpatialIndex:
+    """Get the spatial index over all airports in the airport table (in geodesic mode by
+    default, consistent with ``get_airport_distance_matrix``).
+    """
+
+    return AirportSpatialIndex(get_airport_table(), true_lat_lon)
@@ -0,0 +1,95 @@
+"""The airport table (airport codes and coordinates), loaded lazily upon first use and cached as
+columnar NumPy arrays, such that large airport tables are parsed from CSV only once.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import hashlib
+import os
+
+import numpy as np
+
+from src.utils.geodesy import EARTH_RADIUS_KM
+
+AIRPORT_LOCATIONS_CSV_PATH = "src/three_d_sim/airport_locations.csv"
+CACHE_DIR = ".cache"
+KM_PER_LAT_LON = EARTH_RADIUS_KM * np.pi / 180
+
+AirportCode = str
+
+
+@dataclasses.dataclass
+class AirportTable:
+    """Airports' codes, (lat, lon) coordinates (in degrees), and altitudes, column by column."""
+
+    codes: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    altitude_km: np.ndarray
+    idxs: dict[AirportCode, int] = dataclasses.field(init=False)
+
+    def __post_init__(self):
+        self.idxs = {code: i for i, code in enumerate(self.codes.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_csv(
+        cls,
+        csv_path: str = AIRPORT_LOCATIONS_CSV_PATH,
+        cache_dir: str | None = CACHE_DIR,
+    ) -> AirportTable:
+        """Read the airport table from a CSV file (with columns ``airport_code``, ``lat``, ``lon``,
+        and optionally ``altitude``), or from its columnar cache in ``cache_dir`` if the file has
+        not changed since the cache was written.
+        """
+
+        if cache_dir is not None:
+            stat = os.stat(csv_path)
+            key = hashlib.sha1(
+                f"{os.path.abspath(csv_path)}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+            )
+            cache_path = os.path.join(
+                cache_dir, f"airport_table_{key.hexdigest()[:16]}.npz"
+            )
+            if os.path.exists(cache_path):
+                with np.load(cache_path) as columns:
+                    return cls(**columns)
+
+        import pandas as pd
+
+        airport_location_df = pd.read_csv(csv_path)
+        airport_table = cls(
+            codes=airport_location_df["airport_code"].to_numpy(dtype=str),
+            lat=airport_location_df["lat"].to_numpy(dtype=float),
+            lon=airport_location_df["lon"].to_numpy(dtype=float),
+            altitude_km=(
+                airport_location_df["altitude"].to_numpy(dtype=float)
+                if "altitude" in airport_location_df
+                else np.zeros(len(airport_location_df))
+            ),
+        )
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first such that concurrent readers never see a partial
+            #     cache file:
+            tmp_cache_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+            np.savez(
+                tmp_cache_path,
+                codes=airport_table.codes,
+                lat=airport_table.lat,
+                lon=airport_table.lon,
+                altitude_km=airport_table.altitude_km,
+            )
+            os.replace(tmp_cache_path, cache_path)
+
+        return airport_table
+
+
+@functools.cache
+def get_airport_table() -> AirportTable:
+    return AirportTable.from_csv()
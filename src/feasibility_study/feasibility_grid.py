@@ -0,0 +1,272 @@
+"""Feasibility studies over the cartesian product of airliners, UAVs, fuels, reserve energy
+thresholds, routes, and refueling plans, evaluated all at once.
+
+Where ``run_study`` follows a single airliner's energy from waypoint to waypoint, the grid follows
+every combination's energy leg by leg as arrays, with the number of refuels at each waypoint
+calculated in closed form (as in ``run_study``). Very large grids can be split into chunks that
+are evaluated in a pool of processes.
+"""
+
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal, Sequence, Type
+
+import numpy as np
+import pandas as pd
+
+from src import specs
+from src.airport_distances import get_airport_distance_matrix
+from src.airport_table import AirportCode
+from src.feasibility_study.modeling_objects import (
+    BaseAirliner,
+    Fuel,
+    Uav,
+    calculate_energy_capacities_MJ,
+    calculate_fuel_energy_consumption_rate_MJ_per_km,
+    calculate_n_refuels_needed,
+)
+
+RefuelPlan = int | Literal["auto"]
+"""The number of refuels at each of a route's intermediate waypoints, or ``"auto"`` to refuel
+the airliner as many times as it needs to reach the next waypoint with its reserve energy.
+"""
+
+AUTO_N_REFUELS = -1
+"""Stands for ``"auto"`` in the ``n_refuels`` of ``evaluate_combinations``."""
+
+
+def run_feasibility_grid(
+    routes: Sequence[Sequence[AirportCode]],
+    airliners: Sequence[Type[BaseAirliner]] = tuple(specs.airliners),
+    uavs: Sequence[Type[Uav]] = tuple(specs.uavs),
+    fuels: dict[str, Fuel] | None = None,
+    reserve_energy_thres_MJ: Sequence[float] = (100e3,),
+    refuel_plans: Sequence[RefuelPlan] = (0, "auto"),
+    n_workers: int | None = None,
+    chunk_size: int = 100_000,
+) -> pd.DataFrame:
+    """Run a feasibility study for every combination of the given options, with the airliner
+    starting each route full.
+
+    Args:
+        routes: Routes as sequences of airport codes, from the origin airport, via the (refueling)
+            waypoints, to the destination airport.
+        fuels: Fuels to substitute for the airliners' own, by name. If ``None``, each airliner uses
+            its own fuel.
+        n_workers: If given, the number of processes among which to evaluate the grid, in chunks
+            of ``chunk_size`` combinations.
+
+    Returns:
+        One row per combination, with:
+            n_refuels: Total number of refuels over the route.
+            flight_time_h: Total flight time.
+            min_arrival_energy_MJ: Lowest energy quantity upon arrival at any waypoint (before
+                refueling).
+            final_energy_MJ: Energy quantity upon arrival at the destination airport.
+            feasible: Whether the airliner arrives at every waypoint with its reserve energy.
+    """
+
+    airport_distances_km = get_airport_distance_matrix()
+    n_legs_max = max(len(route) - 1 for route in routes)
+    routes_legs_distance_km = np.zeros((len(routes), n_legs_max))
+    for i, route in enumerate(routes):
+        routes_legs_distance_km[i, : len(route) - 1] = [
+            airport_distances_km[a, b] for a, b in itertools.pairwise(route)
+        ]
+    routes_n_legs = np.array([len(route) - 1 for route in routes])
+
+    if fuels is None:
+        fuel_labels = [None]
+    else:
+        fuel_labels = list(fuels.keys())
+    fuel_names_by_id = {id(fuel): name for name, fuel in specs.fuel_lookup.items()}
+
+    # Indices into each option, for every combination:
+    airliner_idxs, uav_idxs, fuel_idxs, reserve_idxs, route_idxs, plan_idxs = (
+        x.ravel()
+        for x in np.indices(
+            (
+                len(airliners),
+                len(uavs),
+                len(fuel_labels),
+                len(reserve_energy_thres_MJ),
+                len(routes),
+                len(refuel_plans),
+            )
+        )
+    )
+    # Fuels, for every combination of airliner and fuel option:
+    combination_fuels = [
+        [airliner.fuel if name is None else fuels[name] for name in fuel_labels]
+        for airliner in airliners
+    ]
+
+    def _airliner_attr(attr: str) -> np.ndarray:
+        return np.array([getattr(airliner, attr) for airliner in airliners])[
+            airliner_idxs
+        ]
+
+    def _fuel_attr(attr: str) -> np.ndarray:
+        return np.array(
+            [[getattr(fuel, attr) for fuel in x] for x in combination_fuels]
+        )[airliner_idxs, fuel_idxs]
+
+    def _uav_attr(attr: str) -> np.ndarray:
+        return np.array([getattr(uav, attr) for uav in uavs])[uav_idxs]
+
+    combinations = dict(
+        cruise_speed_kmph=_airliner_attr("cruise_speed_kmph"),
+        energy_consumption_rate_MJ_per_km=_airliner_attr(
+            "energy_consumption_rate_MJ_per_km"
+        ),
+        propulsion_efficiency=np.array(
+            [airliner.propulsion.efficiency for airliner in airliners]
+        )[airliner_idxs],
+        fuel_capacity_L=_airliner_attr("fuel_capacity_L"),
+        fuel_capacity_kg=_airliner_attr("fuel_capacity_kg"),
+        energy_density_lhv_MJpL=_fuel_attr("energy_density_lhv_MJpL"),
+        specific_energy_lhv_MJpkg=_fuel_attr("specific_energy_lhv_MJpkg"),
+        payload_volume_L=_uav_attr("payload_volume_L"),
+        payload_capacity_kg=_uav_attr("payload_capacity_kg"),
+        reserve_energy_thres_MJ=np.asarray(reserve_energy_thres_MJ, dtype=float)[
+            reserve_idxs
+        ],
+        legs_distance_km=routes_legs_distance_km[route_idxs],
+        n_legs=routes_n_legs[route_idxs],
+        n_refuels=np.array(
+            [AUTO_N_REFUELS if plan == "auto" else plan for plan in refuel_plans]
+        )[plan_idxs],
+    )
+
+    if n_workers is None:
+        results = evaluate_combinations(combinations)
+    else:
+        n_combinations = len(airliner_idxs)
+        chunks = [
+            {k: v[start : start + chunk_size] for k, v in combinations.items()}
+            for start in range(0, n_combinations, chunk_size)
+        ]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunks_results = list(executor.map(evaluate_combinations, chunks))
+        results = {
+            k: np.concatenate([x[k] for x in chunks_results])
+            for k in chunks_results[0].keys()
+        }
+
+    fuel_names = [
+        fuel_names_by_id.get(id(airliner.fuel)) if name is None else name
+        for airliner in airliners
+        for name in fuel_labels
+    ]
+    return pd.DataFrame(
+        {
+            "airliner": _categorical([x.__name__ for x in airliners], airliner_idxs),
+            "uav": _categorical([x.__name__ for x in uavs], uav_idxs),
+            "fuel": _categorical(
+                fuel_names, airliner_idxs * len(fuel_labels) + fuel_idxs
+            ),
+            "reserve_energy_thres_MJ": combinations["reserve_energy_thres_MJ"],
+            "route": _categorical([" - ".join(route) for route in routes], route_idxs),
+            "refuel_plan": _categorical(refuel_plans, plan_idxs),
+            **results,
+        }
+    )
+
+
+def _categorical(labels: Sequence, idxs: np.ndarray) -> pd.Categorical:
+    """Get the labels at the given indices, without materializing them one by one."""
+
+    codes, categories = pd.factorize(pd.Series(labels, dtype=object))
+    return pd.Categorical.from_codes(codes[idxs], categories=categories)
+
+
+def evaluate_combinations(
+    combinations: dict[str, np.ndarray],
+) -> dict[str, np.ndarray]:
+    """Fly every combination's airliner along its route, leg by leg.
+
+    Args:
+        combinations: Arrays of one element per combination (or, for ``legs_distance_km``, one row
+            per combination, padded with zeros beyond its ``n_legs``) of the airliner's, fuel's, and
+            UAV's parameters, the reserve energy threshold, the route, and the number of refuels at
+            each intermediate waypoint (or ``AUTO_N_REFUELS``), by name.
+    """
+
+    c = combinations
+    energy_capacity_MJ = calculate_energy_capacities_MJ(
+        c["fuel_capacity_L"],
+        c["fuel_capacity_kg"],
+        c["energy_density_lhv_MJpL"],
+        c["specific_energy_lhv_MJpkg"],
+    )
+    refueling_energy_MJ = calculate_energy_capacities_MJ(
+        c["payload_volume_L"],
+        c["payload_capacity_kg"],
+        c["energy_density_lhv_MJpL"],
+        c["specific_energy_lhv_MJpkg"],
+    )
+    legs_duration_h = c["legs_distance_km"] / c["cruise_speed_kmph"][:, np.newaxis]
+    legs_energy_MJ = (
+        calculate_fuel_energy_consumption_rate_MJ_per_km(
+            c["energy_consumption_rate_MJ_per_km"], c["propulsion_efficiency"]
+        )[:, np.newaxis]
+        * c["legs_distance_km"]
+    )
+    # Pad with a leg that needs no energy such that the last leg can be treated like the others:
+    legs_energy_MJ = np.c_[legs_energy_MJ, np.zeros(len(legs_energy_MJ))]
+
+    energy_quantity_MJ = energy_capacity_MJ.copy()
+    min_arrival_energy_MJ = np.full(len(energy_quantity_MJ), np.inf)
+    total_n_refuels = np.zeros(len(energy_quantity_MJ), dtype=int)
+    for i in range(legs_duration_h.shape[1]):
+        flying = i < c["n_legs"]
+        energy_quantity_MJ -= legs_energy_MJ[:, i]
+        min_arrival_energy_MJ = np.where(
+            flying,
+            np.minimum(min_arrival_energy_MJ, energy_quantity_MJ),
+            min_arrival_energy_MJ,
+        )
+
+        refueling = i < c["n_legs"] - 1
+        n_refuels_needed = calculate_n_refuels_needed(
+            energy_quantity_MJ=energy_quantity_MJ,
+            next_leg_energy_MJ=legs_energy_MJ[:, i + 1],
+            reserve_energy_thres_MJ=c["reserve_energy_thres_MJ"],
+            energy_capacity_MJ=energy_capacity_MJ,
+            refueling_energy_MJ=refueling_energy_MJ,
+        )
+        n_refuels = np.where(
+            refueling,
+            np.where(
+                c["n_refuels"] == AUTO_N_REFUELS, n_refuels_needed, c["n_refuels"]
+            ).astype(int),
+            0,
+        )
+        energy_quantity_MJ = np.where(
+            n_refuels > 0,
+            np.minimum(
+                energy_quantity_MJ + n_refuels * refueling_energy_MJ,
+                energy_capacity_MJ,
+            ),
+            energy_quantity_MJ,
+        )
+        total_n_refuels += n_refuels
+
+    return dict(
+        n_refuels=total_n_refuels,
+        flight_time_h=legs_duration_h.sum(axis=1),
+        min_arrival_energy_MJ=min_arrival_energy_MJ,
+        final_energy_MJ=energy_quantity_MJ,
+        feasible=min_arrival_energy_MJ >= c["reserve_energy_thres_MJ"],
+    )
+
+
+if __name__ == "__main__":
+    results_df = run_feasibility_grid(
+        routes=[["JFK", "LAX"], ["JFK", "PIT", "DEN", "LAX"]],
+        fuels={name: specs.fuel_lookup[name] for name in ["jet_a1_fuel", "lh2_fuel"]},
+        reserve_energy_thres_MJ=[50e3, 100e3],
+    )
+    print(results_df.to_string())
@@ -6,19 +6,22 @@ Todos:
     With vs. without mid-air refueling.
 """
 
-import plotly.graph_objects as go
+import os
 
 from src import specs
-from src.feasibility_study.study_runner import run_study
+from src.feasibility_study.results_store import StudyResultsStore
 from src.utils.utils import MJ_PER_GJ
 
+FIGURE_PATHS = [
+    "docs/_static/feasibility_study.html",
+    "docs/5_feasibility_studies/feasibility_study.svg",
+    "docs/5_feasibility_studies/feasibility_study.png",
+]
+
 if __name__ == "__main__":
-    fig = go.Figure()
+    store = StudyResultsStore()
     reserve_energy_thres_MJ = 100e3
-    fig.add_hline(
-        y=(reserve_energy_thres_MJ / MJ_PER_GJ),
-        annotation_text="Reserve Energy Threshold",
-    )
+    results_dfs = {}
     for study_label, (airliner_class, n_refuels_by_waypoint) in {
         "Jet-A1-fueled A320": (specs.JetFueledA320, {}),
         "LH₂-fueled A320": (specs.Lh2FueledA320, {"PIT": 0, "DEN": 0}),
@@ -34,7 +37,7 @@ if __name__ == "__main__":
     }.items():
         airliner = airliner_class(reserve_energy_thres_MJ)
         airliner.energy_quantity_MJ = airliner.energy_capacity_MJ
-        results_df = run_study(
+        results_df = store.run_study(
             airliner=airliner,
             uav=specs.At200,
             origin_airport="JFK",
@@ -43,6 +46,22 @@ if __name__ == "__main__":
         )
         print(f"\n{study_label}:")
         print(results_df)
+        results_dfs[study_label] = results_df
+    store.close()
+
+    # Only (re)generate the figures if any study's results changed (or a figure is missing):
+    if not store.computed_keys and all(os.path.exists(x) for x in FIGURE_PATHS):
+        print("\nNo study results changed; the figures are up to date.")
+        raise SystemExit
+
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_hline(
+        y=(reserve_energy_thres_MJ / MJ_PER_GJ),
+        annotation_text="Reserve Energy Threshold",
+    )
+    for study_label, results_df in results_dfs.items():
         fig.add_scatter(
             x=results_df["time_into_flight_h"].round(2),
             y=(results_df["energy_MJ"] / MJ_PER_GJ).round(3),
@@ -60,6 +79,7 @@ if __name__ == "__main__":
         plot_bgcolor="#f8f8f8",
         margin=dict(l=20, r=20, b=20, t=50),
     )
-    fig.write_html("docs/_static/feasibility_study.html")
-    fig.write_image("docs/5_feasibility_studies/feasibility_study.svg")
-    fig.write_image("docs/5_feasibility_studies/feasibility_study.png")
+    html_path, svg_path, png_path = FIGURE_PATHS
+    fig.write_html(html_path)
+    fig.write_image(svg_path)
+    fig.write_image(png_path)
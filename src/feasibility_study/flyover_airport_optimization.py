@@ -1,61 +1,866 @@
-from typing import Dict, Literal, Optional, Union
+"""Optimization of the flyover airports (from which UAVs take off to refuel the airliner) between an
+origin airport and a destination airport.
 
+Airports are the nodes of a graph whose edges are the legs that the airliner can fly, refueled to
+its capacity by UAVs at each flyover airport, and still arrive with its reserve energy. Routes
+through the graph are found with A* search, either of the shortest route (minimum detour) or of the
+route needing the fewest UAVs. As no single route is best by every measure, the Pareto front of
+flight plans (routes and the number of UAVs at each flyover airport) can be explored instead.
+"""
+
+import dataclasses
+import heapq
+from typing import Literal, Optional, Type
+
+import numpy as np
 import pandas as pd
 
 from src import specs
-from src.feasibility_study.modeling_objects import BaseAirliner, Uav
+from src.airport_spatial_index import AirportSpatialIndex, get_airport_spatial_index
+from src.airport_table import AirportCode
+from src.feasibility_study.modeling_objects import (
+    BaseAirliner,
+    Uav,
+    calculate_n_refuels_needed,
+)
+from src.feasibility_study.spec_table import get_airliner_spec_entry, get_uav_spec_entry
 from src.feasibility_study.study_runner import run_study
-from src.modeling_objects import Location, get_all_airport_locations
 
-ALL_AIRPORT_LOCATIONS = get_all_airport_locations()
+Objective = Literal["detour", "n_uavs"]
 
 
-def generate_optimized_flight_plan(
-    airliner: BaseAirliner, uav: Uav, origin_airport: str, destination_airport: str
-):
-    def _run_study(
-        n_refuels_by_waypoint: Optional[Dict[str, Union[int, Literal["auto"]]]] = {}
-    ) -> pd.DataFrame:
-        waypoints = [
-            origin_airport,
-            *n_refuels_by_waypoint.keys(),
-            destination_airport,
-        ]  # TODO remove
-        study_label = " - ".join(waypoints)
-        results_df = run_study(
-            study_label,
-            airliner,
-            uav,
-            origin_airport,
-            destination_airport,
-            n_refuels_by_waypoint,
-        )
-        return results_df
-
-    results_df = _run_study(n_refuels_by_waypoint={})
-    for i in range(1, len(results_df)):
-        prev_airport = results_df.loc[i - 1]["waypoint"]
-        next_airport = results_df.loc[i]["waypoint"]
-        if results_df.loc[i]["energy_MJ"] < airliner.reserve_energy_thres_MJ:
-            range_km = airliner.calculate_range_km(results_df.loc[i - 1]["energy_MJ"])
-            potential_flyover_airports = [
-                potential_flyover_airport
-                for potential_flyover_airport in ALL_AIRPORT_LOCATIONS
-                if Location.direct_distance_km_between(
-                    ALL_AIRPORT_LOCATIONS[prev_airport],
-                    potential_flyover_airport,
-                )
-                <= range_km
+@dataclasses.dataclass
+class FlyoverRoute:
+    waypoints: list[AirportCode]
+    """From the origin airport, via the flyover airports, to the destination airport."""
+    distance_km: float
+    n_refuels_by_waypoint: dict[AirportCode, int]
+    """Number of UAVs needed at each flyover airport, refueling the airliner just enough to reach
+    the next waypoint with its reserve energy (as ``"auto"`` does in ``run_study``).
+    """
+
+    @property
+    def n_uavs(self) -> int:
+        return sum(self.n_refuels_by_waypoint.values())
+
+
+@dataclasses.dataclass
+class FlyoverPlan:
+    """A flight plan on the Pareto front, where no other plan is at least as good by every one of
+    ``detour_km``, ``n_refuels``, ``n_uavs_per_airport``, and ``landing_energy_margin_MJ``, and
+    better by one.
+    """
+
+    waypoints: list[AirportCode]
+    """From the origin airport, via the flyover airports, to the destination airport."""
+    n_refuels_by_waypoint: dict[AirportCode, int]
+    detour_km: float
+    """Distance flown beyond the direct distance from the origin to the destination airport."""
+    n_refuels: int
+    n_uavs_per_airport: int
+    """Most UAVs needed at any one flyover airport."""
+    landing_energy_margin_MJ: float
+    """Energy quantity upon arrival at the destination airport in excess of the reserve energy."""
+
+
+@dataclasses.dataclass
+class FlyoverRoutePlanner:
+    """Plans routes for one airliner (at its reserve energy threshold) and UAV.
+
+    The airports within range of each airport, and the routes planned, are memoized across queries,
+    such that a planner should be reused for as long as the airliner and UAV are.
+    """
+
+    airliner: BaseAirliner
+    uav: Type[Uav]
+    spatial_index: AirportSpatialIndex = dataclasses.field(
+        default_factory=get_airport_spatial_index
+    )
+
+    def __post_init__(self):
+        airliner_spec_entry = get_airliner_spec_entry(self.airliner)
+        self.energy_capacity_MJ = airliner_spec_entry.energy_capacity_MJ
+        self.fuel_energy_consumption_rate_MJ_per_km = (
+            airliner_spec_entry.fuel_energy_consumption_rate_MJ_per_km
+        )
+        self.refueling_energy_MJ = get_uav_spec_entry(
+            self.uav, self.airliner.fuel
+        ).refueling_energy_MJ
+        self.max_leg_distance_km = self.airliner.calculate_range_km(
+            self.energy_capacity_MJ
+        )
+        self._neighbors: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._routes: dict[tuple, Optional[FlyoverRoute]] = {}
+        self._pareto_fronts: dict[tuple, list[FlyoverPlan]] = {}
+
+    def _leg_energy_MJ(self, distance_km: np.ndarray) -> np.ndarray:
+        return self.fuel_energy_consumption_rate_MJ_per_km * distance_km
+
+    def _get_neighbors(self, idx: int) -> tuple[np.ndarray, np.ndarray]:
+        """Get the indices of, and distances to, the airports within range of an airport on a full
+        tank.
+        """
+
+        if idx not in self._neighbors:
+            idxs, distances_km = self.spatial_index.airport_idxs_within_range(
+                self.spatial_index.airport_table.codes[idx], self.max_leg_distance_km
+            )
+            self._neighbors[idx] = (idxs[idxs != idx], distances_km[idxs != idx])
+        return self._neighbors[idx]
+
+    def plan_route(
+        self,
+        origin_airport: AirportCode,
+        destination_airport: AirportCode,
+        objective: Objective = "detour",
+        initial_energy_MJ: Optional[float] = None,
+    ) -> Optional[FlyoverRoute]:
+        """Plan the route from the origin airport to the destination airport that is shortest
+        (``"detour"``) or that needs the fewest UAVs (``"n_uavs"``, then shortest), with the airliner
+        starting with ``initial_energy_MJ`` (by default, full).
+
+        Returns:
+            The route, or ``None`` if the destination airport cannot be reached.
+        """
+
+        if initial_energy_MJ is None:
+            initial_energy_MJ = self.energy_capacity_MJ
+        key = (origin_airport, destination_airport, objective, initial_energy_MJ)
+        if key not in self._routes:
+            if objective == "detour":
+                waypoint_idxs = self._search_shortest(
+                    origin_airport, destination_airport, initial_energy_MJ
+                )
+                self._routes[key] = (
+                    None
+                    if waypoint_idxs is None
+                    else self._make_route(waypoint_idxs, initial_energy_MJ)
+                )
+            elif objective == "n_uavs":
+                # The shortest route bounds the number of UAVs needed, such that only routes
+                #     needing fewer UAVs need be searched for:
+                shortest_route = self.plan_route(
+                    origin_airport, destination_airport, "detour", initial_energy_MJ
+                )
+                waypoint_idxs = (
+                    None
+                    if shortest_route is None
+                    else self._search_fewest_uavs(
+                        origin_airport,
+                        destination_airport,
+                        initial_energy_MJ,
+                        max_n_uavs=(shortest_route.n_uavs - 1),
+                        min_distance_km=shortest_route.distance_km,
+                    )
+                )
+                self._routes[key] = (
+                    shortest_route
+                    if waypoint_idxs is None
+                    else self._make_route(waypoint_idxs, initial_energy_MJ)
+                )
+            else:
+                raise ValueError(objective)
+        return self._routes[key]
+
+    def _first_leg_neighbors(
+        self, origin_idx: int, initial_energy_MJ: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # No refueling over the origin airport:
+        idxs, distances_km = self._get_neighbors(origin_idx)
+        reachable = (
+            initial_energy_MJ - self._leg_energy_MJ(distances_km)
+            >= self.airliner.reserve_energy_thres_MJ
+        )
+        return idxs[reachable], distances_km[reachable]
+
+    def _search_shortest(
+        self,
+        origin_airport: AirportCode,
+        destination_airport: AirportCode,
+        initial_energy_MJ: float,
+    ) -> Optional[list[int]]:
+        airport_idxs = self.spatial_index.airport_table.idxs
+        origin_idx = airport_idxs[origin_airport]
+        destination_idx = airport_idxs[destination_airport]
+
+        # A*, with the direct distance to the destination airport as the (admissible) heuristic:
+        best_distances_km = np.full(len(self.spatial_index.airport_table), np.inf)
+        best_distances_km[origin_idx] = 0.0
+        parents = {origin_idx: None}
+        heap = [(0.0, 0.0, origin_idx)]
+        closed = set()
+        while len(heap) > 0:
+            _, distance_km, idx = heapq.heappop(heap)
+            if idx == destination_idx:
+                return _reconstruct(parents, idx)
+            if idx in closed:
+                continue
+            closed.add(idx)
+
+            if idx == origin_idx:
+                neighbor_idxs, leg_distances_km = self._first_leg_neighbors(
+                    idx, initial_energy_MJ
+                )
+            else:
+                neighbor_idxs, leg_distances_km = self._get_neighbors(idx)
+            neighbor_distances_km = distance_km + leg_distances_km
+            improved = neighbor_distances_km < best_distances_km[neighbor_idxs]
+            neighbor_idxs = neighbor_idxs[improved]
+            neighbor_distances_km = neighbor_distances_km[improved]
+            best_distances_km[neighbor_idxs] = neighbor_distances_km
+            priorities = neighbor_distances_km + self.spatial_index.distances_km_to(
+                neighbor_idxs, destination_airport
+            )
+            for i, d, f in zip(
+                neighbor_idxs.tolist(),
+                neighbor_distances_km.tolist(),
+                priorities.tolist(),
+            ):
+                parents[i] = idx
+                heapq.heappush(heap, (f, d, i))
+        return None
+
+    def _search_fewest_uavs(
+        self,
+        origin_airport: AirportCode,
+        destination_airport: AirportCode,
+        initial_energy_MJ: float,
+        max_n_uavs: int,
+        min_distance_km: float,
+    ) -> Optional[list[int]]:
+        """Search for the route needing the fewest UAVs, if any needs at most ``max_n_uavs``, given
+        that no route is shorter than ``min_distance_km``.
+        """
+
+        airport_idxs = self.spatial_index.airport_table.idxs
+        origin_idx = airport_idxs[origin_airport]
+        destination_idx = airport_idxs[destination_airport]
+        reserve_energy_thres_MJ = self.airliner.reserve_energy_thres_MJ
+        q = self.refueling_energy_MJ
+
+        def _heuristic_n_uavs(
+            idxs: np.ndarray, distance_km: np.ndarray, energy_MJ: np.ndarray
+        ) -> np.ndarray:
+            # However the airliner gets to the destination airport, it needs at least the energy to
+            #     fly there directly, or to fly the rest of the shortest route's distance, with its
+            #     reserve energy to spare:
+            remaining_distance_km = np.maximum(
+                self.spatial_index.distances_km_to(idxs, destination_airport),
+                (min_distance_km - distance_km) * (1 - 1e-9),
+            )
+            deficit_MJ = (
+                self._leg_energy_MJ(remaining_distance_km)
+                + reserve_energy_thres_MJ
+                - energy_MJ
+            )
+            return np.ceil(deficit_MJ / q).clip(min=0)
+
+        # A* over labels of (airport, number of UAVs so far, energy upon arrival), where a label is
+        #     pruned if another label at the same airport, topped up by more UAVs there if need be,
+        #     would have as much energy with as few UAVs:
+        if q <= 0:
+            return None  # No number of UAVs is better than any other.
+        if (
+            _heuristic_n_uavs(
+                np.array([origin_idx]), np.array([0.0]), np.array([initial_energy_MJ])
+            )[0]
+            > max_n_uavs
+        ):
+            return None
+        # (Airport index, parent label index, distance flown.)
+        labels = [(origin_idx, None, 0.0)]
+        heap = [(0, 0.0, 0, -initial_energy_MJ, 0)]
+        pareto_labels: dict[int, list[tuple[int, float]]] = {}
+        # The label generated at each airport with the most energy net of the UAVs used, against
+        #     which labels are pruned in bulk before being checked against `pareto_labels`:
+        n_airports = len(self.spatial_index.airport_table)
+        best_n_uavs = np.zeros(n_airports)
+        best_energies_MJ = np.full(n_airports, -np.inf)
+
+        def _dominated(idx: int, n_uavs: int, energy_MJ: float) -> bool:
+            return any(
+                n + np.ceil(max(energy_MJ - e, 0) / q) <= n_uavs
+                for n, e in pareto_labels.get(idx, [])
+            )
+
+        while len(heap) > 0:
+            _, _, n_uavs, neg_energy_MJ, label_idx = heapq.heappop(heap)
+            idx, _, distance_km = labels[label_idx]
+            energy_MJ = -neg_energy_MJ
+            if idx == destination_idx:
+                waypoint_idxs = []
+                while label_idx is not None:
+                    waypoint_idxs.append(labels[label_idx][0])
+                    label_idx = labels[label_idx][1]
+                return waypoint_idxs[::-1]
+            if _dominated(idx, n_uavs, energy_MJ):
+                continue
+            pareto_labels.setdefault(idx, []).append((n_uavs, energy_MJ))
+
+            if idx == origin_idx:
+                neighbor_idxs, leg_distances_km = self._first_leg_neighbors(
+                    idx, initial_energy_MJ
+                )
+                n_refuels = np.zeros(len(neighbor_idxs), dtype=int)
+            else:
+                neighbor_idxs, leg_distances_km = self._get_neighbors(idx)
+                n_refuels = calculate_n_refuels_needed(
+                    energy_quantity_MJ=energy_MJ,
+                    next_leg_energy_MJ=self._leg_energy_MJ(leg_distances_km),
+                    reserve_energy_thres_MJ=reserve_energy_thres_MJ,
+                    energy_capacity_MJ=self.energy_capacity_MJ,
+                    refueling_energy_MJ=q,
+                )
+            neighbor_energies_MJ = np.minimum(
+                energy_MJ + n_refuels * q, self.energy_capacity_MJ
+            ) - self._leg_energy_MJ(leg_distances_km)
+            neighbor_n_uavs = n_uavs + n_refuels
+            priorities = neighbor_n_uavs + _heuristic_n_uavs(
+                neighbor_idxs,
+                distance_km + leg_distances_km,
+                neighbor_energies_MJ,
+            )
+            # (The origin airport is never revisited, as the airliner cannot be refueled over it.)
+            promising = (
+                (neighbor_idxs != origin_idx)
+                & (neighbor_energies_MJ >= reserve_energy_thres_MJ)
+                & (priorities <= max_n_uavs)
+                & (
+                    best_n_uavs[neighbor_idxs]
+                    + np.ceil(
+                        np.maximum(
+                            neighbor_energies_MJ - best_energies_MJ[neighbor_idxs], 0
+                        )
+                        / q
+                    )
+                    > neighbor_n_uavs
+                )
+            )
+            neighbor_idxs = neighbor_idxs[promising]
+            priorities = priorities[promising]
+            neighbor_n_uavs = neighbor_n_uavs[promising]
+            neighbor_energies_MJ = neighbor_energies_MJ[promising]
+            neighbor_distances_km = distance_km + leg_distances_km[promising]
+            remaining_distances_km = self.spatial_index.distances_km_to(
+                neighbor_idxs, destination_airport
+            )
+            better = (
+                neighbor_energies_MJ - neighbor_n_uavs * q
+                > best_energies_MJ[neighbor_idxs] - best_n_uavs[neighbor_idxs] * q
+            )
+            best_n_uavs[neighbor_idxs[better]] = neighbor_n_uavs[better]
+            best_energies_MJ[neighbor_idxs[better]] = neighbor_energies_MJ[better]
+            for i, f, d, f_d, n, e in zip(
+                neighbor_idxs.tolist(),
+                priorities.tolist(),
+                neighbor_distances_km.tolist(),
+                (neighbor_distances_km + remaining_distances_km).tolist(),
+                neighbor_n_uavs.tolist(),
+                neighbor_energies_MJ.tolist(),
+            ):
+                if _dominated(i, n, e):
+                    continue
+                labels.append((i, label_idx, d))
+                heapq.heappush(heap, (f, f_d, n, -e, len(labels) - 1))
+        return None
+
+    def explore_pareto_front(
+        self,
+        origin_airport: AirportCode,
+        destination_airport: AirportCode,
+        max_detour_km: Optional[float] = None,
+        initial_energy_MJ: Optional[float] = None,
+    ) -> list[FlyoverPlan]:
+        """Find every flight plan from the origin airport to the destination airport on the Pareto
+        front of detour, number of refuels, number of UAVs per flyover airport, and landing energy
+        margin, with the airliner starting with ``initial_energy_MJ`` (by default, full).
+
+        Unlike in ``plan_route``, the airliner may be refueled beyond what it needs to reach the next
+        waypoint (up to its capacity), trading refuels for landing energy margin or spreading them
+        over flyover airports. Routes visit each airport at most once.
+
+        Args:
+            max_detour_km: If given, only plans with at most this detour are explored, which bounds
+                the search on large airport tables.
+
+        Returns:
+            The plans, sorted by detour.
+        """
+
+        if initial_energy_MJ is None:
+            initial_energy_MJ = self.energy_capacity_MJ
+        key = (origin_airport, destination_airport, max_detour_km, initial_energy_MJ)
+        if key not in self._pareto_fronts:
+            self._pareto_fronts[key] = self._search_pareto_front(
+                origin_airport, destination_airport, max_detour_km, initial_energy_MJ
+            )
+        return self._pareto_fronts[key]
+
+    def _search_pareto_front(
+        self,
+        origin_airport: AirportCode,
+        destination_airport: AirportCode,
+        max_detour_km: Optional[float],
+        initial_energy_MJ: float,
+    ) -> list[FlyoverPlan]:
+        airport_idxs = self.spatial_index.airport_table.idxs
+        origin_idx = airport_idxs[origin_airport]
+        destination_idx = airport_idxs[destination_airport]
+        reserve_energy_thres_MJ = self.airliner.reserve_energy_thres_MJ
+        q = self.refueling_energy_MJ
+        direct_distance_km = self.spatial_index.distances_km_to(
+            np.array([origin_idx]), destination_airport
+        )[0]
+        if max_detour_km is None:
+            max_detour_km = np.inf
+        # The airliner lands with at most its capacity less the energy needed to fly from the airport
+        #     nearest to the destination airport, if it is refueled on the way:
+        _, (_, nearest_idx) = self.spatial_index.tree.query(
+            self.spatial_index.points_km[destination_idx], k=2
+        )
+        max_refueled_landing_energy_MJ = self.energy_capacity_MJ - self._leg_energy_MJ(
+            self.spatial_index.distances_km_to(
+                np.array([nearest_idx]), destination_airport
+            )[0]
+        )
+
+        # Multi-objective A* over labels of (airport, distance flown, number of refuels, number of
+        #     UAVs per airport, energy upon arrival), popped in order of distance flown plus the
+        #     direct distance remaining, such that labels popped at an airport have flown no farther
+        #     than labels popped there later. A label is pruned if another label at the same airport
+        #     is at least as good by every other measure, and has visited no airport that the label
+        #     could still reach within the maximum detour but has not visited (such that it can
+        #     continue in every way that the label could), as whatever plan it leads to would be too.
+        #     As labels share their parents, partial routes are stored only once.
+        # (Airport index, parent label index, distance flown, number of refuels at the parent,
+        #     airports visited that could still be reached within the maximum detour.)
+        labels = [(origin_idx, None, 0.0, 0, frozenset([origin_idx]))]
+        heap = [(direct_distance_km, 0, 0, -initial_energy_MJ, 0)]
+        pareto_labels = _ParetoLabelSets(
+            n_airports=len(self.spatial_index.airport_table),
+            max_n_uavs=(int(np.ceil(self.energy_capacity_MJ / q)) if q > 0 else 0),
+        )
+        # (Label index, number of refuels, number of UAVs per airport, landing energy.)
+        front: list[tuple[int, int, int, float]] = []
+
+        while len(heap) > 0:
+            _, n_refuels, n_uavs, neg_energy_MJ, label_idx = heapq.heappop(heap)
+            idx, _, distance_km, _, visited_idxs = labels[label_idx]
+            energy_MJ = -neg_energy_MJ
+            if idx == destination_idx:
+                # (Plans are complete, such that the airports they visited no longer matter.)
+                visited_idxs = frozenset([idx])
+            if pareto_labels.dominated(idx, n_refuels, n_uavs, energy_MJ, visited_idxs):
+                continue
+            pareto_labels.add(idx, n_refuels, n_uavs, energy_MJ, visited_idxs)
+            if idx == destination_idx:
+                front.append((label_idx, n_refuels, n_uavs, energy_MJ))
+                continue
+            if self._front_dominates(
+                front,
+                n_refuels,
+                n_uavs,
+                energy_MJ,
+                remaining_energy_MJ=self._leg_energy_MJ(
+                    self.spatial_index.distances_km_to(
+                        np.array([idx]), destination_airport
+                    )[0]
+                ),
+                max_refueled_landing_energy_MJ=max_refueled_landing_energy_MJ,
+            ):
+                continue
+
+            if idx == origin_idx:
+                neighbor_idxs, leg_distances_km = self._first_leg_neighbors(
+                    idx, initial_energy_MJ
+                )
+                n_refuels_options = np.zeros(1, dtype=int)
+            else:
+                neighbor_idxs, leg_distances_km = self._get_neighbors(idx)
+                # From none to as many as it takes to fill the airliner up:
+                n_refuels_options = np.arange(
+                    max(int(np.ceil((self.energy_capacity_MJ - energy_MJ) / q)), 0) + 1
+                    if q > 0
+                    else 1
+                )
+            remaining_distances_km = self.spatial_index.distances_km_to(
+                neighbor_idxs, destination_airport
+            )
+            neighbor_distances_km = distance_km + leg_distances_km
+            visited_idxs_arr = np.array(sorted(visited_idxs))
+            within_detour = (
+                neighbor_distances_km + remaining_distances_km - direct_distance_km
+                <= max_detour_km
+            ) & ~np.isin(neighbor_idxs, visited_idxs_arr)
+            neighbor_idxs = neighbor_idxs[within_detour]
+            leg_distances_km = leg_distances_km[within_detour]
+            remaining_distances_km = remaining_distances_km[within_detour]
+            neighbor_distances_km = neighbor_distances_km[within_detour]
+
+            # Every combination of neighbor and number of refuels:
+            j, n = (
+                x.ravel()
+                for x in np.indices((len(neighbor_idxs), len(n_refuels_options)))
+            )
+            n = n_refuels_options[n]
+            neighbor_energies_MJ = np.minimum(
+                energy_MJ + n * q, self.energy_capacity_MJ
+            ) - self._leg_energy_MJ(leg_distances_km[j])
+            neighbor_n_refuels = n_refuels + n
+            neighbor_n_uavs = np.maximum(n_uavs, n)
+            promising = (
+                neighbor_energies_MJ >= reserve_energy_thres_MJ
+            ) & ~pareto_labels.dominated_by_any_route(
+                neighbor_idxs[j],
+                neighbor_n_refuels,
+                neighbor_n_uavs,
+                neighbor_energies_MJ,
+            )
+            j, n, neighbor_energies_MJ, neighbor_n_refuels, neighbor_n_uavs = (
+                x[promising]
+                for x in (
+                    j,
+                    n,
+                    neighbor_energies_MJ,
+                    neighbor_n_refuels,
+                    neighbor_n_uavs,
+                )
+            )
+
+            # Visited airports that could still be reached from each neighbor within the maximum
+            #     detour (where, by the triangle inequality, ones that cannot be reached from this
+            #     airport cannot be reached from any neighbor either):
+            if np.isinf(max_detour_km):
+                reachable = np.ones((len(visited_idxs_arr), len(neighbor_idxs)), bool)
+            else:
+                reachable = np.array(
+                    [
+                        neighbor_distances_km
+                        + self.spatial_index.distances_km_to(
+                            neighbor_idxs, self.spatial_index.airport_table.codes[w]
+                        )
+                        + self.spatial_index.distances_km_to(
+                            np.array([w]), destination_airport
+                        )[0]
+                        - direct_distance_km
+                        <= max_detour_km
+                        for w in visited_idxs_arr.tolist()
+                    ]
+                ).reshape(len(visited_idxs_arr), len(neighbor_idxs))
+            neighbors_visited_idxs = {}
+            for j_, i, f, d, r, u, e, n_ in zip(
+                j.tolist(),
+                neighbor_idxs[j].tolist(),
+                (neighbor_distances_km[j] + remaining_distances_km[j]).tolist(),
+                neighbor_distances_km[j].tolist(),
+                neighbor_n_refuels.tolist(),
+                neighbor_n_uavs.tolist(),
+                neighbor_energies_MJ.tolist(),
+                n.tolist(),
+            ):
+                if j_ not in neighbors_visited_idxs:
+                    neighbors_visited_idxs[j_] = frozenset(
+                        [i, *visited_idxs_arr[reachable[:, j_]].tolist()]
+                    )
+                v = neighbors_visited_idxs[j_]
+                if pareto_labels.dominated_by_same_route(i, r, u, e, v):
+                    continue
+                labels.append((i, label_idx, d, n_, v))
+                heapq.heappush(heap, (f, r, u, -e, len(labels) - 1))
+
+        plans = []
+        for label_idx, n_refuels, n_uavs, energy_MJ in front:
+            distance_km = labels[label_idx][2]
+            route_labels = []
+            i = label_idx
+            while i is not None:
+                route_labels.append(labels[i])
+                i = labels[i][1]
+            route_labels = route_labels[::-1]
+            waypoints = self.spatial_index.airport_table.codes[
+                [x[0] for x in route_labels]
+            ].tolist()
+            # Each label holds the number of refuels at its parent:
+            n_refuels_by_waypoint = {
+                waypoint: x[3] for waypoint, x in zip(waypoints[1:-1], route_labels[2:])
+            }
+            plans.append(
+                FlyoverPlan(
+                    waypoints=waypoints,
+                    n_refuels_by_waypoint=n_refuels_by_waypoint,
+                    detour_km=distance_km - direct_distance_km,
+                    n_refuels=n_refuels,
+                    n_uavs_per_airport=n_uavs,
+                    landing_energy_margin_MJ=energy_MJ - reserve_energy_thres_MJ,
+                )
+            )
+        return plans
+
+    def _front_dominates(
+        self,
+        front: list[tuple[int, int, int, float]],
+        n_refuels: int,
+        n_uavs: int,
+        energy_MJ: float,
+        remaining_energy_MJ: float,
+        max_refueled_landing_energy_MJ: float,
+    ) -> bool:
+        """Check whether, however many more refuels they take, the plans that a label leads to would
+        be at least as good by every measure but distance as a plan already on the front (where
+        labels are popped in order of a lower bound on the distance of the plans they lead to).
+        """
+
+        if len(front) == 0:
+            return False
+        q = self.refueling_energy_MJ
+        # With k more refuels, the airliner lands with at most k refuels' worth of energy more
+        #     than it would with none:
+        if q > 0:
+            ks = np.arange(
+                max(
+                    np.ceil(
+                        (
+                            remaining_energy_MJ
+                            + self.airliner.reserve_energy_thres_MJ
+                            - energy_MJ
+                        )
+                        / q
+                    ),
+                    0,
+                ),
+                max(
+                    np.ceil(
+                        (
+                            max_refueled_landing_energy_MJ
+                            + remaining_energy_MJ
+                            - energy_MJ
+                        )
+                        / q
+                    ),
+                    0,
+                )
+                + 1,
+            )
+        else:
+            ks = np.zeros(1)
+        max_landing_energies_MJ = np.maximum(
+            np.minimum(
+                energy_MJ + ks * q - remaining_energy_MJ, max_refueled_landing_energy_MJ
+            ),
+            energy_MJ - remaining_energy_MJ,
+        )
+        return all(
+            any(
+                r <= n_refuels + k and u <= n_uavs and e >= e_max
+                for _, r, u, e in front
+            )
+            for k, e_max in zip(ks.tolist(), max_landing_energies_MJ.tolist())
+        )
+
+    def _make_route(
+        self, waypoint_idxs: list[int], initial_energy_MJ: float
+    ) -> FlyoverRoute:
+        waypoints = self.spatial_index.airport_table.codes[waypoint_idxs].tolist()
+        legs_distance_km = np.array(
+            [
+                self.spatial_index.distances_km_to(np.array([b]), waypoints[i])[0]
+                for i, b in enumerate(waypoint_idxs[1:])
+            ]
+        )
+        legs_energy_MJ = self._leg_energy_MJ(legs_distance_km)
+        energy_MJ = initial_energy_MJ - legs_energy_MJ[0]
+        n_refuels_by_waypoint = {}
+        for i, waypoint in enumerate(waypoints[1:-1]):
+            n_refuels = calculate_n_refuels_needed(
+                energy_MJ,
+                next_leg_energy_MJ=legs_energy_MJ[i + 1],
+                reserve_energy_thres_MJ=self.airliner.reserve_energy_thres_MJ,
+                energy_capacity_MJ=self.energy_capacity_MJ,
+                refueling_energy_MJ=self.refueling_energy_MJ,
+            )
+            n_refuels_by_waypoint[waypoint] = n_refuels
+            energy_MJ = (
+                min(
+                    energy_MJ + n_refuels * self.refueling_energy_MJ,
+                    self.energy_capacity_MJ,
+                )
+                - legs_energy_MJ[i + 1]
+            )
+        return FlyoverRoute(
+            waypoints=waypoints,
+            distance_km=float(legs_distance_km.sum()),
+            n_refuels_by_waypoint=n_refuels_by_waypoint,
+        )
+
+
+@dataclasses.dataclass
+class _ParetoLabelSets:
+    """The labels popped at each airport in a Pareto front search, by number of refuels, number of
+    UAVs per airport, energy, and airports visited that could still be reached.
+
+    Labels that could still reach no airport they visited (but their own) are kept in a table of the
+    most energy of any such label with at most each number of refuels and UAVs per airport, against
+    which many labels can be checked at once. Others are kept in lists.
+    """
+
+    n_airports: int
+    max_n_uavs: int
+    max_n_refuels: int = 63
+    slots: np.ndarray = dataclasses.field(init=False)
+    """Index into ``energies_MJ`` for each airport, if any."""
+    n_slots: int = dataclasses.field(default=0, init=False)
+    energies_MJ: np.ndarray = dataclasses.field(init=False)
+    others: dict[int, list[tuple[int, int, float, frozenset[int]]]] = dataclasses.field(
+        default_factory=dict
+    )
+
+    def __post_init__(self):
+        self.slots = np.full(self.n_airports, -1)
+        self.energies_MJ = np.full(
+            (16, self.max_n_refuels + 1, self.max_n_uavs + 1), -np.inf
+        )
+
+    def add(
+        self,
+        idx: int,
+        n_refuels: int,
+        n_uavs: int,
+        energy_MJ: float,
+        visited_idxs: frozenset[int],
+    ) -> None:
+        if not (
+            visited_idxs <= {idx}
+            and n_refuels <= self.max_n_refuels
+            and n_uavs <= self.max_n_uavs
+        ):
+            self.others.setdefault(idx, []).append(
+                (n_refuels, n_uavs, energy_MJ, visited_idxs)
+            )
+            return
+        if self.slots[idx] < 0:
+            if self.n_slots == len(self.energies_MJ):
+                self.energies_MJ = np.concatenate(
+                    [self.energies_MJ, np.full_like(self.energies_MJ, -np.inf)]
+                )
+            self.slots[idx] = self.n_slots
+            self.n_slots += 1
+        energies_MJ = self.energies_MJ[self.slots[idx], n_refuels:, n_uavs:]
+        np.maximum(energies_MJ, energy_MJ, out=energies_MJ)
+
+    def dominated_by_any_route(
+        self,
+        idxs: np.ndarray,
+        n_refuels: np.ndarray,
+        n_uavs: np.ndarray,
+        energies_MJ: np.ndarray,
+    ) -> np.ndarray:
+        """Check labels against those in the table only, all at once."""
+
+        slots = self.slots[idxs]
+        return (slots >= 0) & (
+            self.energies_MJ[
+                slots.clip(min=0),
+                n_refuels.clip(max=self.max_n_refuels),
+                n_uavs.clip(max=self.max_n_uavs),
             ]
-            ...  # TODO find airport closest to line [waypoint-1, waypoint]
+            >= energies_MJ
+        )
+
+    def dominated(
+        self,
+        idx: int,
+        n_refuels: int,
+        n_uavs: int,
+        energy_MJ: float,
+        visited_idxs: frozenset[int],
+    ) -> bool:
+        slot = self.slots[idx]
+        if (
+            slot >= 0
+            and self.energies_MJ[
+                slot,
+                min(n_refuels, self.max_n_refuels),
+                min(n_uavs, self.max_n_uavs),
+            ]
+            >= energy_MJ
+        ):
+            return True
+        return self.dominated_by_same_route(
+            idx, n_refuels, n_uavs, energy_MJ, visited_idxs
+        )
+
+    def dominated_by_same_route(
+        self,
+        idx: int,
+        n_refuels: int,
+        n_uavs: int,
+        energy_MJ: float,
+        visited_idxs: frozenset[int],
+    ) -> bool:
+        """Check a label against those in the lists only."""
+
+        return any(
+            r <= n_refuels and u <= n_uavs and e >= energy_MJ and v <= visited_idxs
+            for r, u, e, v in self.others.get(idx, ())
+        )
+
+
+def _reconstruct(parents: dict[int, Optional[int]], idx: int) -> list[int]:
+    idxs = []
+    while idx is not None:
+        idxs.append(idx)
+        idx = parents[idx]
+    return idxs[::-1]
+
+
+def generate_optimized_flight_plan(
+    airliner: BaseAirliner,
+    uav: Type[Uav],
+    origin_airport: str,
+    destination_airport: str,
+    objective: Objective = "n_uavs",
+    planner: Optional[FlyoverRoutePlanner] = None,
+) -> Optional[pd.DataFrame]:
+    """Plan the airliner's route via flyover airports, and run the feasibility study of it.
+
+    Args:
+        planner: A planner of the airliner and UAV to reuse (along with the airports within range
+            and routes it has memoized) across calls; by default, a new one.
+
+    Returns:
+        The study's results, or ``None`` if the destination airport cannot be reached.
+    """
+
+    if planner is None:
+        planner = FlyoverRoutePlanner(airliner, uav)
+    elif planner.airliner is not airliner or planner.uav is not uav:
+        raise ValueError("The planner must be of the same airliner and UAV.")
+    route = planner.plan_route(
+        origin_airport,
+        destination_airport,
+        objective=objective,
+        initial_energy_MJ=airliner.energy_quantity_MJ,
+    )
+    if route is None:
+        return None
+    results_df = run_study(
+        airliner,
+        uav,
+        origin_airport,
+        destination_airport,
+        n_refuels_by_waypoint={waypoint: "auto" for waypoint in route.waypoints[1:-1]},
+    )
+    return results_df
 
 
 if __name__ == "__main__":
     airliner = specs.Lh2FueledA320(reserve_energy_thres_MJ=100e3)
     airliner.energy_quantity_MJ = airliner.energy_capacity_MJ
-    generate_optimized_flight_plan(
-        airliner=airliner,
-        uav=specs.At200,
-        origin_airport="JFK",
-        destination_airport="LAX",
+    print(
+        generate_optimized_flight_plan(
+            airliner=airliner,
+            uav=specs.At200,
+            origin_airport="JFK",
+            destination_airport="LAX",
+        )
     )
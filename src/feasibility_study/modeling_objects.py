@@ -1,9 +1,16 @@
 import dataclasses
+import functools
+from typing import Literal
 
 import numpy as np
 
+LimitingFactor = Literal["volume", "weight", "volume_and_weight"]
+"""Whether a fuel's volume (fuel capacity in L or energy density in MJ/L) or weight (fuel capacity in
+kg or specific energy in MJ/kg) limits the energy capacity.
+"""
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(frozen=True)
 class Fuel:
     energy_density_lhv_MJpL: float  # LHV = Lower Heating Value.
     density_kgpL: float
@@ -18,24 +25,103 @@ class Propulsion:
     efficiency: float
 
 
-def get_energy_capacity_MJ(
+def calculate_energy_capacities_MJ(
+    fuel_capacity_L: float | np.ndarray,
+    fuel_capacity_kg: float | np.ndarray,
+    energy_density_lhv_MJpL: float | np.ndarray,
+    specific_energy_lhv_MJpkg: float | np.ndarray,
+) -> float | np.ndarray:
+    """Calculate the energy capacity of a fuel tank (or UAV payload), limited by whichever of its
+    volume and weight runs out first. Works on scalars and arrays alike.
+    """
+
+    return np.minimum(
+        fuel_capacity_L * energy_density_lhv_MJpL,
+        fuel_capacity_kg * specific_energy_lhv_MJpkg,
+    )
+
+
+@functools.cache
+def calculate_energy_capacity(
     fuel_capacity_L: float, fuel_capacity_kg: float, fuel: Fuel
-) -> float:
-    energy_capacity_MJ = min(
-        fuel_capacity_L * fuel.energy_density_lhv_MJpL,
-        fuel_capacity_kg * fuel.specific_energy_lhv_MJpkg,
+) -> tuple[float, LimitingFactor]:
+    """Calculate the energy capacity, and what limits it, once per combination of arguments."""
+
+    volume_limited_energy_capacity_MJ = fuel_capacity_L * fuel.energy_density_lhv_MJpL
+    weight_limited_energy_capacity_MJ = (
+        fuel_capacity_kg * fuel.specific_energy_lhv_MJpkg
     )
-    if energy_capacity_MJ == fuel_capacity_L * fuel.energy_density_lhv_MJpL:
-        print(
-            "Fuel volume capacity (L) or fuel energy density (MJ/L) is limiting factor. ",
-            end="",
+    energy_capacity_MJ = float(
+        calculate_energy_capacities_MJ(
+            fuel_capacity_L,
+            fuel_capacity_kg,
+            fuel.energy_density_lhv_MJpL,
+            fuel.specific_energy_lhv_MJpkg,
+        )
+    )
+    if volume_limited_energy_capacity_MJ == weight_limited_energy_capacity_MJ:
+        limiting_factor = "volume_and_weight"
+    elif energy_capacity_MJ == volume_limited_energy_capacity_MJ:
+        limiting_factor = "volume"
+    else:
+        limiting_factor = "weight"
+    return energy_capacity_MJ, limiting_factor
+
+
+def calculate_fuel_energy_consumption_rate_MJ_per_km(
+    energy_consumption_rate_MJ_per_km: float | np.ndarray,
+    propulsion_efficiency: float | np.ndarray,
+) -> float | np.ndarray:
+    """Calculate the rate at which an airliner draws energy from its fuel at cruise, including
+    propulsion losses, such that a leg's energy is this rate times the leg's distance. Works on
+    scalars and arrays (of airliners) alike.
+    """
+
+    return energy_consumption_rate_MJ_per_km / propulsion_efficiency
+
+
+def calculate_n_refuels_needed(
+    energy_quantity_MJ: float | np.ndarray,
+    next_leg_energy_MJ: float | np.ndarray,
+    reserve_energy_thres_MJ: float | np.ndarray,
+    energy_capacity_MJ: float | np.ndarray,
+    refueling_energy_MJ: float | np.ndarray,
+) -> int | np.ndarray:
+    """Calculate the number of refuels the airliner needs to fly the next leg and still have its
+    reserve energy, or to be refueled to its capacity, whichever takes fewer refuels (or none, if
+    refuels deliver no energy). Works on scalars (returning an int) and arrays alike.
+    """
+
+    refueling = np.asarray(refueling_energy_MJ) > 0
+    n_refuels = np.ceil(
+        np.minimum(
+            reserve_energy_thres_MJ + next_leg_energy_MJ - energy_quantity_MJ,
+            energy_capacity_MJ - energy_quantity_MJ,
+        )
+        / np.where(refueling, refueling_energy_MJ, np.inf)
+    ).clip(min=0)
+    # The estimate may be off by one either way due to rounding, so take the fewest refuels that
+    #     satisfy the criteria among it and its neighbors (or, if even the most do not, the most):
+    n_refuels_needed = n_refuels + 1
+    for n in (n_refuels + 1, n_refuels, n_refuels - 1):
+        energy_MJ = np.minimum(
+            energy_quantity_MJ + n * refueling_energy_MJ, energy_capacity_MJ
         )
-    if energy_capacity_MJ == fuel_capacity_kg * fuel.specific_energy_lhv_MJpkg:
-        print(
-            "Fuel weight capacity (kg) or fuel specific energy (MJ/kg) is limiting factor. ",
-            end="",
+        satisfied = (n >= 0) & (
+            (energy_MJ - next_leg_energy_MJ >= reserve_energy_thres_MJ)
+            | (energy_MJ >= energy_capacity_MJ)
         )
-    print()
+        n_refuels_needed = np.where(satisfied, n, n_refuels_needed)
+    n_refuels_needed = np.where(refueling, n_refuels_needed, 0).astype(int)
+    return int(n_refuels_needed) if n_refuels_needed.ndim == 0 else n_refuels_needed
+
+
+def get_energy_capacity_MJ(
+    fuel_capacity_L: float, fuel_capacity_kg: float, fuel: Fuel
+) -> float:
+    energy_capacity_MJ, _ = calculate_energy_capacity(
+        fuel_capacity_L, fuel_capacity_kg, fuel
+    )
     return energy_capacity_MJ
 
 
@@ -69,22 +155,22 @@ class BaseAirliner(BaseAirplane):
             cls.fuel_capacity_L, cls.fuel_capacity_kg, cls.fuel
         )
 
+    @property
+    def fuel_energy_consumption_rate_MJ_per_km(self) -> float:
+        return calculate_fuel_energy_consumption_rate_MJ_per_km(
+            self.energy_consumption_rate_MJ_per_km, self.propulsion.efficiency
+        )
+
     def fly(self, distance_km: float) -> None:
-        time_delta_h = distance_km / self.cruise_speed_kmph
-        self.time_into_flight_h += time_delta_h
+        self.time_into_flight_h += distance_km / self.cruise_speed_kmph
         self.energy_quantity_MJ -= (
-            self.energy_consumption_rate_MJ_per_km
-            * self.cruise_speed_kmph
-            / self.propulsion.efficiency
-        ) * time_delta_h
+            self.fuel_energy_consumption_rate_MJ_per_km * distance_km
+        )
 
     def calculate_range_km(self, energy_quantity_MJ: float) -> float:
-        range_h = (energy_quantity_MJ - self.reserve_energy_thres_MJ) / (
-            self.energy_consumption_rate_MJ_per_km
-            * self.cruise_speed_kmph
-            / self.propulsion.efficiency
-        )
-        range_km = range_h * self.cruise_speed_kmph
+        range_km = (
+            energy_quantity_MJ - self.reserve_energy_thres_MJ
+        ) / self.fuel_energy_consumption_rate_MJ_per_km
         return range_km
 
     def refuel(self, energy_quantity_MJ: float) -> None:
@@ -0,0 +1,137 @@
+"""A persistent store of feasibility study results (as from ``run_study``) in a local SQLite
+database, keyed by a hash of everything that a study's results depend on: the airliner's and UAV's
+spec parameters (including the fuel's), the airliner's reserve energy threshold and initial state,
+the route (including its legs' distances), and the refueling plan.
+
+Studies are only run when no results are stored for their key, such that changing one spec's
+parameters only reruns the studies that use it.
+"""
+
+from __future__ import annotations
+
+import json
+from itertools import pairwise
+from typing import Any, Dict, Literal, Optional, Type, Union
+
+import pandas as pd
+
+from src.airport_distances import get_airport_distance_matrix
+from src.feasibility_study.modeling_objects import BaseAirliner, Uav
+from src.feasibility_study.study_runner import run_study
+from src.results_cache import (
+    CachedResults,
+    connect_sqlite,
+    describe_airliner_spec,
+    describe_uav_spec,
+)
+
+STUDY_RESULTS = CachedResults("feasibility_study_results.sqlite", version=2)
+STUDY_RESULTS_DB_PATH = STUDY_RESULTS.path
+
+
+class StudyResultsStore:
+    def __init__(self, path: str = STUDY_RESULTS_DB_PATH):
+        self.connection = connect_sqlite(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS studies (key TEXT PRIMARY KEY, description TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS study_results ("
+                "key TEXT, idx INTEGER, time_into_flight_h REAL, waypoint TEXT, energy_MJ REAL, "
+                "PRIMARY KEY (key, idx))"
+            )
+        self.computed_keys: list[str] = []
+        """The keys of the studies run (rather than loaded) by this store."""
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> StudyResultsStore:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def run_study(
+        self,
+        airliner: BaseAirliner,
+        uav: Type[Uav],
+        origin_airport: str,
+        destination_airport: str,
+        n_refuels_by_waypoint: Optional[Dict[str, Union[int, Literal["auto"]]]] = {},
+    ) -> pd.DataFrame:
+        """Get the results of ``run_study`` from the store, running the study (and storing its
+        results) only if they are not stored yet. Either way, the airliner is left in its state at
+        the destination airport.
+        """
+
+        description = _describe_study(
+            airliner, uav, origin_airport, destination_airport, n_refuels_by_waypoint
+        )
+        key = STUDY_RESULTS.get_key(description)
+
+        rows = self.connection.execute(
+            "SELECT time_into_flight_h, waypoint, energy_MJ FROM study_results "
+            "WHERE key = ? ORDER BY idx",
+            (key,),
+        ).fetchall()
+        if rows:
+            results_df = pd.DataFrame(
+                rows, columns=["time_into_flight_h", "waypoint", "energy_MJ"]
+            )
+            results_df.index.name = "index"
+            airliner.time_into_flight_h = results_df["time_into_flight_h"].iloc[-1]
+            airliner.energy_quantity_MJ = results_df["energy_MJ"].iloc[-1]
+            return results_df
+
+        results_df = run_study(
+            airliner, uav, origin_airport, destination_airport, n_refuels_by_waypoint
+        )
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO studies VALUES (?, ?)",
+                (key, json.dumps(description, sort_keys=True)),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO study_results VALUES (?, ?, ?, ?, ?)",
+                (
+                    (key, i, float(t), str(w), float(e))
+                    for i, (t, w, e) in enumerate(
+                        zip(
+                            results_df["time_into_flight_h"],
+                            results_df["waypoint"],
+                            results_df["energy_MJ"],
+                        )
+                    )
+                ),
+            )
+        self.computed_keys.append(key)
+        return results_df
+
+
+def _describe_study(
+    airliner: BaseAirliner,
+    uav: Type[Uav],
+    origin_airport: str,
+    destination_airport: str,
+    n_refuels_by_waypoint: Dict[str, Union[int, Literal["auto"]]],
+) -> dict[str, Any]:
+    waypoints = [origin_airport, *n_refuels_by_waypoint.keys(), destination_airport]
+    airport_distances_km = get_airport_distance_matrix()
+    return dict(
+        airliner=dict(
+            **describe_airliner_spec(airliner),
+            reserve_energy_thres_MJ=float(airliner.reserve_energy_thres_MJ),
+            time_into_flight_h=float(airliner.time_into_flight_h),
+            energy_quantity_MJ=float(airliner.energy_quantity_MJ),
+        ),
+        uav=describe_uav_spec(uav),
+        waypoints=waypoints,
+        legs_distance_km=[
+            float(airport_distances_km[a, b]) for a, b in pairwise(waypoints)
+        ],
+        n_refuels_by_waypoint={
+            k: (v if v == "auto" else int(v)) for k, v in n_refuels_by_waypoint.items()
+        },
+    )
@@ -0,0 +1,254 @@
+"""Sensitivity analysis of a mission's landing energy margin, number of refuels, flight time, and
+refueling time to the fuel's, airliner's, and UAVs' parameters, without editing ``specs``.
+
+Each parameter is perturbed by each of a number of relative changes, one parameter at a time with
+the others at their baseline values. Every perturbation is a member of an ensemble, and the whole
+ensemble is flown along the route in a single vectorized pass (with ``evaluate_combinations``, as
+in the feasibility grid). The results are summarized as elasticities (the relative change in an
+output per relative change in a parameter) and as tornado chart data (the range of an output over
+each parameter's perturbations).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+from typing import Literal, Optional, Sequence, Type, get_args
+
+import numpy as np
+import pandas as pd
+
+from src import specs
+from src.airport_distances import get_airport_distance_matrix
+from src.airport_table import AirportCode
+from src.feasibility_study.feasibility_grid import (
+    AUTO_N_REFUELS,
+    RefuelPlan,
+    evaluate_combinations,
+)
+from src.feasibility_study.modeling_objects import (
+    BaseAirliner,
+    Fuel,
+    Uav,
+    calculate_energy_capacities_MJ,
+)
+from src.utils.utils import MJ_PER_KWH
+
+SensitivityParameter = Literal[
+    "energy_density_lhv_MJpL",
+    "density_kgpL",
+    "propulsion_efficiency",
+    "fuel_capacity_L",
+    "refueling_rate_kW",
+    "cruise_speed_kmph",
+]
+SENSITIVITY_PARAMETERS: tuple[SensitivityParameter, ...] = get_args(
+    SensitivityParameter
+)
+
+SensitivityOutput = Literal[
+    "landing_energy_margin_MJ", "n_refuels", "flight_time_h", "refueling_time_h"
+]
+SENSITIVITY_OUTPUTS: tuple[SensitivityOutput, ...] = get_args(SensitivityOutput)
+
+
+@dataclasses.dataclass
+class SensitivityAnalysis:
+    baseline: pd.Series
+    """The parameters' baseline values and the outputs with every parameter at its baseline value."""
+    ensemble: pd.DataFrame
+    """One row per perturbed ``parameter`` and ``relative_change``, with the parameter's (perturbed)
+    ``value``, the outputs, and whether the mission is ``feasible``.
+    """
+
+    def get_elasticities(self) -> pd.DataFrame:
+        """Get the elasticity of each output (column) to each parameter (row), by central
+        differences between the smallest negative and positive relative changes (or the baseline,
+        if there are only changes of one sign). Outputs that are zero at baseline have no
+        elasticity (NaN).
+        """
+
+        elasticities = {}
+        for parameter, df in self.ensemble.groupby("parameter", sort=False):
+            df = df.set_index("relative_change")
+            changes = df.index.to_numpy()
+            low = changes[changes < 0].max(initial=-np.inf)
+            high = changes[changes > 0].min(initial=np.inf)
+            low_outputs, high_outputs = (
+                self.baseline[list(SENSITIVITY_OUTPUTS)]
+                if np.isinf(change)
+                else df.loc[change, list(SENSITIVITY_OUTPUTS)]
+                for change in (low, high)
+            )
+            low, high = (0 if np.isinf(change) else change for change in (low, high))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                elasticities[parameter] = (
+                    (high_outputs - low_outputs).astype(float)
+                    / (high - low)
+                    / self.baseline[list(SENSITIVITY_OUTPUTS)]
+                    .astype(float)
+                    .replace(0, np.nan)
+                )
+        return pd.DataFrame.from_dict(elasticities, orient="index").rename_axis(
+            "parameter"
+        )
+
+    def get_tornado_data(self, output: SensitivityOutput) -> pd.DataFrame:
+        """Get the data of a tornado chart of the given output: its values at each parameter's most
+        negative (``low``) and most positive (``high``) relative changes, and their ``swing``, in
+        order of decreasing swing.
+        """
+
+        rows = []
+        for parameter, df in self.ensemble.groupby("parameter", sort=False):
+            df = df.set_index("relative_change").sort_index()
+            rows.append(
+                dict(
+                    parameter=parameter,
+                    low_change=df.index[0],
+                    high_change=df.index[-1],
+                    low=df[output].iloc[0],
+                    high=df[output].iloc[-1],
+                )
+            )
+        tornado_df = pd.DataFrame(rows).set_index("parameter")
+        tornado_df["baseline"] = self.baseline[output]
+        tornado_df["swing"] = (tornado_df["high"] - tornado_df["low"]).abs()
+        return tornado_df.sort_values("swing", ascending=False, kind="stable")
+
+
+def run_sensitivity_analysis(
+    airliner: Type[BaseAirliner],
+    uav: Type[Uav],
+    route: Sequence[AirportCode],
+    refueling_rate_kW: float,
+    reserve_energy_thres_MJ: float = 100e3,
+    refuel_plan: RefuelPlan = "auto",
+    fuel: Optional[Fuel] = None,
+    parameters: Sequence[SensitivityParameter] = SENSITIVITY_PARAMETERS,
+    relative_changes: Sequence[float] = (-0.2, -0.1, -0.05, 0.05, 0.1, 0.2),
+) -> SensitivityAnalysis:
+    """Perturb each of the ``parameters`` by each of the ``relative_changes`` (e.g., 0.1 for +10%),
+    with the airliner starting the route full and refueling at each of its intermediate waypoints
+    according to the ``refuel_plan``.
+
+    The fuel (by default, the airliner's own) is the airliner's and the UAVs' payload's. The
+    refueling rate only affects the ``refueling_time_h`` (the time for which the airliner is docked
+    with UAVs), as refuels are otherwise instantaneous; likewise, the cruise speed only affects the
+    times, as the airliner's energy consumption is per distance.
+    """
+
+    if any(change <= -1 for change in relative_changes):
+        raise ValueError("Relative changes must be greater than -1 (-100%).")
+    if fuel is None:
+        fuel = airliner.fuel
+
+    baseline_values: dict[SensitivityParameter, float] = dict(
+        energy_density_lhv_MJpL=fuel.energy_density_lhv_MJpL,
+        density_kgpL=fuel.density_kgpL,
+        propulsion_efficiency=airliner.propulsion.efficiency,
+        fuel_capacity_L=airliner.fuel_capacity_L,
+        refueling_rate_kW=refueling_rate_kW,
+        cruise_speed_kmph=airliner.cruise_speed_kmph,
+    )
+    # The ensemble's members: the baseline, followed by every parameter's every perturbation:
+    member_parameters = np.repeat(np.array(parameters), len(relative_changes))
+    member_changes = np.tile(np.asarray(relative_changes, dtype=float), len(parameters))
+    n_members = 1 + len(member_parameters)
+    values = {}
+    for parameter, baseline_value in baseline_values.items():
+        values[parameter] = np.full(n_members, float(baseline_value))
+        perturbed = np.r_[False, member_parameters == parameter]
+        values[parameter][perturbed] *= (
+            1 + member_changes[member_parameters == parameter]
+        )
+
+    airport_distances_km = get_airport_distance_matrix()
+    legs_distance_km = np.array(
+        [airport_distances_km[a, b] for a, b in itertools.pairwise(route)]
+    )
+    specific_energy_lhv_MJpkg = (
+        values["energy_density_lhv_MJpL"] / values["density_kgpL"]
+    )
+    results = evaluate_combinations(
+        dict(
+            cruise_speed_kmph=values["cruise_speed_kmph"],
+            energy_consumption_rate_MJ_per_km=np.full(
+                n_members, float(airliner.energy_consumption_rate_MJ_per_km)
+            ),
+            propulsion_efficiency=values["propulsion_efficiency"],
+            fuel_capacity_L=values["fuel_capacity_L"],
+            fuel_capacity_kg=np.full(n_members, float(airliner.fuel_capacity_kg)),
+            energy_density_lhv_MJpL=values["energy_density_lhv_MJpL"],
+            specific_energy_lhv_MJpkg=specific_energy_lhv_MJpkg,
+            payload_volume_L=np.full(n_members, float(uav.payload_volume_L)),
+            payload_capacity_kg=np.full(n_members, float(uav.payload_capacity_kg)),
+            reserve_energy_thres_MJ=np.full(n_members, float(reserve_energy_thres_MJ)),
+            legs_distance_km=np.broadcast_to(
+                legs_distance_km, (n_members, len(legs_distance_km))
+            ),
+            n_legs=np.full(n_members, len(legs_distance_km)),
+            n_refuels=np.full(
+                n_members, AUTO_N_REFUELS if refuel_plan == "auto" else refuel_plan
+            ),
+        )
+    )
+    refueling_energy_MJ = calculate_energy_capacities_MJ(
+        uav.payload_volume_L,
+        uav.payload_capacity_kg,
+        values["energy_density_lhv_MJpL"],
+        specific_energy_lhv_MJpkg,
+    )
+    outputs_df = pd.DataFrame(
+        dict(
+            landing_energy_margin_MJ=(
+                results["final_energy_MJ"] - reserve_energy_thres_MJ
+            ),
+            n_refuels=results["n_refuels"],
+            flight_time_h=results["flight_time_h"],
+            refueling_time_h=(
+                results["n_refuels"]
+                * refueling_energy_MJ
+                / (MJ_PER_KWH * values["refueling_rate_kW"])
+            ),
+            feasible=results["feasible"],
+        )
+    )
+
+    ensemble_df = pd.concat(
+        [
+            pd.DataFrame(
+                dict(
+                    parameter=member_parameters,
+                    relative_change=member_changes,
+                    value=np.select(
+                        [member_parameters == p for p in parameters],
+                        [values[p][1:] for p in parameters],
+                    ),
+                )
+            ),
+            outputs_df.iloc[1:].reset_index(drop=True),
+        ],
+        axis=1,
+    )
+    return SensitivityAnalysis(
+        baseline=pd.concat(
+            [pd.Series(baseline_values, dtype=float), outputs_df.iloc[0]]
+        ),
+        ensemble=ensemble_df,
+    )
+
+
+if __name__ == "__main__":
+    sensitivity_analysis = run_sensitivity_analysis(
+        airliner=specs.Lh2FueledA320,
+        uav=specs.At200,
+        route=["JFK", "PIT", "DEN", "LAX"],
+        refueling_rate_kW=2333333,
+        relative_changes=np.linspace(-0.2, 0.2, 41),
+    )
+    print(sensitivity_analysis.baseline.to_string())
+    print()
+    print(sensitivity_analysis.get_elasticities().to_string())
+    print()
+    print(sensitivity_analysis.get_tornado_data("landing_energy_margin_MJ").to_string())
@@ -0,0 +1,206 @@
+"""A table of the quantities derived from the airliner, UAV, and fuel specs (energy capacities,
+energy consumption rates, ranges, and what limits them), evaluated once per combination of spec
+and fuel rather than on every access.
+
+The entries are immutable, such that the study, the flyover airport optimization, and the
+simulation can all share them.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import types
+from typing import TYPE_CHECKING, Mapping, Optional, Type, Union
+
+from src.feasibility_study.modeling_objects import (
+    BaseAirliner,
+    Fuel,
+    LimitingFactor,
+    Uav,
+    calculate_energy_capacity,
+    calculate_fuel_energy_consumption_rate_MJ_per_km,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclasses.dataclass(frozen=True)
+class AirlinerSpecEntry:
+    airliner: Type[BaseAirliner]
+    fuel: Fuel
+    energy_capacity_MJ: float
+    limiting_factor: LimitingFactor
+    fuel_energy_consumption_rate_MJ_per_km: float
+    """Rate at which energy is drawn from the fuel at cruise, including propulsion losses."""
+    range_km_per_MJ: float
+    """Distance flown at cruise per MJ drawn from the fuel."""
+
+    @property
+    def range_km(self) -> float:
+        """Range on a full tank, with no reserve."""
+        return self.energy_capacity_MJ * self.range_km_per_MJ
+
+
+@dataclasses.dataclass(frozen=True)
+class UavSpecEntry:
+    uav: Type[Uav]
+    fuel: Fuel
+    refueling_energy_MJ: float
+    """Energy delivered per refuel (i.e., the energy capacity of the UAV's payload)."""
+    limiting_factor: LimitingFactor
+    energy_capacity_MJ: float
+    """Energy capacity of the UAV's own fuel tank, at its own fuel."""
+
+
+def get_airliner_spec_entry(
+    airliner: Union[Type[BaseAirliner], BaseAirliner], fuel: Optional[Fuel] = None
+) -> AirlinerSpecEntry:
+    """Get the derived quantities of an airliner spec, or of an airliner (whose attributes may
+    differ from its spec's), with the given fuel (by default, its own).
+    """
+
+    # Cached by the spec's parameters as well, such that entries follow changes to them (including
+    #     an airliner's own):
+    return _get_airliner_spec_entry(
+        airliner if isinstance(airliner, type) else type(airliner),
+        airliner.fuel if fuel is None else fuel,
+        airliner.fuel_capacity_L,
+        airliner.fuel_capacity_kg,
+        airliner.energy_consumption_rate_MJ_per_km,
+        airliner.propulsion.efficiency,
+    )
+
+
+@functools.cache
+def _get_airliner_spec_entry(
+    airliner: Type[BaseAirliner],
+    fuel: Fuel,
+    fuel_capacity_L: float,
+    fuel_capacity_kg: float,
+    energy_consumption_rate_MJ_per_km: float,
+    propulsion_efficiency: float,
+) -> AirlinerSpecEntry:
+    energy_capacity_MJ, limiting_factor = calculate_energy_capacity(
+        fuel_capacity_L, fuel_capacity_kg, fuel
+    )
+    fuel_energy_consumption_rate_MJ_per_km = (
+        calculate_fuel_energy_consumption_rate_MJ_per_km(
+            energy_consumption_rate_MJ_per_km, propulsion_efficiency
+        )
+    )
+    return AirlinerSpecEntry(
+        airliner=airliner,
+        fuel=fuel,
+        energy_capacity_MJ=energy_capacity_MJ,
+        limiting_factor=limiting_factor,
+        fuel_energy_consumption_rate_MJ_per_km=fuel_energy_consumption_rate_MJ_per_km,
+        range_km_per_MJ=1 / fuel_energy_consumption_rate_MJ_per_km,
+    )
+
+
+def get_uav_spec_entry(uav: Type[Uav], fuel: Fuel) -> UavSpecEntry:
+    """Get the derived quantities of a UAV spec refueling with the given fuel."""
+
+    return _get_uav_spec_entry(
+        uav,
+        fuel,
+        uav.payload_volume_L,
+        uav.payload_capacity_kg,
+        uav.fuel_capacity_L,
+        uav.fuel,
+    )
+
+
+@functools.cache
+def _get_uav_spec_entry(
+    uav: Type[Uav],
+    fuel: Fuel,
+    payload_volume_L: float,
+    payload_capacity_kg: float,
+    fuel_capacity_L: float,
+    own_fuel: Fuel,
+) -> UavSpecEntry:
+    refueling_energy_MJ, limiting_factor = calculate_energy_capacity(
+        payload_volume_L, payload_capacity_kg, fuel
+    )
+    return UavSpecEntry(
+        uav=uav,
+        fuel=fuel,
+        refueling_energy_MJ=refueling_energy_MJ,
+        limiting_factor=limiting_factor,
+        energy_capacity_MJ=fuel_capacity_L * own_fuel.energy_density_lhv_MJpL,
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class SpecTable:
+    airliner_entries: Mapping[tuple[str, str], AirlinerSpecEntry]
+    """Entries by (airliner, fuel) name."""
+    uav_entries: Mapping[tuple[str, str], UavSpecEntry]
+    """Entries by (UAV, fuel) name."""
+
+    def to_dfs(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Get the airliner and UAV entries as DataFrames, indexed by (spec, fuel) name."""
+
+        import pandas as pd
+
+        def _to_df(entries: Mapping, index_names: list[str]) -> pd.DataFrame:
+            return pd.DataFrame(
+                [
+                    {
+                        **{
+                            f.name: getattr(entry, f.name)
+                            for f in dataclasses.fields(entry)
+                            # The spec and fuel are in the index:
+                            if f.name not in ("airliner", "uav", "fuel")
+                        },
+                        **(
+                            {"range_km": entry.range_km}
+                            if isinstance(entry, AirlinerSpecEntry)
+                            else {}
+                        ),
+                    }
+                    for entry in entries.values()
+                ],
+                index=pd.MultiIndex.from_tuples(
+                    list(entries.keys()), names=index_names
+                ),
+            )
+
+        return (
+            _to_df(self.airliner_entries, ["airliner", "fuel"]),
+            _to_df(self.uav_entries, ["uav", "fuel"]),
+        )
+
+
+@functools.cache
+def get_spec_table() -> SpecTable:
+    """Get the table of every airliner and UAV spec (in ``specs``) with every fuel."""
+
+    from src import specs
+
+    return SpecTable(
+        airliner_entries=types.MappingProxyType(
+            {
+                (airliner.__name__, fuel_name): get_airliner_spec_entry(airliner, fuel)
+                for airliner in specs.airliners
+                for fuel_name, fuel in specs.fuel_lookup.items()
+            }
+        ),
+        uav_entries=types.MappingProxyType(
+            {
+                (uav.__name__, fuel_name): get_uav_spec_entry(uav, fuel)
+                for uav in specs.uavs
+                for fuel_name, fuel in specs.fuel_lookup.items()
+            }
+        ),
+    )
+
+
+if __name__ == "__main__":
+    airliners_df, uavs_df = get_spec_table().to_dfs()
+    print(airliners_df.to_string())
+    print()
+    print(uavs_df.to_string())
@@ -1,10 +1,16 @@
-from copy import deepcopy
+from itertools import pairwise
 from typing import Dict, Literal, Optional, Union
 
+import numpy as np
 import pandas as pd
 
-from src.feasibility_study.modeling_objects import BaseAirliner, Uav
-from src.specs import DISTANCE_KM_LOOKUP
+from src.airport_distances import get_airport_distance_matrix
+from src.feasibility_study.modeling_objects import (
+    BaseAirliner,
+    Uav,
+    calculate_n_refuels_needed,
+)
+from src.feasibility_study.spec_table import get_airliner_spec_entry, get_uav_spec_entry
 
 
 def run_study(
@@ -14,70 +20,98 @@ def run_study(
     destination_airport: str,
     n_refuels_by_waypoint: Optional[Dict[str, Union[int, Literal["auto"]]]] = {},
 ) -> pd.DataFrame:
+    """Fly the airliner from the origin airport to the destination airport via the waypoints in
+    ``n_refuels_by_waypoint``, refueling it at each waypoint with the given number of UAVs or, if
+    ``"auto"``, with as many UAVs as it needs to reach the next waypoint with its reserve energy (or
+    until it is full).
+
+    The number of refuels at each waypoint is calculated in closed form rather than by re-flying the
+    next leg once per refuel, and the airliner's energy and time trajectory is built up as arrays
+    (one element per flight leg or refuel) and only turned into a DataFrame once, at the end. As
+    before, the airliner is left in its state at the destination airport.
+    """
+
     waypoints = [
         origin_airport,
         *n_refuels_by_waypoint.keys(),
         destination_airport,
     ]
+    airport_distances_km = get_airport_distance_matrix()
 
-    ser = pd.DataFrame(
-        columns=[
-            "index",
-            "time_into_flight_h",
-            "waypoint",
-            "energy_MJ",
-        ]
-    ).set_index(["index", "time_into_flight_h", "waypoint"])["energy_MJ"]
-
-    ser.loc[(len(ser), airliner.time_into_flight_h, waypoints[0])] = (
-        airliner.energy_quantity_MJ
+    legs_distance_km = np.array(
+        [airport_distances_km[a, b] for a, b in pairwise(waypoints)]
     )
+    airliner_spec_entry = get_airliner_spec_entry(airliner)
+    legs_duration_h = legs_distance_km / airliner.cruise_speed_kmph
+    legs_energy_MJ = (
+        airliner_spec_entry.fuel_energy_consumption_rate_MJ_per_km * legs_distance_km
+    )
+    if len(waypoints) > 2:
+        refueling_energy_MJ = get_uav_spec_entry(uav, airliner.fuel).refueling_energy_MJ
+        energy_capacity_MJ = airliner_spec_entry.energy_capacity_MJ
+
+    time_into_flight_h = airliner.time_into_flight_h
+    energy_quantity_MJ = airliner.energy_quantity_MJ
+    times_into_flight_h = [np.array([time_into_flight_h])]
+    energy_quantities_MJ = [np.array([energy_quantity_MJ])]
 
     for i in range(len(waypoints) - 1):
-        distance_km = DISTANCE_KM_LOOKUP[waypoints[i], waypoints[i + 1]]
-        airliner.fly(distance_km)
+        time_into_flight_h += legs_duration_h[i]
+        energy_quantity_MJ -= legs_energy_MJ[i]
+
+        if i < len(waypoints) - 2:
+            n_refuels = n_refuels_by_waypoint[waypoints[i + 1]]
+            if n_refuels == "auto":
+                n_refuels = calculate_n_refuels_needed(
+                    energy_quantity_MJ,
+                    next_leg_energy_MJ=legs_energy_MJ[i + 1],
+                    reserve_energy_thres_MJ=airliner.reserve_energy_thres_MJ,
+                    energy_capacity_MJ=energy_capacity_MJ,
+                    refueling_energy_MJ=refueling_energy_MJ,
+                )
+            waypoint_energy_quantities_MJ = _refuel(
+                energy_quantity_MJ, n_refuels, refueling_energy_MJ, energy_capacity_MJ
+            )
+        else:
+            waypoint_energy_quantities_MJ = np.array([energy_quantity_MJ])
 
-        ser.loc[(len(ser), airliner.time_into_flight_h, waypoints[i + 1])] = (
-            airliner.energy_quantity_MJ
+        times_into_flight_h.append(
+            np.full(len(waypoint_energy_quantities_MJ), time_into_flight_h)
         )
+        energy_quantities_MJ.append(waypoint_energy_quantities_MJ)
+        energy_quantity_MJ = waypoint_energy_quantities_MJ[-1]
 
-        def update_ser():
-            ser.loc[len(ser), airliner.time_into_flight_h, waypoints[i + 1]] = (
-                airliner.energy_quantity_MJ
-            )
+    airliner.time_into_flight_h = time_into_flight_h
+    airliner.energy_quantity_MJ = energy_quantity_MJ
 
-        if i < len(waypoints) - 2:
-            if n_refuels_by_waypoint[waypoints[i + 1]] == "auto":
-                while True:
-                    tmp_airliner = deepcopy(airliner)
-                    tmp_airliner.fly(
-                        distance_km=DISTANCE_KM_LOOKUP[
-                            waypoints[i + 1], waypoints[i + 2]
-                        ]
-                    )
-                    if (
-                        tmp_airliner.energy_quantity_MJ
-                        < tmp_airliner.reserve_energy_thres_MJ
-                        and airliner.energy_quantity_MJ < airliner.energy_capacity_MJ
-                    ):
-                        airliner.refuel(
-                            energy_quantity_MJ=uav.refueling_energy_capacity_MJ(
-                                fuel=airliner.fuel
-                            )
-                        )
-                        update_ser()
-                    else:
-                        break
-            else:
-                n_refuels = n_refuels_by_waypoint[waypoints[i + 1]]
-                for j in range(n_refuels):
-                    airliner.refuel(
-                        energy_quantity_MJ=uav.refueling_energy_capacity_MJ(
-                            fuel=airliner.fuel
-                        )
-                    )
-                    update_ser()
-
-    results_df = ser.reset_index().set_index("index")
+    results_df = pd.DataFrame(
+        {
+            "time_into_flight_h": np.concatenate(times_into_flight_h),
+            "waypoint": np.repeat(
+                np.array(waypoints, dtype=object),
+                [len(x) for x in energy_quantities_MJ],
+            ),
+            "energy_MJ": np.concatenate(energy_quantities_MJ),
+        }
+    )
+    results_df.index.name = "index"
 
     return results_df
+
+
+def _refuel(
+    energy_quantity_MJ: float,
+    n_refuels: int,
+    refueling_energy_MJ: float,
+    energy_capacity_MJ: float,
+) -> np.ndarray:
+    """Get the airliner's energy quantity before and after each of ``n_refuels`` consecutive
+    refuels, none of which can fill it beyond its capacity.
+    """
+
+    # Accumulate sequentially (as `BaseAirliner.refuel` would) such that the results are identical:
+    energy_quantities_MJ = np.cumsum(
+        np.r_[energy_quantity_MJ, np.full(n_refuels, refueling_energy_MJ)]
+    )
+    energy_quantities_MJ[1:] = np.minimum(energy_quantities_MJ[1:], energy_capacity_MJ)
+    return energy_quantities_MJ
@@ -2,38 +2,57 @@ from __future__ import annotations
 
 import dataclasses
 import datetime as dt
+import functools
 from copy import deepcopy
-from typing import Literal, Optional, Type
+from typing import TYPE_CHECKING, Iterator, Literal, Mapping, Optional, Type
 
 import numpy as np
-import pandas as pd
 
+from src.airport_table import KM_PER_LAT_LON, AirportCode, get_airport_table
 from src.feasibility_study.modeling_objects import BaseAirliner as AirlinerSpec
 from src.feasibility_study.modeling_objects import BaseAirplane as AirplaneSpec
 from src.feasibility_study.modeling_objects import Fuel
 from src.feasibility_study.modeling_objects import Uav as UavSpec
+from src.feasibility_study.spec_table import get_airliner_spec_entry, get_uav_spec_entry
 from src.three_d_sim.simulation_config_schema import (
     AirlinerConfig,
     AirlinerFlightPathConfig,
 )
 from src.three_d_sim.viz_models import ModelConfig
+from src.utils.geodesy import great_circle_interpolate, haversine_distance_km
 from src.utils.utils import (
     M_PER_KM,
     MJ_PER_KWH,
     SECONDS_PER_HOUR,
-    cosd,
-    sind,
     timedelta_to_minutes,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # ==================================================================================================
 # Geographical objects
 
-KM_PER_LAT_LON = 111.19492664455873
-AIRPORT_LOCATIONS_CSV_PATH = "src/three_d_sim/airport_locations.csv"
-AirportCode = str
 ServiceSide = Literal["to-airport", "from-airport"]
 
+# Whether direct distances (and so travel durations and energy consumption) are measured between
+#     true geographic (lat, lon) coordinates, along great circles, rather than between (lat, lon)
+#     coordinates treated as cartesian coordinates. Flight paths are laid out in the latter either
+#     way.
+TRUE_LAT_LON = False
+
+
+def xy_km_to_lat_lon(
+    x_km: np.ndarray, y_km: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    origin_x_km, origin_y_km = ALL_AIRPORT_LOCATIONS.coords_origin_km
+    return (y_km + origin_y_km) / KM_PER_LAT_LON, (x_km + origin_x_km) / KM_PER_LAT_LON
+
+
+def lat_lon_to_xy_km(lat: np.ndarray, lon: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    origin_x_km, origin_y_km = ALL_AIRPORT_LOCATIONS.coords_origin_km
+    return lon * KM_PER_LAT_LON - origin_x_km, lat * KM_PER_LAT_LON - origin_y_km
+
 
 @dataclasses.dataclass
 class Location:
@@ -56,27 +75,29 @@ class Location:
     def xyz_coords(self) -> np.ndarray:
         return np.array([self.X_KM, self.Y_KM, self.ALTITUDE_KM])
 
+    @property
+    def LAT(self) -> float:
+        return xy_km_to_lat_lon(self.X_KM, self.Y_KM)[0]
+
+    @property
+    def LON(self) -> float:
+        return xy_km_to_lat_lon(self.X_KM, self.Y_KM)[1]
+
     @staticmethod
-    def direct_distance_km_between(a: Location, b: Location) -> float:
-        """Get the direct ('as-the-crow-flies') distance between two coordinate locations."""
+    def direct_distance_km_between(
+        a: Location, b: Location, true_lat_lon: bool | None = None
+    ) -> float:
+        """Get the direct ('as-the-crow-flies') distance between two coordinate locations.
 
-        TRUE_LAT_LON = False
-        if TRUE_LAT_LON:
+        ``true_lat_lon`` defaults to ``TRUE_LAT_LON``.
+        """
+
+        if true_lat_lon is None:
+            true_lat_lon = TRUE_LAT_LON
+        if true_lat_lon:
             # Distance between true geographic (lat, lon) coordinates:
-            # https://www.omnicalculator.com/other/latitude-longitude-distance
-
-            EARTH_RADIUS_KM = 6371
-            # TODO: Change when optimizing EV taxis operations on Mars.
-
-            direct_ground_distance_km = (
-                2
-                * EARTH_RADIUS_KM
-                * np.arcsin(
-                    np.sqrt(
-                        sind((b.LAT - a.LAT) / 2) ** 2
-                        + cosd(a.LAT) * cosd(b.LAT) * sind((b.LON - a.LON) / 2) ** 2
-                    )
-                )
+            direct_ground_distance_km = haversine_distance_km(
+                a.LAT, a.LON, b.LAT, b.LON
             )
         else:
             # Distance between (lat, lon) coordinates treated as cartesian coordinates:
@@ -88,41 +109,91 @@ class Location:
 
         return direct_distance_km
 
+    @staticmethod
+    def direct_distances_km_between(
+        a_xyz_coords: np.ndarray,
+        b_xyz_coords: np.ndarray,
+        true_lat_lon: bool | None = None,
+    ) -> np.ndarray:
+        """Vectorized ``direct_distance_km_between``, for arrays of (x, y, altitude) coordinates of
+        shape (..., 3) that broadcast against one another.
+        """
+
+        if true_lat_lon is None:
+            true_lat_lon = TRUE_LAT_LON
+        delta_altitude_km = b_xyz_coords[..., 2] - a_xyz_coords[..., 2]
+        if true_lat_lon:
+            direct_ground_distance_km = haversine_distance_km(
+                *xy_km_to_lat_lon(a_xyz_coords[..., 0], a_xyz_coords[..., 1]),
+                *xy_km_to_lat_lon(b_xyz_coords[..., 0], b_xyz_coords[..., 1]),
+            )
+        else:
+            direct_ground_distance_km = np.hypot(
+                b_xyz_coords[..., 0] - a_xyz_coords[..., 0],
+                b_xyz_coords[..., 1] - a_xyz_coords[..., 1],
+            )
+        return np.hypot(direct_ground_distance_km, delta_altitude_km)
+
 
 @dataclasses.dataclass(kw_only=True)
 class AirportLocation(Location):
     CODE: AirportCode
 
 
+class AirportLocations(Mapping[AirportCode, AirportLocation]):
+    """The airports in the airport table by code, with the table only loaded upon first use and an
+    ``AirportLocation`` only made for each airport that is actually used.
+    """
+
+    def __init__(self, normalize_coords: bool = False):
+        self.normalize_coords = normalize_coords
+        self._airport_locations: dict[AirportCode, AirportLocation] = {}
+
+    @functools.cached_property
+    def coords_origin_km(self) -> tuple[float, float]:
+        """The cartesian (x, y) coordinates of the origin relative to which airports' coordinates
+        are normalized (i.e., the center of the airports' bounding box), if they are.
+        """
+
+        if not self.normalize_coords:
+            return 0.0, 0.0
+        airport_table = get_airport_table()
+        x_km = airport_table.lon * KM_PER_LAT_LON
+        y_km = airport_table.lat * KM_PER_LAT_LON
+        return (
+            float(x_km.min() + x_km.max()) / 2,
+            float(y_km.min() + y_km.max()) / 2,
+        )
+
+    def __getitem__(self, airport_code: AirportCode) -> AirportLocation:
+        airport_location = self._airport_locations.get(airport_code)
+        if airport_location is None:
+            airport_table = get_airport_table()
+            idx = airport_table.idxs[airport_code]
+            origin_x_km, origin_y_km = self.coords_origin_km
+            airport_location = AirportLocation(
+                Y_KM=(float(airport_table.lat[idx]) * KM_PER_LAT_LON - origin_y_km),
+                X_KM=(float(airport_table.lon[idx]) * KM_PER_LAT_LON - origin_x_km),
+                ALTITUDE_KM=float(airport_table.altitude_km[idx]),
+                CODE=airport_code,
+            )
+            self._airport_locations[airport_code] = airport_location
+        return airport_location
+
+    def __iter__(self) -> Iterator[AirportCode]:
+        return iter(get_airport_table().codes.tolist())
+
+    def __len__(self) -> int:
+        return len(get_airport_table())
+
+
 def get_all_airport_locations(
     normalize_coords: bool = False,
 ) -> dict[AirportCode, AirportLocation]:
-    DEFAULT_ALTITUDE = 0.0
-
-    airport_location_df = pd.read_csv(AIRPORT_LOCATIONS_CSV_PATH)
-    all_airport_locations = {
-        row["airport_code"]: AirportLocation(
-            Y_KM=(row["lat"] * KM_PER_LAT_LON),
-            X_KM=(row["lon"] * KM_PER_LAT_LON),
-            ALTITUDE_KM=row.get("altitude", DEFAULT_ALTITUDE),
-            CODE=row["airport_code"],
-        )
-        for row in airport_location_df.to_dict("records")
-    }
-    if normalize_coords:
-        min_y_km, max_y_km = [
-            m(loc.Y_KM for loc in all_airport_locations.values()) for m in [min, max]
-        ]
-        min_x_km, max_x_km = [
-            m(loc.X_KM for loc in all_airport_locations.values()) for m in [min, max]
-        ]
-        for loc in all_airport_locations.values():
-            loc.Y_KM = loc.Y_KM - (min_y_km + max_y_km) / 2
-            loc.X_KM = loc.X_KM - (min_x_km + max_x_km) / 2
-    return all_airport_locations
+    return dict(AirportLocations(normalize_coords))
 
 
-ALL_AIRPORT_LOCATIONS = get_all_airport_locations(normalize_coords=True)
+ALL_AIRPORT_LOCATIONS = AirportLocations(normalize_coords=True)
 
 
 @dataclasses.dataclass
@@ -159,14 +230,23 @@ class Waypoint:
         self, origin: Location, duration_traveled_so_far: dt.timedelta
     ) -> Location:
         """Get the en route location after traveling for a specified duration directly from a given
-        origin location to the waypoint's location.
-
-        Note: For (latitude, longitude) coordinates, this is only an approximation.
+        origin location to the waypoint's location (along a great circle if ``TRUE_LAT_LON``).
         """
 
         en_route_coords = origin.coords + (
             self.LOCATION.coords - origin.coords
         ) * duration_traveled_so_far / self.get_direct_travel_timedelta(origin)
+        if TRUE_LAT_LON:
+            lat, lon = great_circle_interpolate(
+                origin.LAT,
+                origin.LON,
+                self.LOCATION.LAT,
+                self.LOCATION.LON,
+                fractions=(
+                    duration_traveled_so_far / self.get_direct_travel_timedelta(origin)
+                ),
+            )
+            en_route_coords[:2] = lat_lon_to_xy_km(lat, lon)
 
         return Location(*en_route_coords)
 
@@ -305,19 +385,20 @@ class Airplane:
     waypoints: list[Waypoint] = dataclasses.field(init=False)
 
     def __post_init__(self):
-        self.energy_capacity_MJ = self.airplane_spec.energy_capacity_MJ
         self.energy_consumption_rate_MJ_per_km = self.airplane_spec.energy_consumption_rate_MJ_per_km
         self.energy_level_pc = deepcopy(self.initial_energy_level_pc)
         self.location = None
         self.heading = None
         self.waypoints = []
 
+    def iter_locations(self) -> Iterator[np.ndarray]:
+        yield self.location.xyz_coords
+        for wp in self.waypoints:
+            yield wp.LOCATION.xyz_coords
+
     @property
-    def all_locations(self) -> list[Location]:
-        return [
-            loc.xyz_coords
-            for loc in [self.location] + [wp.LOCATION for wp in self.waypoints]
-        ]
+    def all_locations(self) -> list[np.ndarray]:
+        return list(self.iter_locations())
 
     def set_heading(self, to_waypoint: Waypoint) -> np.ndarray:
         heading = to_waypoint.LOCATION.xyz_coords - self.location.xyz_coords
@@ -356,6 +437,8 @@ class Airplane:
         }
 
     def get_elapsed_time_at_tagged_waypoints_ser(self, decimals: int = 1) -> pd.Series:
+        import pandas as pd
+
         ser = (
             pd.Series(self.get_elapsed_time_at_tagged_waypoints()).apply(
                 timedelta_to_minutes
@@ -423,6 +506,13 @@ class Airliner(Airplane):
     flight_path: AirlinerFlightPath | None = None
     docked_uav: AirplaneId | None = None
 
+    def __post_init__(self):
+        self.energy_capacity_MJ = get_airliner_spec_entry(
+            self.airplane_spec
+        ).energy_capacity_MJ
+
+        super().__post_init__()
+
 
 @dataclasses.dataclass(kw_only=True)
 class Uav(Airplane):
@@ -436,7 +526,9 @@ class Uav(Airplane):
     refueling_energy_level_pc: float = dataclasses.field(init=False)
 
     def __post_init__(self):
-        self.refueling_energy_capacity_MJ = self.airplane_spec.refueling_energy_capacity_MJ(self.payload_fuel)
+        uav_spec_entry = get_uav_spec_entry(self.airplane_spec, self.payload_fuel)
+        self.energy_capacity_MJ = uav_spec_entry.energy_capacity_MJ
+        self.refueling_energy_capacity_MJ = uav_spec_entry.refueling_energy_MJ
         self.refueling_energy_level_pc = deepcopy(self.initial_refueling_energy_level_pc)
 
         super().__post_init__()
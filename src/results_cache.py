@@ -0,0 +1,111 @@
+"""Results cached across sessions in the cache directory (feasibility studies' results, recorded
+simulation runs, and parameter sweeps' KPIs), keyed by a hash of a description of everything they
+depend on.
+
+Descriptions include the values of the airliner's and UAV's specs (and their fuels) rather than
+their names, such that editing a spec in ``specs.py`` invalidates the results that depend on it.
+Changes to the code that computes the results are not described, and call for incrementing the
+results' ``version`` instead.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+from typing import TYPE_CHECKING, Any, Mapping, Type, Union
+
+from src.airport_table import CACHE_DIR
+from src.feasibility_study.modeling_objects import BaseAirliner, Fuel, Uav
+
+if TYPE_CHECKING:
+    from src.three_d_sim.simulation_config_schema import SimulationConfig
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedResults:
+    name: str
+    """Name of the results' file or directory in the cache directory."""
+    version: int
+    """To be incremented whenever the results change for the same description (i.e., whenever the
+    code that computes them changes), such that results stored previously are no longer used.
+    """
+
+    @property
+    def path(self) -> str:
+        return os.path.join(CACHE_DIR, self.name)
+
+    def get_key(self, description: Mapping[str, Any], length: int = 64) -> str:
+        """Get the key of the results of a description, as from the ``describe_*`` functions."""
+
+        return hashlib.sha256(
+            json.dumps(
+                dict(version=self.version, description=description), sort_keys=True
+            ).encode()
+        ).hexdigest()[:length]
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """Connect to a SQLite database, creating its directory if need be."""
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return sqlite3.connect(path)
+
+
+def describe_fuel(fuel: Fuel) -> dict[str, float]:
+    return dict(
+        energy_density_lhv_MJpL=float(fuel.energy_density_lhv_MJpL),
+        density_kgpL=float(fuel.density_kgpL),
+    )
+
+
+def describe_airliner_spec(
+    airliner: Union[Type[BaseAirliner], BaseAirliner],
+) -> dict[str, Any]:
+    """Describe an airliner spec, or an airliner (whose attributes may differ from its spec's), by
+    the values of its parameters.
+    """
+
+    return dict(
+        cruise_speed_kmph=float(airliner.cruise_speed_kmph),
+        fuel_capacity_L=float(airliner.fuel_capacity_L),
+        fuel_capacity_kg=float(airliner.fuel_capacity_kg),
+        energy_consumption_rate_MJ_per_km=float(
+            airliner.energy_consumption_rate_MJ_per_km
+        ),
+        propulsion_efficiency=float(airliner.propulsion.efficiency),
+        fuel=describe_fuel(airliner.fuel),
+    )
+
+
+def describe_uav_spec(uav: Type[Uav]) -> dict[str, Any]:
+    """Describe a UAV spec by the values of its parameters."""
+
+    return dict(
+        cruise_speed_kmph=float(uav.cruise_speed_kmph),
+        fuel_capacity_L=float(uav.fuel_capacity_L),
+        energy_consumption_rate_MJ_per_km=float(uav.energy_consumption_rate_MJ_per_km),
+        propulsion_efficiency=float(uav.propulsion.efficiency),
+        fuel=describe_fuel(uav.fuel),
+        payload_volume_L=float(uav.payload_volume_L),
+        payload_capacity_kg=float(uav.payload_capacity_kg),
+    )
+
+
+def describe_simulation_config(simulation_config: SimulationConfig) -> dict[str, Any]:
+    """Describe a config's (headless) simulation: the config, normalized (e.g., with numbers as
+    floats), without its ``viz_config`` (which does not affect the simulation), and with the values
+    of the airliner's and UAVs' specs.
+
+    Must be called before the config's timepoints are evaluated.
+    """
+
+    return dict(
+        config=simulation_config.model_dump(mode="json", exclude={"viz_config"}),
+        airliner_spec=describe_airliner_spec(
+            simulation_config.airliner_config.airplane_spec
+        ),
+        uav_spec=describe_uav_spec(simulation_config.uavs_config.airplane_spec),
+    )
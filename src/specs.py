@@ -108,12 +108,10 @@ uavs = [
 ]
 airliner_lookup: Dict[str, Type[BaseAirliner]] = {x.__name__: x for x in airliners}
 uav_lookup: Dict[str, Type[Uav]] = {x.__name__: x for x in uavs}
-
-
-KM_PER_MILE = 1.609344
-DISTANCE_KM_LOOKUP = {
-    ("JFK", "LAX"): 2468 * KM_PER_MILE,
-    ("JFK", "PIT"): 338 * KM_PER_MILE,
-    ("PIT", "DEN"): 1286 * KM_PER_MILE,
-    ("DEN", "LAX"): 860 * KM_PER_MILE,
+fuel_lookup: Dict[str, Fuel] = {
+    "jet_a1_fuel": jet_a1_fuel,
+    "lh2_fuel": lh2_fuel,
+    "lion_fuel": lion_fuel,
+    "lipo_fuel": lipo_fuel,
+    "avgas": avgas,
 }
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from copy import deepcopy
-from typing import Any, Literal, Optional
+from itertools import chain, repeat
+from typing import Any, Iterator, Literal, Optional
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 from src.modeling_objects import (
@@ -22,6 +22,11 @@ from src.modeling_objects import (
 )
 from src.three_d_sim.planar_curve_points_generation import generate_planar_curve_points
 
+# Spacing between the UAVs' takeoff/landing points at their airport:
+UAV_AIRPORT_SPACING_KM = 0.015
+# Speed of the airliner through its curves over flyover airports:
+AIRLINER_CURVE_SPEED_KMPH = 300  # TODO
+
 
 def _unit_vector(vector: np.ndarray) -> np.ndarray:
     norm = np.linalg.norm(vector)
@@ -36,6 +41,35 @@ def _intermediate_point_between(
     return point1 + _unit_vector(vector) * intermediate_distance
 
 
+def _intermediate_points_between(
+    point1: np.ndarray, point2: np.ndarray, intermediate_distances: np.ndarray
+) -> np.ndarray:
+    """Vectorized `_intermediate_point_between`, with one intermediate point (row) per
+    intermediate distance.
+    """
+    vector = point2 - point1
+    return point1 + _unit_vector(vector) * intermediate_distances[:, np.newaxis]
+
+
+def _make_waypoints(
+    points: np.ndarray,
+    speeds_kmph: Any,
+    altitude_km: Optional[float] = None,
+    **waypoint_kwargs,
+) -> list[Waypoint]:
+    """Make a waypoint at each point (row) of an array of xyz (or xy, with `altitude_km`) points,
+    at each of an array of speeds or at a single speed.
+    """
+    if np.ndim(speeds_kmph) == 0:
+        speeds_kmph = repeat(speeds_kmph)
+    location_kwargs = {} if altitude_km is None else dict(ALTITUDE_KM=altitude_km)
+    # (Iterating over columns rather than rows, as making the waypoints takes most of the time.)
+    return [
+        Waypoint(Location(*coords, **location_kwargs), speed_kmph, **waypoint_kwargs)
+        for *coords, speed_kmph in zip(*points.T, speeds_kmph)
+    ]
+
+
 def orthogonal_xy_vector(vector: np.ndarray) -> np.ndarray:
     vector2 = deepcopy(vector)
     vector2[1], vector2[0] = -vector2[0], vector2[1]
@@ -63,14 +97,13 @@ def _gen_speed_change_waypoints(
     num: int = 50,
     **waypoint_kwargs,
 ) -> list[Waypoint]:
-    distance_km = Location.direct_distance_km_between(start_location, end_location)
+    distance_km = Location.direct_distance_km_between(
+        start_location, end_location, true_lat_lon=False
+    )
     intermediate_distances_km = np.linspace(0, distance_km, num + 1)[1:]
-    intermediate_points = [
-        _intermediate_point_between(
-            start_location.xyz_coords, end_location.xyz_coords, d
-        )
-        for d in intermediate_distances_km
-    ]
+    intermediate_points = _intermediate_points_between(
+        start_location.xyz_coords, end_location.xyz_coords, intermediate_distances_km
+    )
     acceleration_kmphph = (end_speed_kmph**2 - start_speed_kmph**2) / (2 * distance_km)
     intermediate_speeds_kmph = np.sqrt(
         start_speed_kmph**2
@@ -78,10 +111,9 @@ def _gen_speed_change_waypoints(
         * acceleration_kmphph
         * (intermediate_distances_km - (distance_km / num) / 2)
     )
-    intermediate_waypoints = [
-        Waypoint(Location(*point), speed_kmph, **waypoint_kwargs)
-        for point, speed_kmph in zip(intermediate_points, intermediate_speeds_kmph)
-    ]
+    intermediate_waypoints = _make_waypoints(
+        intermediate_points, intermediate_speeds_kmph, **waypoint_kwargs
+    )
     return intermediate_waypoints
 
 
@@ -93,7 +125,9 @@ def _gen_tmp_speed_change_waypoints(
     num: int = 50,
     **waypoint_kwargs,
 ) -> list[Waypoint]:
-    distance_km = Location.direct_distance_km_between(start_location, end_location)
+    distance_km = Location.direct_distance_km_between(
+        start_location, end_location, true_lat_lon=False
+    )
     halfway_location = Location(
         *_intermediate_point_between(
             start_location.xyz_coords, end_location.xyz_coords, distance_km / 2
@@ -157,16 +191,13 @@ def _gen_vertical_curve_waypoints(
         leveled_altitude_km + sign * r * np.c_[1 - np.cos(tangent_angles)],
     ]
     if direction == "from-tangent":
-        curve_3d_points = reversed(curve_3d_points)
+        curve_3d_points = curve_3d_points[::-1]
     zero_angle_of_attack = (sense == "curve-up" and direction == "from-tangent") or (
         sense == "curve-down" and direction == "to-tangent"
     )
-    curve_waypoints = [
-        Waypoint(
-            Location(*point), speed_kmph, ZERO_ANGLE_OF_ATTACK=zero_angle_of_attack
-        )
-        for point in curve_3d_points
-    ]
+    curve_waypoints = _make_waypoints(
+        curve_3d_points, speed_kmph, ZERO_ANGLE_OF_ATTACK=zero_angle_of_attack
+    )
     return curve_waypoints
 
 
@@ -263,7 +294,7 @@ def _gen_altitude_transition_waypoints(
     waypoints += climb_leveling_waypoints
 
     if inverted:
-        waypoints = list(reversed(waypoints))
+        waypoints.reverse()
     return waypoints
 
 
@@ -316,12 +347,11 @@ def _gen_takeoff_or_landing_waypoints(
         altitude_transition_waypoints[0].LOCATION.TAG = f"{airplane_id}_descent_point"
         altitude_transition_waypoints[-1].LOCATION.TAG = f"{airplane_id}_landing_point"
         speed_change_waypoints[-1].LOCATION.TAG = f"{airplane_id}_landed_point"
-        waypoints = altitude_transition_waypoints + list(
-            reversed(speed_change_waypoints)
-        )
+        speed_change_waypoints.reverse()
+        waypoints = altitude_transition_waypoints + speed_change_waypoints
 
     if inverted:
-        waypoints = list(reversed(waypoints))
+        waypoints.reverse()
     return waypoints
 
 
@@ -386,7 +416,9 @@ def _generate_uav_waypoints(
     )
 
     d = Location.direct_distance_km_between(
-        Location(*altitude_transition_waypoints[0].LOCATION.xy_coords), airport_B
+        Location(*altitude_transition_waypoints[0].LOCATION.xy_coords),
+        airport_B,
+        true_lat_lon=False,
     )
     r = uav_fp.arc_radius_km
 
@@ -414,6 +446,8 @@ def _generate_uav_waypoints(
     uav_arc_points = O + abs(r) * np.c_[np.cos(phis), np.sin(phis)]
 
     if plot:
+        import matplotlib.pyplot as plt
+
         plt.plot(*np.c_[A, B], ".-")
         # plt.plot(*np.c_[B, C, D, uav_arc_points.T, H, B], ".-")
         plt.plot(*np.c_[O], ".-")
@@ -421,13 +455,9 @@ def _generate_uav_waypoints(
         ax.axis("equal")
         plt.show(block=False)
 
-    uav_arc_waypoints = [
-        Waypoint(
-            Location(*xy, ALTITUDE_KM=uav_fp.cruise_altitude_km),
-            uav_fp.cruise_speed_kmph,
-        )
-        for i, xy in enumerate(uav_arc_points)
-    ]
+    uav_arc_waypoints = _make_waypoints(
+        uav_arc_points, uav_fp.cruise_speed_kmph, altitude_km=uav_fp.cruise_altitude_km
+    )
 
     takeoff_or_landing_waypoints = _gen_takeoff_or_landing_waypoints(
         airplane_id=uav_id,
@@ -462,19 +492,27 @@ def _generate_uav_waypoints(
     )
 
     if uav_fp_half == "second-half":
-        uav_waypoints = list(reversed(uav_waypoints))
+        uav_waypoints.reverse()
         # uav_waypoints.append(Waypoint(Location(*B), uav_fp.CRUISE_SPEED_KMPH))
 
     return uav_waypoints
 
 
-def generate_all_uav_waypoints(
+def generate_uav_waypoint_segments(
     uav_id: AirplaneId,
     j: int,
     n_uavs: int,
     uav_fp: UavFlightPath,
     airliner_fp: AirlinerFlightPath,
-) -> list[Waypoint]:
+) -> Iterator[list[Waypoint]]:
+    """Generate a UAV's waypoints lazily, one flight path segment (takeoff, arc, docking, etc.) at
+    a time, rather than concatenating the segments into intermediate lists.
+
+    Note that ``make_airplanes`` still materializes the whole path into ``Airplane.waypoints``,
+    since the travel durations to tagged waypoints (e.g., in ``delay_uavs``) are needed before the
+    simulation starts; an airplane's memory is therefore proportional to its number of waypoints.
+    """
+
     uav_airport = uav_fp.home_airport
     prev_airliner_airport = airliner_fp.airports[
         airliner_fp.airports.index(uav_airport) - 1
@@ -487,31 +525,32 @@ def generate_all_uav_waypoints(
         if uav_fp.service_side == "to_airport"
         else next_airliner_airport_location
     )
-    waypoints: list[Waypoint] = []
-    waypoints.append(
-        Waypoint(
-            LOCATION=Location(
-                *_intermediate_point_between(
-                    uav_airport.xy_coords,
-                    airport_A.xy_coords,
-                    intermediate_distance=(0.015 * (n_uavs - j)),
-                )
+    first_waypoint = Waypoint(
+        LOCATION=Location(
+            *_intermediate_point_between(
+                uav_airport.xy_coords,
+                airport_A.xy_coords,
+                intermediate_distance=(UAV_AIRPORT_SPACING_KM * (n_uavs - j)),
             )
         )
     )
+    first_waypoint.LOCATION.TAG = f"{uav_id}_first_point"
+    yield [first_waypoint]
+
     if uav_fp.service_side == "to_airport":
-        waypoints += _generate_uav_waypoints(
+        segment = _generate_uav_waypoints(
             airport_A=prev_airliner_airport,
-            airport_B=waypoints[0].LOCATION,
+            airport_B=first_waypoint.LOCATION,
             uav_id=uav_id,
             uav_fp=uav_fp,
             uav_fp_half="first-half",
         )
+        yield segment
         # UAV takes off from airliner:
         altitude_transition_waypoints = _gen_altitude_transition_waypoints(
             start_altitude_km=uav_fp.refueling_altitude_km,
             start_point=_intermediate_point_between(
-                waypoints[-1].LOCATION.xy_coords,
+                segment[-1].LOCATION.xy_coords,
                 uav_airport.xy_coords,
                 uav_fp.refueling_distance_km,
             ),
@@ -526,7 +565,8 @@ def generate_all_uav_waypoints(
         altitude_transition_waypoints[
             -1
         ].LOCATION.TAG = f"{uav_id}_ascended_from_airliner_point"
-        waypoints += altitude_transition_waypoints
+        yield altitude_transition_waypoints
+        last_waypoint = altitude_transition_waypoints[-1]
 
         # UAV descends below level of airliner's tail and airliner itself:
         airliner_clearing_duration_h = uav_fp.airliner_clearance_distance_km / (
@@ -536,7 +576,7 @@ def generate_all_uav_waypoints(
             uav_fp.AVG_AIRLINER_CLEARANCE_SPEED_KMPH * airliner_clearing_duration_h
         )
         clearance_point = _intermediate_point_between(
-            waypoints[-1].LOCATION.xy_coords,
+            last_waypoint.LOCATION.xy_coords,
             uav_airport.xy_coords,
             airliner_clearing_distance_km,
         )
@@ -550,26 +590,26 @@ def generate_all_uav_waypoints(
         )
         altitude_transition_waypoints[0].LOCATION.TAG = f"{uav_id}_lowering_point"
         altitude_transition_waypoints[-1].LOCATION.TAG = f"{uav_id}_lowered_point"
-        waypoints += _gen_tmp_speed_change_waypoints(
-            start_location=waypoints[-1].LOCATION,
+        yield _gen_tmp_speed_change_waypoints(
+            start_location=last_waypoint.LOCATION,
             default_speed_kmph=uav_fp.cruise_speed_kmph,
             tmp_speed_kmph=uav_fp.airliner_clearance_speed_kmph,
             end_location=altitude_transition_waypoints[0].LOCATION,
         )
-        waypoints += altitude_transition_waypoints
+        yield altitude_transition_waypoints
 
         # UAV lands at its airport:
-        waypoints += _gen_takeoff_or_landing_waypoints(
+        yield _gen_takeoff_or_landing_waypoints(
             airplane_id=uav_id,
             takeoff_or_landing="landing",
             airport_location=Location(
                 *_intermediate_point_between(
                     uav_airport.xy_coords,
                     airport_A.xy_coords,
-                    intermediate_distance=(0.015 * (j + 1)),
+                    intermediate_distance=(UAV_AIRPORT_SPACING_KM * (j + 1)),
                 )
             ),
-            eventual_point=waypoints[-1].LOCATION.xy_coords,
+            eventual_point=altitude_transition_waypoints[-1].LOCATION.xy_coords,
             flight_path=uav_fp,
             altitude_km=uav_fp.airliner_clearance_altitude_km,
         )
@@ -583,10 +623,10 @@ def generate_all_uav_waypoints(
             uav_fp_half="second-half",
         )
 
-        waypoints += _gen_takeoff_or_landing_waypoints(
+        yield _gen_takeoff_or_landing_waypoints(
             airplane_id=uav_id,
             takeoff_or_landing="takeoff",
-            airport_location=deepcopy(waypoints[0].LOCATION),
+            airport_location=deepcopy(first_waypoint.LOCATION),
             eventual_point=next_airliner_airport_location.xy_coords,
             flight_path=uav_fp,
             altitude_km=uav_fp.cruise_altitude_km,
@@ -610,19 +650,19 @@ def generate_all_uav_waypoints(
         altitude_transition_waypoints[
             -1
         ].LOCATION.TAG = f"{uav_id}_on_airliner_docking_point"
-        waypoints += altitude_transition_waypoints
+        yield altitude_transition_waypoints
 
-        waypoints += last_waypoints
+        yield last_waypoints
 
     else:
-        waypoints += _generate_uav_waypoints(
+        yield _generate_uav_waypoints(
             airport_A=prev_airliner_airport,
             airport_B=uav_airport,
             uav_id=uav_id,
             uav_fp=uav_fp,
             uav_fp_half="first-half",
         )
-        waypoints += _gen_horizontal_curve_waypoints(
+        yield _gen_horizontal_curve_waypoints(
             airplane_id=uav_id,
             prev_airport=prev_airliner_airport,
             curr_airport=uav_airport,
@@ -631,7 +671,7 @@ def generate_all_uav_waypoints(
             turning_radius_km=uav_fp.turning_radius_km,
             DIRECT_APPROACH_SPEED_KMPH=uav_fp.cruise_speed_kmph,
         )
-        waypoints += _generate_uav_waypoints(
+        yield _generate_uav_waypoints(
             airport_A=next_airliner_airport_location,
             airport_B=uav_airport,
             uav_id=uav_id,
@@ -639,9 +679,21 @@ def generate_all_uav_waypoints(
             uav_fp_half="second-half",
         )
 
-    waypoints[0].LOCATION.TAG = f"{uav_id}_first_point"
 
-    return waypoints
+def iter_all_uav_waypoints(*args, **kwargs) -> Iterator[Waypoint]:
+    """Flatten ``generate_uav_waypoint_segments`` into a lazy stream of waypoints."""
+
+    return chain.from_iterable(generate_uav_waypoint_segments(*args, **kwargs))
+
+
+def generate_all_uav_waypoints(
+    uav_id: AirplaneId,
+    j: int,
+    n_uavs: int,
+    uav_fp: UavFlightPath,
+    airliner_fp: AirlinerFlightPath,
+) -> list[Waypoint]:
+    return list(iter_all_uav_waypoints(uav_id, j, n_uavs, uav_fp, airliner_fp))
 
 
 def get_uav_on_airliner_point(
@@ -702,7 +754,7 @@ def _generate_airliner_docking_waypoints(
             start_speed_kmph = prev_uav.flight_path.cruise_speed_kmph
         else:
             start_location = airliner_curve_waypoints[-1].LOCATION
-            start_speed_kmph = 300  # TODO
+            start_speed_kmph = AIRLINER_CURVE_SPEED_KMPH
 
         if j < len(airport_uavs):
             end_location = uav_on_airliner_docking_point
@@ -723,7 +775,7 @@ def _generate_airliner_docking_waypoints(
             end_speed_kmph = airliner_fp.cruise_speed_kmph
         elif len(airport_uavs) == 0:
             end_location = airliner_curve_waypoints[0].LOCATION
-            end_speed_kmph = 300  # TODO
+            end_speed_kmph = AIRLINER_CURVE_SPEED_KMPH
 
         if (
             j == 0
@@ -751,12 +803,15 @@ def _generate_airliner_docking_waypoints(
     return waypoints
 
 
-def generate_all_airliner_waypoints(
+def generate_airliner_waypoint_segments(
     airliner_id: AirplaneId,
     airliner_fp: AirlinerFlightPath,
     uavs: dict[AirportCode, dict[AirplaneId, Uav]],
-) -> list[Waypoint]:
-    waypoints: list[Waypoint] = []
+) -> Iterator[list[Waypoint]]:
+    """Generate the airliner's waypoints lazily, one flight path segment (takeoff, docking run,
+    curve, etc.) at a time, rather than concatenating the segments into intermediate lists (but see
+    the note on ``generate_uav_waypoint_segments``).
+    """
 
     for i in range(len(airliner_fp.airports) - 1):
         prev_airport = airliner_fp.airports[i]
@@ -765,9 +820,9 @@ def generate_all_airliner_waypoints(
         if i == 0:
             # From first airport...
 
-            waypoints.append(Waypoint(LOCATION=prev_airport))
+            yield [Waypoint(LOCATION=prev_airport)]
 
-            waypoints += _gen_takeoff_or_landing_waypoints(
+            yield _gen_takeoff_or_landing_waypoints(
                 airplane_id=airliner_id,
                 takeoff_or_landing="takeoff",
                 airport_location=prev_airport,
@@ -787,17 +842,17 @@ def generate_all_airliner_waypoints(
                 next_airport=airliner_fp.airports[i + 2],
                 altitude_km=airliner_fp.cruise_altitude_km,
                 turning_radius_km=airliner_fp.turning_radius_km,
-                DIRECT_APPROACH_SPEED_KMPH=300,  # TODO
+                DIRECT_APPROACH_SPEED_KMPH=AIRLINER_CURVE_SPEED_KMPH,
             )
-            waypoints += _generate_airliner_docking_waypoints(
+            yield _generate_airliner_docking_waypoints(
                 airliner_fp,
                 uavs,
                 i,
                 service_side="to_airport",
                 airliner_curve_waypoints=curve_waypoints,
             )
-            waypoints += curve_waypoints
-            waypoints += _generate_airliner_docking_waypoints(
+            yield curve_waypoints
+            yield _generate_airliner_docking_waypoints(
                 airliner_fp,
                 uavs,
                 i,
@@ -808,7 +863,7 @@ def generate_all_airliner_waypoints(
         if i == len(airliner_fp.airports) - 2:
             # To last airport...
 
-            waypoints += _gen_takeoff_or_landing_waypoints(
+            yield _gen_takeoff_or_landing_waypoints(
                 airplane_id=airliner_id,
                 takeoff_or_landing="landing",
                 airport_location=next_airport,
@@ -816,7 +871,19 @@ def generate_all_airliner_waypoints(
                 flight_path=airliner_fp,
             )
 
-    return waypoints
+
+def iter_all_airliner_waypoints(*args, **kwargs) -> Iterator[Waypoint]:
+    """Flatten ``generate_airliner_waypoint_segments`` into a lazy stream of waypoints."""
+
+    return chain.from_iterable(generate_airliner_waypoint_segments(*args, **kwargs))
+
+
+def generate_all_airliner_waypoints(
+    airliner_id: AirplaneId,
+    airliner_fp: AirlinerFlightPath,
+    uavs: dict[AirportCode, dict[AirplaneId, Uav]],
+) -> list[Waypoint]:
+    return list(iter_all_airliner_waypoints(airliner_id, airliner_fp, uavs))
 
 
 def delay_uavs(uavs: dict[AirportCode, dict[UavId, Uav]], airliner: Airliner) -> None:
@@ -0,0 +1,382 @@
+"""A fast, analytic screen of a ``SimulationConfig`` for problems that would otherwise only show
+themselves during (or at the end of) a simulation run: flight paths that do not fit between the
+airports, UAVs that cannot reach their docking points before the airliner (the ``assert`` in
+``delay_uavs``) or cannot fly their own flight paths, an airliner that falls below its reserve
+energy, and ratepoints or zoompoints referring to waypoints that do not exist.
+
+The flight paths are evaluated phase by phase with ``flight_phases`` rather than by generating and
+walking waypoints, such that screening a config takes milliseconds.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+
+from src.feasibility_study.spec_table import get_airliner_spec_entry, get_uav_spec_entry
+from src.modeling_objects import (
+    ALL_AIRPORT_LOCATIONS,
+    AirlinerFlightPath,
+    AirportCode,
+    ServiceSide,
+)
+from src.three_d_sim.flight_phases import (
+    FlightPhase,
+    get_durations_h_to_tags,
+    get_energy_quantities_MJ,
+    summarize_airliner_flight_path,
+    summarize_uav_flight_path,
+)
+from src.three_d_sim.make_airplanes import make_uav_flight_paths
+from src.three_d_sim.simulation_config_schema import (
+    SimulationConfig,
+    Timepoint,
+    compile_elapsed_mins,
+)
+
+# Tolerances for phases of (practically) zero distance, in km, and for simultaneous arrivals, in h:
+_DISTANCE_TOL_KM = 1e-9
+_DURATION_TOL_H = 1e-9
+
+# Fields (of the airliner's or UAVs' flight path config) that determine the length of each kind of
+#     phase, to blame for phases of negative length:
+_PHASE_FIELDS = {
+    "takeoff": "takeoff_distance_km",
+    "climb": "climb_leveling_distance_km",
+    "slow_down": "speed_change_distance_km",
+    "speed_up": "speed_change_distance_km",
+    "docking_run": "smallest_undocking_distance_from_airport_km",
+    "curve": "turning_radius_km",
+    "arc": "arc_radius_km",
+    "cruise": "smallest_undocking_distance_from_airport_km",
+    "descent_to_airliner": "airliner_uav_docking_distance_km",
+    "refueling": "smallest_undocking_distance_from_airport_km",
+    "ascent_from_airliner": "airliner_uav_docking_distance_km",
+    "airliner_clearance": "airliner_clearance_distance_km",
+    "lowering": "smallest_airliner_clearance_altitude_km",
+    "descent": "descent_leveling_distance_km",
+    "landing": "landing_distance_km",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class ConfigViolation:
+    field: str
+    """The (dotted) path of the offending field of the ``SimulationConfig``."""
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.field}: {self.message}"
+
+
+def screen_simulation_config(
+    simulation_config: SimulationConfig, reserve_energy_thres_MJ: float = 0.0
+) -> list[ConfigViolation]:
+    """Screen the ``simulation_config`` for problems, without simulating it.
+
+    Problems that prevent the flight paths from being evaluated (e.g., unknown airports) are
+    reported on their own; the remaining checks are only made once there are none.
+    """
+
+    violations = _screen_fields(simulation_config)
+    if violations:
+        return violations
+
+    airliner_config = simulation_config.airliner_config
+    uavs_config = simulation_config.uavs_config
+    airliner_spec = airliner_config.airplane_spec
+    uav_spec = uavs_config.airplane_spec
+    fuel = airliner_spec.fuel
+    airliner_fp = AirlinerFlightPath.from_configs(
+        simulation_config.airliner_flight_path_config, airliner_config
+    )
+    uav_fps = make_uav_flight_paths(simulation_config, fuel, airliner_fp)
+    airliner_phases = summarize_airliner_flight_path(
+        airliner_fp, uav_fps, airliner_spec.energy_consumption_rate_MJ_per_km
+    )
+    airliner_durations_h = get_durations_h_to_tags(airliner_phases)
+
+    # Where the airliner's flight path does not fit between the airports:
+    leg_idx = 0
+    for p in airliner_phases:
+        if p.distance_km < -_DISTANCE_TOL_KM:
+            if p.phase == "cruise":
+                field = _cruise_leg_field(simulation_config, airliner_fp, leg_idx)
+            elif p.phase == "docking_run" and (
+                p.end_tag.endswith("_on_airliner_docking_point")
+                and _service_side_of(uav_fps, p.end_tag) == "to_airport"
+            ):
+                field = "uavs_flight_path_config.inter_uav_clearance_km"
+            elif p.phase == "docking_run":
+                field = "uavs_flight_path_config." + _PHASE_FIELDS[p.phase]
+            else:
+                field = "airliner_flight_path_config." + _PHASE_FIELDS[p.phase]
+            violations.append(
+                ConfigViolation(
+                    field,
+                    f"The airliner's {p.phase} phase"
+                    + (f" ending at {p.end_tag}" if p.end_tag is not None else "")
+                    + f" would be {p.distance_km:.3f} km long; the flight path does not fit "
+                    f"between {airliner_fp.airports[leg_idx].CODE} and "
+                    f"{airliner_fp.airports[leg_idx + 1].CODE}.",
+                )
+            )
+        if p.phase == "curve":
+            leg_idx += 1
+
+    # UAVs' flight paths, rendezvous with the airliner, and own energy:
+    uav_energy_MJ = (
+        uavs_config.initial_energy_level_pc
+        / 100
+        * get_uav_spec_entry(uav_spec, fuel).energy_capacity_MJ
+    )
+    for code, x in uav_fps.items():
+        for service_side, service_side_uav_fps in x.items():
+            for j, (uav_id, uav_fp) in enumerate(service_side_uav_fps.items()):
+                uav_phases = summarize_uav_flight_path(
+                    uav_id,
+                    j,
+                    len(service_side_uav_fps),
+                    uav_fp,
+                    airliner_fp,
+                    uav_spec.energy_consumption_rate_MJ_per_km,
+                )
+                for p in uav_phases:
+                    if p.distance_km < -_DISTANCE_TOL_KM:
+                        violations.append(
+                            ConfigViolation(
+                                "uavs_flight_path_config." + _PHASE_FIELDS[p.phase],
+                                f"{uav_id}'s {p.phase} phase would be "
+                                f"{p.distance_km:.3f} km long.",
+                            )
+                        )
+                docking_tag = f"{uav_id}_on_airliner_docking_point"
+                uav_duration_h = get_durations_h_to_tags(uav_phases)[docking_tag]
+                airliner_duration_h = airliner_durations_h[docking_tag]
+                if uav_duration_h > airliner_duration_h + _DURATION_TOL_H:
+                    violations.append(
+                        ConfigViolation(
+                            (
+                                f"n_uavs_per_flyover_airport.{code}.{service_side}"
+                                if j > 0
+                                else "uavs_flight_path_config."
+                                "smallest_undocking_distance_from_airport_km"
+                            ),
+                            f"{uav_id} needs {uav_duration_h * 60:.1f} min to reach its "
+                            f"docking point, but the airliner reaches it after "
+                            f"{airliner_duration_h * 60:.1f} min.",
+                        )
+                    )
+                uav_phases_energy_MJ = sum(p.energy_MJ for p in uav_phases)
+                if uav_phases_energy_MJ > uav_energy_MJ:
+                    violations.append(
+                        ConfigViolation(
+                            "uavs_config.initial_energy_level_pc",
+                            f"{uav_id} needs {uav_phases_energy_MJ:.0f} MJ to fly its flight "
+                            f"path, but starts with {uav_energy_MJ:.0f} MJ.",
+                        )
+                    )
+
+    violations += _screen_energy_budget(
+        simulation_config,
+        uav_fps,
+        airliner_phases,
+        reserve_energy_thres_MJ,
+        energy_capacity_MJ=get_airliner_spec_entry(airliner_spec).energy_capacity_MJ,
+        refueling_energy_MJ=(
+            min(uavs_config.initial_refueling_energy_level_pc, 100)
+            / 100
+            * get_uav_spec_entry(uav_spec, fuel).refueling_energy_MJ
+        ),
+    )
+
+    # Timepoints, which can refer to the airliner's tagged waypoints:
+    reference_tags = set(airliner_durations_h.keys()) | {
+        f"Airliner_curve_over_{code}_midpoint"
+        for code in airliner_fp.flyover_airport_codes
+    }
+    timepoints: dict[str, list[Timepoint]] = {
+        "ratepoints": simulation_config.ratepoints
+    }
+    viz_config = simulation_config.viz_config
+    if viz_config is not None and viz_config.zoompoints_config is not None:
+        timepoints["viz_config.zoompoints_config.airliner_zoompoints"] = (
+            viz_config.zoompoints_config.airliner_zoompoints
+        )
+    for field, x in timepoints.items():
+        for i, timepoint in enumerate(x):
+            name = compile_elapsed_mins(timepoint.elapsed_mins).variable
+            if name is not None and name not in reference_tags:
+                violations.append(
+                    ConfigViolation(
+                        f"{field}.{i}.elapsed_mins",
+                        f"{name!r} is not the tag of any of the airliner's waypoints.",
+                    )
+                )
+
+    return violations
+
+
+def _screen_fields(simulation_config: SimulationConfig) -> list[ConfigViolation]:
+    """Check the fields without which the flight paths cannot be evaluated."""
+
+    violations = []
+    fp_config = simulation_config.airliner_flight_path_config
+    for field, code in [
+        ("origin_airport_code", fp_config.origin_airport_code),
+        *(
+            (f"flyover_airport_codes.{i}", code)
+            for i, code in enumerate(fp_config.flyover_airport_codes)
+        ),
+        ("destination_airport_code", fp_config.destination_airport_code),
+    ]:
+        if code not in ALL_AIRPORT_LOCATIONS:
+            violations.append(
+                ConfigViolation(
+                    f"airliner_flight_path_config.{field}",
+                    f"{code!r} is not in the airport table.",
+                )
+            )
+    for code, x in simulation_config.n_uavs_per_flyover_airport.items():
+        if code not in fp_config.flyover_airport_codes:
+            violations.append(
+                ConfigViolation(
+                    f"n_uavs_per_flyover_airport.{code}",
+                    f"{code!r} is not one of the airliner's flyover airports.",
+                )
+            )
+        for service_side, n_uavs in x.model_dump().items():
+            if n_uavs < 0:
+                violations.append(
+                    ConfigViolation(
+                        f"n_uavs_per_flyover_airport.{code}.{service_side}",
+                        "The number of UAVs cannot be negative.",
+                    )
+                )
+
+    for config_name, flight_path_config, cruise_speed_kmph in [
+        (
+            "airliner_flight_path_config",
+            fp_config,
+            simulation_config.airliner_config.airplane_spec.cruise_speed_kmph,
+        ),
+        (
+            "uavs_flight_path_config",
+            simulation_config.uavs_flight_path_config,
+            simulation_config.uavs_config.airplane_spec.cruise_speed_kmph,
+        ),
+    ]:
+        for field in ["rate_of_climb_mps", "rate_of_descent_mps"]:
+            # The vertical speed in km/h:
+            vertical_speed_kmph = getattr(flight_path_config, field) * 3.6
+            if not 0 < vertical_speed_kmph < cruise_speed_kmph:
+                violations.append(
+                    ConfigViolation(
+                        f"{config_name}.{field}",
+                        f"Must be positive and less than the cruise speed "
+                        f"({cruise_speed_kmph} km/h).",
+                    )
+                )
+    return violations
+
+
+def _screen_energy_budget(
+    simulation_config: SimulationConfig,
+    uav_fps: dict,
+    airliner_phases: list[FlightPhase],
+    reserve_energy_thres_MJ: float,
+    energy_capacity_MJ: float,
+    refueling_energy_MJ: float,
+) -> list[ConfigViolation]:
+    """Check that the airliner's energy stays at or above its reserve, blaming any shortfall on the
+    last service side (or the airliner's initial energy level) before it.
+    """
+
+    violations: dict[str, ConfigViolation] = {}
+    initial_energy_MJ = (
+        simulation_config.airliner_config.initial_energy_level_pc
+        / 100
+        * energy_capacity_MJ
+    )
+    field = "airliner_config.initial_energy_level_pc"
+    for p, energy_MJ in zip(
+        airliner_phases,
+        get_energy_quantities_MJ(
+            airliner_phases, initial_energy_MJ, refueling_energy_MJ, energy_capacity_MJ
+        ),
+    ):
+        if energy_MJ < reserve_energy_thres_MJ and field not in violations:
+            violations[field] = ConfigViolation(
+                field,
+                f"The airliner's energy falls to {energy_MJ:.0f} MJ, below its reserve of "
+                f"{reserve_energy_thres_MJ:.0f} MJ, by the end of its {p.phase} phase"
+                + (f" (at {p.end_tag})" if p.end_tag is not None else "")
+                + ".",
+            )
+        if p.end_tag is None:
+            continue
+        if p.end_tag.startswith("Airliner_curve_over_"):
+            code = p.end_tag.removeprefix("Airliner_curve_over_").split("_")[0]
+            if p.end_tag.endswith("_start_point"):
+                field = f"n_uavs_per_flyover_airport.{code}.to_airport"
+            else:
+                field = f"n_uavs_per_flyover_airport.{code}.from_airport"
+        elif p.end_tag.endswith("_on_airliner_docking_point"):
+            uav_id = p.end_tag.removesuffix("_on_airliner_docking_point")
+            code = uav_id.split("_UAV_")[0]
+            field = f"n_uavs_per_flyover_airport.{code}.{_service_side_of(uav_fps, p.end_tag)}"
+    return list(violations.values())
+
+
+def _service_side_of(uav_fps: dict, tag: str) -> ServiceSide | None:
+    """Get the service side of the UAV whose tagged (un)docking point ``tag`` is."""
+
+    for x in uav_fps.values():
+        for service_side, service_side_uav_fps in x.items():
+            for uav_id in service_side_uav_fps.keys():
+                if tag.startswith(f"{uav_id}_on_airliner_"):
+                    return service_side
+    return None
+
+
+def _cruise_leg_field(
+    simulation_config: SimulationConfig,
+    airliner_fp: AirlinerFlightPath,
+    leg_idx: int,
+) -> str:
+    """Get the field to blame for the cruise on a leg not fitting between its airports: the service
+    side with the most UAVs on the leg, if any.
+    """
+
+    sides: list[tuple[int, AirportCode, ServiceSide]] = []
+    for code, service_side in [
+        (airliner_fp.airports[leg_idx].CODE, "from_airport"),
+        (airliner_fp.airports[leg_idx + 1].CODE, "to_airport"),
+    ]:
+        x = simulation_config.n_uavs_per_flyover_airport.get(code)
+        if x is not None and getattr(x, service_side) > 0:
+            sides.append((getattr(x, service_side), code, service_side))
+    if sides:
+        _, code, service_side = max(sides)
+        return f"n_uavs_per_flyover_airport.{code}.{service_side}"
+    return "airliner_flight_path_config.speed_change_distance_km"
+
+
+if __name__ == "__main__":
+    import time
+
+    from src.three_d_sim.simulation_config_schema import NUavsAtFlyOverAirport
+
+    simulation_config = SimulationConfig.from_yaml("configs/jfk_to_lax")
+    t0 = time.perf_counter()
+    violations = screen_simulation_config(simulation_config)
+    print(f"Screened in {(time.perf_counter() - t0) * 1e3:.1f} ms:", violations)
+
+    simulation_config.n_uavs_per_flyover_airport["DEN"] = NUavsAtFlyOverAirport(
+        to_airport=1, from_airport=1
+    )
+    simulation_config.uavs_flight_path_config.smallest_undocking_distance_from_airport_km = 10
+    t0 = time.perf_counter()
+    violations = screen_simulation_config(simulation_config)
+    print(f"Screened in {(time.perf_counter() - t0) * 1e3:.1f} ms:")
+    for violation in violations:
+        print(f"    {violation}")
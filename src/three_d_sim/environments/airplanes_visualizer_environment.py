@@ -1,12 +1,12 @@
 import dataclasses
+import datetime as dt
 import os
-from enum import Enum
-from typing import Annotated, List, Literal, Tuple
+import queue
+import threading
+from typing import Dict, List, Literal, Optional, Tuple
 
-import cv2
 import numpy as np
 import pandas as pd
-import pyautogui
 import vpython as vp
 
 from src.modeling_objects import KM_PER_LAT_LON
@@ -17,32 +17,14 @@ from src.three_d_sim.airplane_waypoints_generation import (
 from src.three_d_sim.environments.environment import (
     BaseEnvironment,
     Environment,
-    get_interpolator_by_elapsed_time,
+    FramePacer,
 )
+from src.three_d_sim.environments.view import View
 from src.three_d_sim.simulation_config_schema import Zoompoint
 from src.three_d_sim.wavefront_obj_to_vp import simple_wavefront_obj_to_vp
 from src.utils.utils import timedelta_to_minutes
 
 
-class View(Enum):
-    """What to show in the viewport in which the 3D visualization is rendered when
-    `--simulation-viz-enabled=true`.
-    """
-
-    SIDE_VIEW: Annotated[
-        str,
-        "View the airplane from the side. Requires specifying a `--track-airplane-id`.",
-    ] = "side-view"
-    TAIL_VIEW: Annotated[
-        str,
-        "View the airplane from its tail (third person). Requires specifying a `--track-airplane-id`.",
-    ] = "tail-view"
-    MAP_VIEW: Annotated[
-        str,
-        'View the airports, airplanes and their paths from above, magnified, in a "bird\'s eye" view. Cannot be used while specifying a `--track-airplane-id`',
-    ] = "map-view"
-
-
 Color = Tuple[int, int, int]
 
 
@@ -81,6 +63,8 @@ class ScreenRecorder:
     fname: str
 
     def set_up(self, fps: int):
+        import cv2
+
         self._video_writer = cv2.VideoWriter(
             filename=self.fname,
             fourcc=cv2.VideoWriter_fourcc(*"XVID"),
@@ -89,15 +73,46 @@ class ScreenRecorder:
         )
 
     def take_screenshot(self):
+        import cv2
+        import pyautogui
+
         img = pyautogui.screenshot(region=(*self.origin, *self.size))
         frame = np.array(img)
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         self._video_writer.write(frame)
+        self._last_frame = frame
+
+    def repeat_screenshot(self):
+        """Write the last screenshot again, in place of a frame that was not rendered."""
+
+        if getattr(self, "_last_frame", None) is not None:
+            self._video_writer.write(self._last_frame)
 
     def release(self):
         self._video_writer.release()
 
 
+@dataclasses.dataclass(frozen=True)
+class AirplaneSnapshot:
+    """What is rendered of an airplane in a frame, copied from its state such that the simulation
+    can move on while the frame is rendered.
+    """
+
+    xyz_coords: np.ndarray
+    heading: Optional[np.ndarray]
+    caption: str
+    energy_level_pc: float
+    speed_kmph: float
+
+
+@dataclasses.dataclass(frozen=True)
+class Frame:
+    time_idx: int
+    """Index of the frame's time into the environment's timeline."""
+    time: dt.timedelta
+    airplanes: Dict[str, AirplaneSnapshot]
+
+
 @dataclasses.dataclass(kw_only=True)
 class AirplanesVisualizerEnvironment(Environment):
     airports: List[AirportLocation]
@@ -111,6 +126,19 @@ class AirplanesVisualizerEnvironment(Environment):
     models_scale_factor: float = 1.0
     captions: bool = True
     screen_recorders: List[ScreenRecorder] = dataclasses.field(default_factory=list)
+    pipelined: bool = False
+    """Whether to simulate in a separate (producer) thread, which queues frames for the rendering
+    (consumer) loop to render at the frame rate, rather than alternating between simulating and
+    rendering each frame.
+    """
+    max_queued_frames: int = 64
+    """How many frames the simulation can get ahead of the rendering, when ``pipelined``."""
+    real_time_pacing: bool = False
+    """Whether to drop frames that are rendered too late to be played back in real time at the
+    ``max_frame_rate_fps`` (repeating the last frame in place of each in the recordings), rather
+    than playing back more slowly than intended. Either way, frames are paced such that delays do
+    not accumulate.
+    """
 
     palette: SimulationColorPalette = dataclasses.field(init=False)
 
@@ -118,7 +146,18 @@ class AirplanesVisualizerEnvironment(Environment):
         super().__post_init__()
 
         assert pd.Series([zp.elapsed_mins for zp in self.zoompoints]).is_monotonic_increasing
-        self.zoom_factor_interpolator = get_interpolator_by_elapsed_time(self.zoompoints)
+        # The zoom factor at each of the timeline's times:
+        self.zoom_factors = self.timeline.interpolate(self.zoompoints)
+        # Frames are rendered after every iteration that ends at or after the skipped time:
+        self.n_frames = sum(t >= self.skip_timedelta for t in self.timeline.times[1:])
+        print(
+            f"{self.n_frames} frames to render "
+            f"({self.n_frames / self.max_frame_rate_fps:.1f} s at {self.max_frame_rate_fps} fps)."
+        )
+
+        self.pacer = FramePacer(
+            self.max_frame_rate_fps, drop_late_frames=self.real_time_pacing
+        )
 
         self.palette = palette_lookup[self.theme]
 
@@ -140,6 +179,7 @@ class AirplanesVisualizerEnvironment(Environment):
         airplanes = self.ev_taxis_emulator_or_interface.current_state.airplanes.values()
 
         self.airplane_vp_objs = {}
+        self._translation_vectors = {}
         for airplane in airplanes:
             print(f"Rendering {airplane.id}...")
             if self.view == View.MAP_VIEW:
@@ -151,6 +191,7 @@ class AirplanesVisualizerEnvironment(Environment):
             self.airplane_vp_objs[airplane.id] = simple_wavefront_obj_to_vp(
                 airplane.viz_model, shininess=shininess, color=color, make_trail=True, retain=3000
             )
+            self._translation_vectors[airplane.id] = airplane.viz_model.TRANSLATION_VECTOR
         print("Done rendering airplanes.")
 
         for vp_obj in self.airplane_vp_objs.values():
@@ -223,41 +264,91 @@ class AirplanesVisualizerEnvironment(Environment):
 
         BaseEnvironment.run(self)
 
-        while True:
-            if self.end_time is not None:
-                if self.current_time >= self.end_time:
-                    break
-            self._run_iteration()
+        if self.pipelined:
+            self._run_pipelined()
+        else:
+            while self._time_idx < self.timeline.n_iterations:
+                self._run_iteration()
+        print(self.pacer.get_report())
 
     def _run_iteration(self) -> None:
         super()._run_iteration()
 
         if self.current_time >= self.skip_timedelta:
-            vp.scene.title = str(self.current_time).split(".")[0]
-            self._update_airplanes_viz()
-            self._update_graphs()
+            self._render_frame(self._take_frame())
+
+    def _run_pipelined(self) -> None:
+        frames = queue.Queue(maxsize=self.max_queued_frames)
+
+        def _produce() -> None:
+            try:
+                while self._time_idx < self.timeline.n_iterations:
+                    Environment._run_iteration(self)
+                    if self.current_time >= self.skip_timedelta:
+                        # Blocks while the rendering is `max_queued_frames` behind:
+                        frames.put(self._take_frame())
+            except BaseException as e:
+                frames.put(e)
+            else:
+                frames.put(None)
+
+        producer = threading.Thread(target=_produce, name="simulation", daemon=True)
+        producer.start()
+        # vpython is driven from the main thread, which renders frames as they are produced:
+        while (frame := frames.get()) is not None:
+            if isinstance(frame, BaseException):
+                raise frame
+            self._render_frame(frame)
+        producer.join()
+
+    def _take_frame(self) -> Frame:
+        evs_state = self.ev_taxis_emulator_or_interface.current_state.airplanes
+        return Frame(
+            time_idx=self._time_idx,
+            time=self.current_time,
+            airplanes={
+                ev.id: AirplaneSnapshot(
+                    xyz_coords=ev.location.xyz_coords.copy(),
+                    heading=None if ev.heading is None else ev.heading.copy(),
+                    caption=str(ev) if self.captions else "",
+                    energy_level_pc=ev.energy_level_pc,
+                    speed_kmph=(
+                        ev.waypoints[0].DIRECT_APPROACH_SPEED_KMPH if len(ev.waypoints) > 0 else 0
+                    ),
+                )
+                for ev in evs_state.values()
+            },
+        )
+
+    def _render_frame(self, frame: Frame) -> None:
+        if not self.pacer.pace():
+            # Such that each recording still has one frame per frame played back, keeping its time
+            #     scale:
             for screen_recorder in self.screen_recorders:
-                screen_recorder.take_screenshot()
-            vp.rate(self.max_frame_rate_fps)
+                screen_recorder.repeat_screenshot()
+            return
+        vp.scene.title = str(frame.time).split(".")[0]
+        self._update_airplanes_viz(frame)
+        self._update_graphs(frame)
+        for screen_recorder in self.screen_recorders:
+            screen_recorder.take_screenshot()
+        vp.rate(self.max_frame_rate_fps)
 
-    def _update_airplanes_viz(self) -> None:
-        zoom_factor = self.zoom_factor_interpolator(
-            timedelta_to_minutes(self.current_time)
-        )
+    def _update_airplanes_viz(self, frame: Frame) -> None:
+        zoom_factor = float(self.zoom_factors[frame.time_idx])
         print(f"zoom_factor: {zoom_factor:.2f}")
         vp.scene.range = self.models_scale_factor / zoom_factor
 
-        evs_state = self.ev_taxis_emulator_or_interface.current_state.airplanes
-        for ev in evs_state.values():
-            self.airplane_vp_objs[ev.id].pos = vp.vector(
-                *ev.location.xyz_coords
-            ) + vp.vec(*ev.viz_model.TRANSLATION_VECTOR)
+        for ev_id, ev in frame.airplanes.items():
+            self.airplane_vp_objs[ev_id].pos = vp.vector(*ev.xyz_coords) + vp.vec(
+                *self._translation_vectors[ev_id]
+            )
             if self.view == View.MAP_VIEW:
-                self.airplane_vp_objs[ev.id].pos.z *= 10
-                self.airplane_vp_objs[ev.id].pos.z += 200
-            self.airplane_vp_objs[ev.id].axis = vp.vector(*ev.heading)
+                self.airplane_vp_objs[ev_id].pos.z *= 10
+                self.airplane_vp_objs[ev_id].pos.z += 200
+            self.airplane_vp_objs[ev_id].axis = vp.vector(*ev.heading)
         if self.view != View.MAP_VIEW:
-            heading = evs_state[self.track_airplane_id].heading
+            heading = frame.airplanes[self.track_airplane_id].heading.copy()
             heading[2] = 0
             heading = heading / np.linalg.norm(heading)
             heading[2] = -0.3
@@ -266,17 +357,15 @@ class AirplanesVisualizerEnvironment(Environment):
             elif self.view == View.SIDE_VIEW:
                 vp.scene.forward = vp.vector(*orthogonal_xy_vector(heading))
         if self.captions:
-            vp.scene.caption = "\n" + "\n".join([str(ev) for ev in evs_state.values()])
+            vp.scene.caption = "\n" + "\n".join([ev.caption for ev in frame.airplanes.values()])
 
-    def _update_graphs(self) -> None:
-        minutes_elapsed = timedelta_to_minutes(self.current_time)
-        evs_state = self.ev_taxis_emulator_or_interface.current_state.airplanes
+    def _update_graphs(self, frame: Frame) -> None:
+        minutes_elapsed = timedelta_to_minutes(frame.time)
         self.airliner_energy_level_gcurve.plot(
             minutes_elapsed,
-            evs_state["Airliner"].energy_level_pc,
+            frame.airplanes["Airliner"].energy_level_pc,
         )
-        airliner_waypoints = evs_state["Airliner"].waypoints
         self.airliner_speed_gcurve.plot(
             minutes_elapsed,
-            airliner_waypoints[0].DIRECT_APPROACH_SPEED_KMPH if len(airliner_waypoints) > 0 else 0
+            frame.airplanes["Airliner"].speed_kmph,
         )
@@ -7,9 +7,9 @@ Notes:
 import dataclasses
 import datetime as dt
 import time
-from typing import List, Optional
+from typing import Callable, List, Optional
 
-import scipy as sp
+import numpy as np
 
 from src.airplanes_simulator import AirplanesSimulator
 from src.modeling_objects import AirplanesState
@@ -17,18 +17,159 @@ from src.utils.utils import timedelta_to_minutes
 from src.three_d_sim.simulation_config_schema import Ratepoint, Timepoint
 
 
-def get_interpolator_by_elapsed_time(points: List[Timepoint]):
-    def interpolator(elapsed_mins: float):
-        _interpolator = sp.interpolate.interp1d(
-            x=[p.elapsed_mins for p in points],
-            y=[p.value for p in points],
-            bounds_error=False,
-            fill_value=(points[0].value, points[-1].value),
+def interpolate_by_elapsed_time(points: List[Timepoint], elapsed_mins: np.ndarray) -> np.ndarray:
+    """Interpolate the points' values linearly at the given elapsed times, holding the first and
+    last points' values before and after them.
+    """
+
+    return np.interp(
+        elapsed_mins, [p.elapsed_mins for p in points], [p.value for p in points]
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class Timeline:
+    """The times at which an environment iterates, compiled once from its ratepoints (rather than
+    interpolating them at every iteration), such that the number of iterations is known up front.
+    """
+
+    times: List[dt.timedelta]
+    """The time of each iteration's state, followed by the time after the last iteration."""
+    elapsed_mins: np.ndarray
+    """The ``times`` in minutes."""
+    time_steps_s: np.ndarray
+    """The time step (before the environment's ``time_step_multiplier``) after each iteration."""
+
+    @property
+    def n_iterations(self) -> int:
+        return len(self.times) - 1
+
+    def interpolate(self, points: List[Timepoint]) -> np.ndarray:
+        """Get the points' values (e.g., zoompoints' zoom factors) at each of the ``times``."""
+
+        return interpolate_by_elapsed_time(points, self.elapsed_mins)
+
+
+def compile_timeline(
+    ratepoints: Optional[List[Ratepoint]],
+    time_step_multiplier: float,
+    end_time: Optional[dt.timedelta],
+) -> Timeline:
+    """Integrate the time steps given by the ratepoints (if any) from the start until the
+    ``end_time``. Without ratepoints, there is a single iteration, at the start.
+    """
+
+    if ratepoints is None:
+        return Timeline(
+            times=[dt.timedelta(0)] * 2, elapsed_mins=np.zeros(2), time_steps_s=np.zeros(1)
+        )
+    if end_time is None:
+        raise ValueError("An end time is needed to iterate according to ratepoints.")
+    x = [p.elapsed_mins for p in ratepoints]
+    y = [p.value for p in ratepoints]
+    times = [dt.timedelta(0)]
+    time_steps_s = []
+    while times[-1] < end_time:
+        time_step_s = float(np.interp(timedelta_to_minutes(times[-1]), x, y))
+        time_step = dt.timedelta(seconds=(time_step_s * time_step_multiplier))
+        if time_step <= dt.timedelta(0):
+            raise ValueError(
+                f"The ratepoints give a time step of {time_step_s} s (times "
+                f"{time_step_multiplier}) at {times[-1]}, which never reaches the end time."
+            )
+        time_steps_s.append(time_step_s)
+        times.append(times[-1] + time_step)
+    return Timeline(
+        times=times,
+        elapsed_mins=np.array([timedelta_to_minutes(t) for t in times]),
+        time_steps_s=np.array(time_steps_s),
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class PacingReport:
+    target_fps: float
+    n_frames: int
+    """Frames played back, whether rendered or dropped."""
+    n_rendered: int
+    n_dropped: int
+    n_resyncs: int
+    duration_s: float
+
+    @property
+    def playback_fps(self) -> float:
+        return self.n_frames / self.duration_s if self.duration_s > 0 else float("nan")
+
+    @property
+    def rendered_fps(self) -> float:
+        return self.n_rendered / self.duration_s if self.duration_s > 0 else float("nan")
+
+    def __str__(self) -> str:
+        return (
+            f"Played back {self.n_frames} frames in {self.duration_s:.1f} s at "
+            f"{self.playback_fps:.1f} fps (target: {self.target_fps:g} fps), rendering "
+            f"{self.n_rendered} at {self.rendered_fps:.1f} fps ({self.n_dropped} dropped, "
+            f"{self.n_resyncs} resyncs)."
         )
-        y = _interpolator(elapsed_mins)
-        return float(y)
 
-    return interpolator
+
+@dataclasses.dataclass
+class FramePacer:
+    """Paces frames in real time at ``target_fps``: the ``i``th frame is due ``i / target_fps``
+    after the first, such that delays do not accumulate (as they do when each frame waits for a
+    period after the last). Frames that are early are waited for; frames that are late by a whole
+    period or more are dropped (if ``drop_late_frames``) to catch up, unless the lag exceeds
+    ``max_lag_s``, in which case the schedule is shifted back rather than dropping more frames.
+    """
+
+    target_fps: float
+    drop_late_frames: bool = True
+    max_lag_s: float = 1.0
+
+    def __post_init__(self):
+        self.start_time: Optional[float] = None
+        # When the first and latest frames were played back:
+        self._first_time: Optional[float] = None
+        self._last_time: Optional[float] = None
+        self.n_frames = 0
+        self.n_rendered = 0
+        self.n_dropped = 0
+        self.n_resyncs = 0
+
+    def pace(self) -> bool:
+        """Wait until the next frame is due, and get whether to render it (rather than drop it)."""
+
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = self._first_time = now
+        lag_s = now - (self.start_time + self.n_frames / self.target_fps)
+        self.n_frames += 1
+        if lag_s < 0:
+            time.sleep(-lag_s)
+        elif lag_s > self.max_lag_s:
+            self.start_time += lag_s
+            self.n_resyncs += 1
+        elif self.drop_late_frames and lag_s >= 1 / self.target_fps:
+            self._last_time = now
+            self.n_dropped += 1
+            return False
+        self._last_time = time.perf_counter()
+        self.n_rendered += 1
+        return True
+
+    def get_report(self) -> PacingReport:
+        return PacingReport(
+            target_fps=self.target_fps,
+            n_frames=self.n_frames,
+            n_rendered=self.n_rendered,
+            n_dropped=self.n_dropped,
+            n_resyncs=self.n_resyncs,
+            duration_s=(
+                0.0
+                if self._first_time is None
+                else self._last_time - self._first_time + 1 / self.target_fps
+            ),
+        )
 
 
 @dataclasses.dataclass
@@ -46,6 +187,11 @@ class BaseEnvironment:
     end_time: Optional[dt.timedelta] = None
 
     def __post_init__(self):
+        self.timeline = compile_timeline(
+            self.ratepoints, self.time_step_multiplier, self.end_time
+        )
+        # Index (into the timeline's times) of the current time:
+        self._time_idx = 0
         self.current_time = dt.timedelta(0)
 
     def run(self) -> None:
@@ -60,24 +206,27 @@ class BaseEnvironment:
 
 @dataclasses.dataclass
 class Environment(BaseEnvironment):
+    state_observers: List[Callable[[dt.timedelta, AirplanesState], None]] = (
+        dataclasses.field(default_factory=list)
+    )
+    """Functions to call with the current time and AirplanesState at every iteration (e.g., to
+    record KPIs of a headless simulation).
+    """
+
     def run(self) -> None:
         super().run()
 
-        while True:
-            if self.end_time is not None:
-                if self.current_time >= self.end_time:
-                    break
-            iteration_start_time = time.time()
+        while self._time_idx < self.timeline.n_iterations:
             self._run_iteration()
-            if self.ratepoints is None:
-                break
 
     def _run_iteration(self) -> None:
         # NOTE: Set a breakpoint here to debug iterations.
         print(f"{timedelta_to_minutes(self.current_time):.2f} minutes elapsed")
-        self._get_state()
+        state = self._get_state()
+        for observer in self.state_observers:
+            observer(self.current_time, state)
         if self.ratepoints is not None:
-            ratepoints_interpolator = get_interpolator_by_elapsed_time(self.ratepoints)
-            time_step_s = ratepoints_interpolator(timedelta_to_minutes(self.current_time))
+            time_step_s = float(self.timeline.time_steps_s[self._time_idx])
             print(f"{time_step_s = }")
-            self.current_time += dt.timedelta(seconds=(time_step_s * self.time_step_multiplier))
+        self._time_idx += 1
+        self.current_time = self.timeline.times[self._time_idx]
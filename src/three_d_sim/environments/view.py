@@ -0,0 +1,21 @@
+from enum import Enum
+from typing import Annotated
+
+
+class View(Enum):
+    """What to show in the viewport in which the 3D visualization is rendered when
+    `--simulation-viz-enabled=true`.
+    """
+
+    SIDE_VIEW: Annotated[
+        str,
+        "View the airplane from the side. Requires specifying a `--track-airplane-id`.",
+    ] = "side-view"
+    TAIL_VIEW: Annotated[
+        str,
+        "View the airplane from its tail (third person). Requires specifying a `--track-airplane-id`.",
+    ] = "tail-view"
+    MAP_VIEW: Annotated[
+        str,
+        'View the airports, airplanes and their paths from above, magnified, in a "bird\'s eye" view. Cannot be used while specifying a `--track-airplane-id`',
+    ] = "map-view"
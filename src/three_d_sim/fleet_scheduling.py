@@ -0,0 +1,258 @@
+"""Scheduling of UAV sorties across a timetable of flights, to size the UAV fleet at each base (flyover
+airport) when its UAVs serve many airliners per day rather than a single flight.
+
+Each flight's sorties (one per UAV in its simulation config) are timed analytically from the phases
+of the airliner's and UAVs' flight paths (with ``flight_phases``), with each UAV taking off such that
+it meets the airliner at its docking point (as in ``delay_uavs``). After landing, a UAV is available
+again once it has been turned around and refilled (with its own energy and its payload).
+
+The UAVs at a base are interchangeable, such that assigning the base's sorties to as few UAVs as
+possible is interval partitioning: taking the sorties in order of takeoff, each is assigned to the
+UAV that has been available the longest, if any is, or to a new UAV otherwise.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import heapq
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.feasibility_study.spec_table import get_uav_spec_entry
+from src.modeling_objects import AirlinerFlightPath
+from src.three_d_sim.flight_phases import (
+    get_durations_h_to_tags,
+    summarize_airliner_flight_path,
+    summarize_uav_flight_path,
+)
+from src.three_d_sim.make_airplanes import make_uav_flight_paths
+from src.three_d_sim.simulation_config_schema import SimulationConfig
+from src.utils.utils import MJ_PER_KWH
+
+
+@dataclasses.dataclass(frozen=True)
+class ScheduledFlight:
+    flight_id: str
+    departure_time: dt.datetime
+    """When the airliner starts its takeoff run."""
+    simulation_config: SimulationConfig
+    """The flight's airliner, UAVs, and flight paths. Flights sharing a route should share the
+    same config, whose sorties are then timed only once.
+    """
+
+
+@dataclasses.dataclass
+class FleetSchedule:
+    sorties: pd.DataFrame
+    """The sorties (as from ``make_sorties``), with the ``uav`` (index into its base's fleet) to
+    which each is assigned and the time at which that UAV is ``ready`` again.
+    """
+    fleet_sizes: pd.Series
+    """The number of UAVs needed at each base."""
+
+
+def get_sortie_template(simulation_config: SimulationConfig) -> pd.DataFrame:
+    """Get the sorties of a single flight, with times in hours since the airliner's departure.
+
+    Columns:
+        base: The UAV's (home) airport.
+        uav_id: The UAV's ID within the flight.
+        service_side: The UAV's service side.
+        takeoff_h, docking_h, undocking_h, landing_h: When the UAV starts its takeoff run, docks
+            with and undocks from the airliner (its refueling window), and lands.
+        refill_energy_MJ: The energy with which to refill the UAV after landing: the energy that
+            it carried for the airliner plus that which it spent itself.
+    """
+
+    airliner_config = simulation_config.airliner_config
+    uavs_config = simulation_config.uavs_config
+    airliner_fp = AirlinerFlightPath.from_configs(
+        simulation_config.airliner_flight_path_config, airliner_config
+    )
+    fuel = airliner_config.airplane_spec.fuel
+    uav_fps = make_uav_flight_paths(simulation_config, fuel, airliner_fp)
+    airliner_durations_h = get_durations_h_to_tags(
+        summarize_airliner_flight_path(
+            airliner_fp,
+            uav_fps,
+            airliner_config.airplane_spec.energy_consumption_rate_MJ_per_km,
+        )
+    )
+    uav_spec = uavs_config.airplane_spec
+    refueling_energy_MJ = (
+        uavs_config.initial_refueling_energy_level_pc
+        / 100
+        * get_uav_spec_entry(uav_spec, fuel).refueling_energy_MJ
+    )
+
+    rows = []
+    for code, x in uav_fps.items():
+        for service_side, service_side_uav_fps in x.items():
+            for j, (uav_id, uav_fp) in enumerate(service_side_uav_fps.items()):
+                phases = summarize_uav_flight_path(
+                    uav_id,
+                    j,
+                    len(service_side_uav_fps),
+                    uav_fp,
+                    airliner_fp,
+                    uav_spec.energy_consumption_rate_MJ_per_km,
+                )
+                docking_tag = f"{uav_id}_on_airliner_docking_point"
+                docking_h = airliner_durations_h[docking_tag]
+                takeoff_h = docking_h - get_durations_h_to_tags(phases)[docking_tag]
+                rows.append(
+                    dict(
+                        base=code,
+                        uav_id=uav_id,
+                        service_side=service_side,
+                        takeoff_h=takeoff_h,
+                        docking_h=docking_h,
+                        undocking_h=airliner_durations_h[
+                            f"{uav_id}_on_airliner_undocking_point"
+                        ],
+                        landing_h=takeoff_h + sum(p.duration_h for p in phases),
+                        refill_energy_MJ=(
+                            refueling_energy_MJ + sum(p.energy_MJ for p in phases)
+                        ),
+                    )
+                )
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "base",
+            "uav_id",
+            "service_side",
+            "takeoff_h",
+            "docking_h",
+            "undocking_h",
+            "landing_h",
+            "refill_energy_MJ",
+        ],
+    )
+
+
+def make_sorties(flights: Sequence[ScheduledFlight]) -> pd.DataFrame:
+    """Get the sorties of every flight, in order of takeoff, with the columns of
+    ``get_sortie_template`` but with times (``takeoff``, ``docking``, ``undocking``, ``landing``) as
+    datetimes, and with the ``flight_id``.
+    """
+
+    flights_by_config: dict[int, list[ScheduledFlight]] = {}
+    for flight in flights:
+        flights_by_config.setdefault(id(flight.simulation_config), []).append(flight)
+
+    dfs = []
+    for config_flights in flights_by_config.values():
+        template = get_sortie_template(config_flights[0].simulation_config)
+        n_flights, n_sorties = len(config_flights), len(template)
+        departure_times = np.array(
+            [flight.departure_time for flight in config_flights],
+            dtype="datetime64[ns]",
+        )
+        df = pd.DataFrame(
+            {
+                "flight_id": np.repeat(
+                    np.array([flight.flight_id for flight in config_flights]),
+                    n_sorties,
+                ),
+                **{
+                    k: np.tile(template[k].to_numpy(), n_flights)
+                    for k in ["base", "uav_id", "service_side", "refill_energy_MJ"]
+                },
+            }
+        )
+        for k in ["takeoff", "docking", "undocking", "landing"]:
+            df[k] = (
+                departure_times[:, np.newaxis]
+                + (template[f"{k}_h"].to_numpy() * 3600e9).astype("timedelta64[ns]")
+            ).ravel()
+        dfs.append(df)
+
+    columns = ["flight_id", "base", "uav_id", "service_side"]
+    columns += ["takeoff", "docking", "undocking", "landing", "refill_energy_MJ"]
+    if len(dfs) == 0:
+        return pd.DataFrame(columns=columns)
+    return (
+        pd.concat(dfs, ignore_index=True)[columns]
+        .sort_values("takeoff", kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def schedule_uav_fleets(
+    sorties: pd.DataFrame,
+    turnaround_time: dt.timedelta,
+    ground_refill_rate_kW: float = np.inf,
+) -> FleetSchedule:
+    """Assign the sorties (as from ``make_sorties``) to as few UAVs as possible at each base, with
+    each UAV unavailable from takeoff until it has landed, been turned around, and been refilled at
+    ``ground_refill_rate_kW``.
+    """
+
+    refill_duration_h = sorties["refill_energy_MJ"].to_numpy() / (
+        MJ_PER_KWH * ground_refill_rate_kW
+    )
+    ready = (
+        sorties["landing"].to_numpy()
+        + np.timedelta64(turnaround_time)
+        + (refill_duration_h * 3600e9).astype("timedelta64[ns]")
+    )
+    takeoff_ns = sorties["takeoff"].to_numpy().astype(np.int64)
+    ready_ns = ready.astype(np.int64)
+
+    uavs = np.empty(len(sorties), dtype=int)
+    fleet_sizes = {}
+    for base, idxs in sorties.groupby("base", sort=False).indices.items():
+        idxs = idxs[np.argsort(takeoff_ns[idxs], kind="stable")]
+        # The UAVs on the ground, as (when the UAV is ready, UAV):
+        available: list[tuple[int, int]] = []
+        n_uavs = 0
+        for i, t, r in zip(
+            idxs.tolist(), takeoff_ns[idxs].tolist(), ready_ns[idxs].tolist()
+        ):
+            if available and available[0][0] <= t:
+                _, uav = heapq.heappop(available)
+            else:
+                uav = n_uavs
+                n_uavs += 1
+            uavs[i] = uav
+            heapq.heappush(available, (r, uav))
+        fleet_sizes[base] = n_uavs
+
+    return FleetSchedule(
+        sorties=sorties.assign(uav=uavs, ready=ready),
+        fleet_sizes=pd.Series(fleet_sizes, name="n_uavs", dtype=int).rename_axis(
+            "base"
+        ),
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    simulation_config = SimulationConfig.from_yaml("configs/jfk_to_lax")
+    rng = np.random.default_rng(0)
+    start_time = dt.datetime(2024, 1, 1)
+    flights = [
+        ScheduledFlight(
+            flight_id=f"F{i:04d}",
+            departure_time=start_time + dt.timedelta(minutes=float(minutes)),
+            simulation_config=simulation_config,
+        )
+        for i, minutes in enumerate(np.sort(rng.uniform(0, 24 * 60, size=2000)))
+    ]
+
+    t0 = time.perf_counter()
+    fleet_schedule = schedule_uav_fleets(
+        make_sorties(flights),
+        turnaround_time=dt.timedelta(minutes=30),
+        ground_refill_rate_kW=simulation_config.uavs_config.refueling_rate_kW,
+    )
+    print(
+        f"Scheduled {len(fleet_schedule.sorties)} sorties of {len(flights)} flights in "
+        f"{time.perf_counter() - t0:.2f} s."
+    )
+    print(fleet_schedule.fleet_sizes.to_string())
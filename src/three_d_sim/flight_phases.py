@@ -0,0 +1,722 @@
+"""Summaries of the airliner's and UAVs' flight paths, phase by phase (takeoff, climb, cruise legs,
+curves, docking runs, descent, landing), computed in closed form from the flight path parameters and
+the airport geometry rather than by generating waypoints and walking them.
+
+The phases follow the paths that ``airplane_waypoints_generation`` generates, and are timed as the
+airplanes fly the waypoints (each at the speed of the waypoint being approached): curve lengths are
+sums of chords, and speed changes are flown in steps, as sampled by the waypoints. Energies are
+those that ``Airplane.move_to_location`` would spend over each phase's distance.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import math
+from typing import Mapping
+
+import numpy as np
+
+from src.modeling_objects import (
+    AirlinerFlightPath,
+    AirplaneId,
+    AirportCode,
+    AirportLocation,
+    FlightPath,
+    Location,
+    ServiceSide,
+    UavFlightPath,
+    UavId,
+)
+from src.three_d_sim.airplane_waypoints_generation import (
+    AIRLINER_CURVE_SPEED_KMPH,
+    UAV_AIRPORT_SPACING_KM,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class FlightPhase:
+    """A phase of a flight path. ``end_tag``, if any, is the tag of the location at which the phase
+    ends, as in the generated waypoints.
+    """
+
+    phase: str
+    distance_km: float
+    duration_h: float
+    energy_MJ: float
+    end_tag: str | None = None
+
+    @property
+    def duration(self) -> dt.timedelta:
+        return self.duration_h * dt.timedelta(hours=1)
+
+
+@dataclasses.dataclass
+class _FlightPhases:
+    energy_consumption_rate_MJ_per_km: float
+    energy_efficiency_pc: float
+    phases: list[FlightPhase] = dataclasses.field(default_factory=list)
+
+    def add(
+        self,
+        phase: str,
+        distance_km: float,
+        duration_h: float,
+        end_tag: str | None = None,
+    ) -> None:
+        energy_MJ = (
+            self.energy_consumption_rate_MJ_per_km
+            * distance_km
+            / (self.energy_efficiency_pc / 100)
+        )
+        self.phases.append(
+            FlightPhase(phase, distance_km, duration_h, energy_MJ, end_tag)
+        )
+
+
+def get_durations_h_to_tags(phases: list[FlightPhase]) -> dict[str, float]:
+    """Get the cumulative durations (in hours) to the ends of the tagged phases; the analytic
+    equivalent of ``Airplane.get_travel_durations_to_tagged_waypoints``.
+    """
+
+    durations_h = {}
+    cumulative_duration_h = 0.0
+    for phase in phases:
+        cumulative_duration_h += phase.duration_h
+        if phase.end_tag is not None:
+            durations_h[phase.end_tag] = cumulative_duration_h
+    return durations_h
+
+
+def get_totals_by_phase(phases: list[FlightPhase]) -> dict[str, FlightPhase]:
+    """Sum the distances, durations, and energies of the phases of each kind (e.g., all cruise
+    legs), in order of first occurrence.
+    """
+
+    totals = {}
+    for p in phases:
+        if p.phase in totals:
+            t = totals[p.phase]
+            totals[p.phase] = FlightPhase(
+                p.phase,
+                t.distance_km + p.distance_km,
+                t.duration_h + p.duration_h,
+                t.energy_MJ + p.energy_MJ,
+            )
+        else:
+            totals[p.phase] = FlightPhase(
+                p.phase, p.distance_km, p.duration_h, p.energy_MJ
+            )
+    return totals
+
+
+def get_energy_quantities_MJ(
+    phases: list[FlightPhase],
+    initial_energy_MJ: float | np.ndarray,
+    refueling_energy_MJ: float | Mapping[str, float | np.ndarray],
+    energy_capacity_MJ: float,
+) -> list[float | np.ndarray]:
+    """Get the airliner's energy quantity at the end of each of its phases, before being refueled
+    by the UAV (if any) that undocks there with ``refueling_energy_MJ`` (or, if a mapping, with the
+    energy by undocking point tag). Works on scalars and arrays (e.g., of samples) alike.
+    """
+
+    energy_quantities_MJ = []
+    energy_MJ = initial_energy_MJ
+    for p in phases:
+        energy_MJ = energy_MJ - p.energy_MJ
+        energy_quantities_MJ.append(energy_MJ)
+        if isinstance(refueling_energy_MJ, Mapping):
+            undocking_energy_MJ = refueling_energy_MJ.get(p.end_tag)
+        elif p.end_tag is not None and p.end_tag.endswith(
+            "_on_airliner_undocking_point"
+        ):
+            undocking_energy_MJ = refueling_energy_MJ
+        else:
+            undocking_energy_MJ = None
+        if undocking_energy_MJ is not None:
+            energy_MJ = np.minimum(energy_MJ + undocking_energy_MJ, energy_capacity_MJ)
+    return energy_quantities_MJ
+
+
+# ==================================================================================================
+# Geometry
+
+
+def _leg_distance_km(a: AirportLocation, b: AirportLocation) -> float:
+    # Along a great circle if `TRUE_LAT_LON`:
+    return Location.direct_distance_km_between(
+        Location(a.X_KM, a.Y_KM), Location(b.X_KM, b.Y_KM)
+    )
+
+
+def _turning_angle(
+    prev_airport: AirportLocation,
+    curr_airport: AirportLocation,
+    next_airport: AirportLocation,
+) -> float:
+    """Get the angle (in radians) through which an airplane turns over ``curr_airport``."""
+
+    x1, y1 = (
+        curr_airport.X_KM - prev_airport.X_KM,
+        curr_airport.Y_KM - prev_airport.Y_KM,
+    )
+    x2, y2 = (
+        next_airport.X_KM - curr_airport.X_KM,
+        next_airport.Y_KM - curr_airport.Y_KM,
+    )
+    return abs(math.atan2(x1 * y2 - y1 * x2, x1 * x2 + y1 * y2))
+
+
+def _chord_distance_km(radius_km: float, angle: float, num: int = 50) -> float:
+    """Get the length of a curve of ``angle`` (in radians) sampled at ``num`` points."""
+
+    return (num - 1) * 2 * radius_km * math.sin(angle / (2 * (num - 1)))
+
+
+def _speed_change_step_speeds_kmph(
+    distance_km: float, start_speed_kmph: float, end_speed_kmph: float, num: int = 50
+) -> np.ndarray:
+    """Get the speeds of the ``num`` equal steps in which ``_gen_speed_change_waypoints`` changes
+    speed: those at the steps' midpoints, at constant acceleration.
+    """
+
+    step_km = distance_km / num
+    acceleration_kmphph = (end_speed_kmph**2 - start_speed_kmph**2) / (2 * distance_km)
+    return np.sqrt(
+        start_speed_kmph**2
+        + 2 * acceleration_kmphph * (np.arange(1, num + 1) * step_km - step_km / 2)
+    )
+
+
+def _speed_change_duration_h(
+    distance_km: float, start_speed_kmph: float, end_speed_kmph: float
+) -> float:
+    speeds_kmph = _speed_change_step_speeds_kmph(
+        distance_km, start_speed_kmph, end_speed_kmph
+    )
+    return float(np.sum(distance_km / len(speeds_kmph) / speeds_kmph))
+
+
+def _altitude_transition(
+    flight_path: FlightPath,
+    delta_altitude_km: float,
+    vertical_speed_kmph: float,
+    leveling_distances_km: tuple[float, float],
+    speeds_kmph: tuple[float, float],
+    reversed_: bool = False,
+) -> tuple[float, float, float]:
+    """Get the ground distance covered by, the distance along, and the duration of an altitude
+    transition, being a vertical curve, a straight climb or descent, and another vertical curve,
+    flown at the respective speeds (and changing speed between them along the straight).
+
+    If ``reversed_``, the transition's waypoints are generated from its end to its start and then
+    reversed (as for landings), so that each step of the speed change is flown at the speed of the
+    step before it, and the last at the second curve's speed.
+    """
+
+    ground_distance_km = (
+        math.sqrt(flight_path.cruise_speed_kmph**2 - vertical_speed_kmph**2)
+        * delta_altitude_km
+        / vertical_speed_kmph
+    )
+    angle = math.atan2(delta_altitude_km, ground_distance_km)
+    # Each curve's tangent length is its leveling distance; its arc length is radius * angle:
+    curve_distances_km = [
+        _chord_distance_km(leveling_distance_km / math.tan(angle / 2), angle)
+        for leveling_distance_km in leveling_distances_km
+    ]
+    straight_distance_km = math.hypot(ground_distance_km, delta_altitude_km) - sum(
+        leveling_distances_km
+    )
+    if not reversed_:
+        straight_duration_h = _speed_change_duration_h(
+            straight_distance_km, *speeds_kmph
+        )
+    else:
+        step_speeds_kmph = _speed_change_step_speeds_kmph(
+            straight_distance_km, speeds_kmph[1], speeds_kmph[0]
+        )
+        step_km = straight_distance_km / len(step_speeds_kmph)
+        straight_duration_h = float(
+            np.sum(step_km / step_speeds_kmph[:-1]) + step_km / speeds_kmph[1]
+        )
+    duration_h = (
+        curve_distances_km[0] / speeds_kmph[0]
+        + straight_duration_h
+        + curve_distances_km[1] / speeds_kmph[1]
+    )
+    return (
+        sum(leveling_distances_km) + ground_distance_km,
+        sum(curve_distances_km) + straight_distance_km,
+        duration_h,
+    )
+
+
+def _runway_climb(
+    flight_path: FlightPath, altitude_km: float
+) -> tuple[float, float, float]:
+    """The climb from the takeoff point up to ``altitude_km``."""
+
+    return _altitude_transition(
+        flight_path,
+        altitude_km,
+        flight_path.rate_of_climb_kmph,
+        (
+            flight_path.takeoff_leveling_distance_km,
+            flight_path.climb_leveling_distance_km,
+        ),
+        (flight_path.takeoff_speed_kmph, flight_path.cruise_speed_kmph),
+    )
+
+
+def _runway_descent(
+    flight_path: FlightPath, altitude_km: float
+) -> tuple[float, float, float]:
+    """The descent from ``altitude_km`` down to the landing point."""
+
+    return _altitude_transition(
+        flight_path,
+        altitude_km,
+        flight_path.rate_of_descent_kmph,
+        (
+            flight_path.descent_leveling_distance_km,
+            flight_path.landing_leveling_distance_km,
+        ),
+        (flight_path.cruise_speed_kmph, flight_path.landing_speed_kmph),
+        reversed_=True,
+    )
+
+
+def _en_route_altitude_transition(
+    flight_path: FlightPath,
+    start_altitude_km: float,
+    end_altitude_km: float,
+    inverted: bool = False,
+) -> tuple[float, float, float]:
+    """The analytic equivalent of ``_gen_altitude_transition_waypoints(..., wrt_runway=False)``."""
+
+    kind = +1 if end_altitude_km > start_altitude_km else -1
+    invert = +1 if not inverted else -1
+    if kind * invert == +1:
+        vertical_speed_kmph = flight_path.rate_of_climb_kmph
+        leveling_distance_km = flight_path.climb_leveling_distance_km
+    else:
+        vertical_speed_kmph = flight_path.rate_of_descent_kmph
+        leveling_distance_km = flight_path.descent_leveling_distance_km
+    return _altitude_transition(
+        flight_path,
+        abs(end_altitude_km - start_altitude_km),
+        vertical_speed_kmph,
+        (leveling_distance_km, leveling_distance_km),
+        (flight_path.cruise_speed_kmph, flight_path.cruise_speed_kmph),
+    )
+
+
+def _docking_distance_from_airport_km(uav_fp: UavFlightPath) -> float:
+    if uav_fp.undocking_distance_from_airport_km is not None:
+        return uav_fp.refueling_distance_km + uav_fp.undocking_distance_from_airport_km
+    else:
+        return uav_fp.refueling_distance_km / 2
+
+
+def _add_landing(
+    phases: _FlightPhases, airplane_id: AirplaneId, flight_path: FlightPath
+) -> None:
+    """Add an airplane's landing run. Its waypoints are generated from the airport to the landing
+    point and then reversed, so that each step is flown at the speed of the step before it and the
+    last step (to the airport) is not flown at all. The landed point is tagged where the landing
+    run starts, at the landing point.
+    """
+
+    phases.add("landing", 0.0, 0.0, end_tag=f"{airplane_id}_landed_point")
+    step_speeds_kmph = _speed_change_step_speeds_kmph(
+        flight_path.landing_distance_km, 0, flight_path.landing_speed_kmph
+    )
+    step_km = flight_path.landing_distance_km / len(step_speeds_kmph)
+    phases.add(
+        "landing",
+        step_km * (len(step_speeds_kmph) - 1),
+        float(np.sum(step_km / step_speeds_kmph[:-1])),
+    )
+
+
+# ==================================================================================================
+# Airliner
+
+
+def summarize_airliner_flight_path(
+    airliner_fp: AirlinerFlightPath,
+    uav_fps: dict[AirportCode, dict[ServiceSide, dict[UavId, UavFlightPath]]],
+    energy_consumption_rate_MJ_per_km: float,
+    energy_efficiency_pc: float = 100.0,
+    airliner_id: str = "Airliner",
+) -> list[FlightPhase]:
+    """Summarize the airliner's flight path phase by phase, given the UAVs' flight paths (e.g., from
+    ``make_uav_flight_paths``), which determine where the airliner's docking runs are.
+    """
+
+    fp = airliner_fp
+    airports = fp.airports
+    phases = _FlightPhases(energy_consumption_rate_MJ_per_km, energy_efficiency_pc)
+
+    phases.add(
+        "takeoff",
+        fp.takeoff_distance_km,
+        _speed_change_duration_h(fp.takeoff_distance_km, 0, fp.takeoff_speed_kmph),
+        end_tag=f"{airliner_id}_takeoff_point",
+    )
+    climb_ground_distance_km, distance_km, duration_h = _runway_climb(
+        fp, fp.cruise_altitude_km
+    )
+    phases.add(
+        "climb", distance_km, duration_h, end_tag=f"{airliner_id}_ascended_point"
+    )
+    # Distance along the current leg from the airport at which it starts:
+    leg_position_km = fp.takeoff_distance_km + climb_ground_distance_km
+
+    for prev_airport, curr_airport, next_airport in zip(
+        airports[:-2], airports[1:-1], airports[2:]
+    ):
+        code = curr_airport.CODE
+        turning_angle = _turning_angle(prev_airport, curr_airport, next_airport)
+        # Distance of the curve's start and end points from the airport:
+        curve_tangent_km = fp.turning_radius_km * math.tan(turning_angle / 2)
+        curve_start_tag = f"{airliner_id}_curve_over_{code}_start_point"
+        airport_uav_fps = uav_fps.get(code, {})
+
+        # Cruise to, and slow down for, the first UAV to dock (if any) or the curve:
+        to_airport_uav_fps = list(airport_uav_fps.get("to_airport", {}).items())
+        n_uavs = len(to_airport_uav_fps)
+        if n_uavs > 0:
+            uav_id, uav_fp = to_airport_uav_fps[0]
+            position_km = UAV_AIRPORT_SPACING_KM * n_uavs + (
+                _docking_distance_from_airport_km(uav_fp)
+            )
+            speed_kmph = uav_fp.cruise_speed_kmph
+            end_tag = f"{uav_id}_on_airliner_docking_point"
+        else:
+            position_km = curve_tangent_km
+            speed_kmph = AIRLINER_CURVE_SPEED_KMPH
+            end_tag = curve_start_tag
+        distance_km = (
+            _leg_distance_km(prev_airport, curr_airport)
+            - position_km
+            - fp.speed_change_distance_km
+            - leg_position_km
+        )
+        # The cruise leg ends at the slow-down's first waypoint, so is flown at that one's speed:
+        step_speeds_kmph = _speed_change_step_speeds_kmph(
+            fp.speed_change_distance_km, fp.cruise_speed_kmph, speed_kmph
+        )
+        phases.add("cruise", distance_km, distance_km / step_speeds_kmph[0])
+        phases.add(
+            "slow_down",
+            fp.speed_change_distance_km,
+            float(
+                np.sum(
+                    fp.speed_change_distance_km
+                    / len(step_speeds_kmph)
+                    / step_speeds_kmph
+                )
+            ),
+            end_tag=end_tag,
+        )
+
+        # Docking run, with positions as distances from the airport (decreasing):
+        for j, (uav_id, uav_fp) in enumerate(to_airport_uav_fps):
+            docking_position_km = UAV_AIRPORT_SPACING_KM * (n_uavs - j) + (
+                _docking_distance_from_airport_km(uav_fp)
+            )
+            if j > 0:
+                distance_km = position_km - docking_position_km
+                phases.add(
+                    "docking_run",
+                    distance_km,
+                    distance_km / uav_fp.cruise_speed_kmph,
+                    end_tag=f"{uav_id}_on_airliner_docking_point",
+                )
+            phases.add(
+                "docking_run",
+                uav_fp.refueling_distance_km,
+                uav_fp.refueling_distance_km / uav_fp.cruise_speed_kmph,
+                end_tag=f"{uav_id}_on_airliner_undocking_point",
+            )
+            position_km = docking_position_km - uav_fp.refueling_distance_km
+        if n_uavs > 0:
+            distance_km = position_km - curve_tangent_km
+            phases.add(
+                "docking_run",
+                distance_km,
+                distance_km / AIRLINER_CURVE_SPEED_KMPH,
+                end_tag=curve_start_tag,
+            )
+
+        curve_distance_km = _chord_distance_km(fp.turning_radius_km, turning_angle)
+        phases.add(
+            "curve",
+            curve_distance_km,
+            curve_distance_km / AIRLINER_CURVE_SPEED_KMPH,
+            end_tag=f"{airliner_id}_curve_over_{code}_end_point",
+        )
+
+        # Docking run, with positions as distances from the airport (increasing):
+        position_km = curve_tangent_km
+        speed_kmph = AIRLINER_CURVE_SPEED_KMPH
+        for uav_id, uav_fp in airport_uav_fps.get("from_airport", {}).items():
+            undocking_position_km = _docking_distance_from_airport_km(uav_fp)
+            distance_km = (
+                undocking_position_km - uav_fp.refueling_distance_km - position_km
+            )
+            phases.add(
+                "docking_run",
+                distance_km,
+                distance_km / uav_fp.cruise_speed_kmph,
+                end_tag=f"{uav_id}_on_airliner_docking_point",
+            )
+            phases.add(
+                "docking_run",
+                uav_fp.refueling_distance_km,
+                uav_fp.refueling_distance_km / uav_fp.cruise_speed_kmph,
+                end_tag=f"{uav_id}_on_airliner_undocking_point",
+            )
+            position_km = undocking_position_km
+            speed_kmph = uav_fp.cruise_speed_kmph
+
+        phases.add(
+            "speed_up",
+            fp.speed_change_distance_km,
+            _speed_change_duration_h(
+                fp.speed_change_distance_km, speed_kmph, fp.cruise_speed_kmph
+            ),
+        )
+        leg_position_km = position_km + fp.speed_change_distance_km
+
+    descent_ground_distance_km, descent_distance_km, descent_duration_h = (
+        _runway_descent(fp, fp.cruise_altitude_km)
+    )
+    distance_km = (
+        _leg_distance_km(airports[-2], airports[-1])
+        - fp.landing_distance_km
+        - descent_ground_distance_km
+        - leg_position_km
+    )
+    phases.add(
+        "cruise",
+        distance_km,
+        distance_km / fp.cruise_speed_kmph,
+        end_tag=f"{airliner_id}_descent_point",
+    )
+    phases.add(
+        "descent",
+        descent_distance_km,
+        descent_duration_h,
+        end_tag=f"{airliner_id}_landing_point",
+    )
+    _add_landing(phases, airliner_id, fp)
+
+    return phases.phases
+
+
+# ==================================================================================================
+# UAVs
+
+
+def summarize_uav_flight_path(
+    uav_id: UavId,
+    j: int,
+    n_uavs: int,
+    uav_fp: UavFlightPath,
+    airliner_fp: AirlinerFlightPath,
+    energy_consumption_rate_MJ_per_km: float,
+    energy_efficiency_pc: float = 100.0,
+) -> list[FlightPhase]:
+    """Summarize the flight path of the ``j``th of the ``n_uavs`` UAVs on its side of its airport,
+    phase by phase (as generated by ``generate_uav_waypoint_segments``).
+    """
+
+    fp = uav_fp
+    phases = _FlightPhases(energy_consumption_rate_MJ_per_km, energy_efficiency_pc)
+
+    # Positions are distances from the UAV's airport along the airliner's track to/from airport A.
+    takeoff_position_km = UAV_AIRPORT_SPACING_KM * (n_uavs - j)
+    docking_distance_km = _docking_distance_from_airport_km(fp)
+    # The UAV descends to (to-airport side) or ascends from (from-airport side) the airliner while
+    #     flying between its arc and its docking or undocking point:
+    (
+        arc_transition_ground_distance_km,
+        arc_transition_distance_km,
+        arc_transition_duration_h,
+    ) = _en_route_altitude_transition(
+        fp, fp.refueling_altitude_km, fp.cruise_altitude_km, inverted=True
+    )
+    # Distance between the arc's ends and the airport (to-airport side) or takeoff point:
+    d = docking_distance_km + arc_transition_ground_distance_km
+    r = abs(fp.arc_radius_km)
+    arc_distance_km = _chord_distance_km(r, 2 * math.pi - 2 * math.atan2(d, r), num=500)
+
+    if fp.service_side == "to_airport":
+        climb_ground_distance_km = _add_uav_takeoff(
+            phases, uav_id, fp, fp.cruise_altitude_km
+        )
+        distance_km = d - fp.takeoff_distance_km - climb_ground_distance_km
+        phases.add(
+            "cruise",
+            distance_km,
+            distance_km / fp.cruise_speed_kmph,
+            end_tag=f"{uav_id}_arc_start_point",
+        )
+        phases.add(
+            "arc",
+            arc_distance_km,
+            arc_distance_km / fp.cruise_speed_kmph,
+            end_tag=f"{uav_id}_arc_end_point",
+        )
+        phases.add(
+            "descent_to_airliner",
+            arc_transition_distance_km,
+            arc_transition_duration_h,
+            end_tag=f"{uav_id}_on_airliner_docking_point",
+        )
+        phases.add(
+            "refueling",
+            fp.refueling_distance_km,
+            fp.refueling_distance_km / fp.cruise_speed_kmph,
+            end_tag=f"{uav_id}_on_airliner_undocking_point",
+        )
+        position_km = (
+            takeoff_position_km + docking_distance_km - fp.refueling_distance_km
+        )
+
+        ground_distance_km, distance_km, duration_h = _en_route_altitude_transition(
+            fp, fp.refueling_altitude_km, fp.cruise_altitude_km
+        )
+        phases.add(
+            "ascent_from_airliner",
+            distance_km,
+            duration_h,
+            end_tag=f"{uav_id}_ascended_from_airliner_point",
+        )
+        position_km -= ground_distance_km
+
+        # UAV slows down while descending below the level of the airliner's tail:
+        airliner_clearing_duration_h = fp.airliner_clearance_distance_km / (
+            airliner_fp.cruise_speed_kmph - fp.AVG_AIRLINER_CLEARANCE_SPEED_KMPH
+        )
+        distance_km = (
+            fp.AVG_AIRLINER_CLEARANCE_SPEED_KMPH * airliner_clearing_duration_h
+        )
+        phases.add(
+            "airliner_clearance",
+            distance_km,
+            _speed_change_duration_h(
+                distance_km / 2, fp.cruise_speed_kmph, fp.airliner_clearance_speed_kmph
+            )
+            + _speed_change_duration_h(
+                distance_km / 2, fp.airliner_clearance_speed_kmph, fp.cruise_speed_kmph
+            ),
+            end_tag=f"{uav_id}_lowering_point",
+        )
+        position_km -= distance_km
+
+        ground_distance_km, distance_km, duration_h = _en_route_altitude_transition(
+            fp, fp.cruise_altitude_km, fp.airliner_clearance_altitude_km
+        )
+        phases.add(
+            "lowering", distance_km, duration_h, end_tag=f"{uav_id}_lowered_point"
+        )
+        position_km -= ground_distance_km
+
+        landing_position_km = UAV_AIRPORT_SPACING_KM * (j + 1)
+        _add_uav_landing(
+            phases,
+            uav_id,
+            fp,
+            fp.airliner_clearance_altitude_km,
+            cruise_distance_km=position_km - landing_position_km,
+        )
+
+    else:
+        climb_ground_distance_km = _add_uav_takeoff(
+            phases, uav_id, fp, fp.cruise_altitude_km
+        )
+        distance_km = (
+            docking_distance_km
+            - fp.refueling_distance_km
+            - arc_transition_ground_distance_km
+            - (takeoff_position_km + fp.takeoff_distance_km + climb_ground_distance_km)
+        )
+        phases.add(
+            "cruise",
+            distance_km,
+            distance_km / fp.cruise_speed_kmph,
+            end_tag=f"{uav_id}_descent_to_airliner_point",
+        )
+        phases.add(
+            "descent_to_airliner",
+            arc_transition_distance_km,
+            arc_transition_duration_h,
+            end_tag=f"{uav_id}_on_airliner_docking_point",
+        )
+        phases.add(
+            "refueling",
+            fp.refueling_distance_km,
+            fp.refueling_distance_km / fp.cruise_speed_kmph,
+            end_tag=f"{uav_id}_on_airliner_undocking_point",
+        )
+        phases.add(
+            "ascent_from_airliner",
+            arc_transition_distance_km,
+            arc_transition_duration_h,
+            end_tag=f"{uav_id}_ascended_from_airliner_point",
+        )
+        phases.add(
+            "arc",
+            arc_distance_km,
+            arc_distance_km / fp.cruise_speed_kmph,
+            end_tag=f"{uav_id}_arc_end_point",
+        )
+        _add_uav_landing(
+            phases, uav_id, fp, fp.cruise_altitude_km, cruise_distance_km=d
+        )
+
+    return phases.phases
+
+
+def _add_uav_takeoff(
+    phases: _FlightPhases, uav_id: UavId, fp: UavFlightPath, altitude_km: float
+) -> float:
+    """Add the UAV's takeoff and climb, returning the climb's ground distance."""
+
+    phases.add(
+        "takeoff",
+        fp.takeoff_distance_km,
+        _speed_change_duration_h(fp.takeoff_distance_km, 0, fp.takeoff_speed_kmph),
+        end_tag=f"{uav_id}_takeoff_point",
+    )
+    ground_distance_km, distance_km, duration_h = _runway_climb(fp, altitude_km)
+    phases.add("climb", distance_km, duration_h, end_tag=f"{uav_id}_ascended_point")
+    return ground_distance_km
+
+
+def _add_uav_landing(
+    phases: _FlightPhases,
+    uav_id: UavId,
+    fp: UavFlightPath,
+    altitude_km: float,
+    cruise_distance_km: float,
+) -> None:
+    """Add the UAV's cruise over ``cruise_distance_km`` to where it lands, then its descent and
+    landing.
+    """
+
+    ground_distance_km, distance_km, duration_h = _runway_descent(fp, altitude_km)
+    cruise_distance_km -= fp.landing_distance_km + ground_distance_km
+    phases.add(
+        "cruise",
+        cruise_distance_km,
+        cruise_distance_km / fp.cruise_speed_kmph,
+        end_tag=f"{uav_id}_descent_point",
+    )
+    phases.add("descent", distance_km, duration_h, end_tag=f"{uav_id}_landing_point")
+    _add_landing(phases, uav_id, fp)
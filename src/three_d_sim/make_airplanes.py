@@ -1,3 +1,4 @@
+from src.feasibility_study.spec_table import get_uav_spec_entry
 from src.modeling_objects import (
     Airliner,
     AirlinerFlightPath,
@@ -11,8 +12,8 @@ from src.modeling_objects import (
 from src.utils.utils import MJ_PER_KWH
 
 from .airplane_waypoints_generation import (
-    generate_all_airliner_waypoints,
-    generate_all_uav_waypoints,
+    iter_all_airliner_waypoints,
+    iter_all_uav_waypoints,
 )
 from .simulation_config_schema import SimulationConfig
 
@@ -37,9 +38,11 @@ def make_airplanes(
         airliner_fp=airliner.flight_path,
     )
 
-    waypoints = generate_all_airliner_waypoints(airliner.id, airliner.flight_path, uavs)
-    airliner.location = waypoints.pop(0).LOCATION
-    airliner.waypoints = waypoints
+    waypoints = iter_all_airliner_waypoints(airliner.id, airliner.flight_path, uavs)
+    airliner.location = next(waypoints).LOCATION
+    # Materialized, as the travel durations to tagged waypoints are needed up front (and the
+    #     simulator drops reached waypoints from the front of the list):
+    airliner.waypoints = list(waypoints)
 
     return airliner, uavs
 
@@ -94,13 +97,73 @@ def _make_uav(
         initial_refueling_energy_level_pc=uavs_config.initial_refueling_energy_level_pc,
     )
 
+    uav.flight_path = make_uav_flight_path(
+        simulation_config,
+        fuel,
+        airliner_fp,
+        uav_airport_code,
+        service_side,
+        n_uavs,
+        service_side_uav_idx,
+    )
+
+    waypoints = iter_all_uav_waypoints(
+        uav.id, service_side_uav_idx, n_uavs, uav.flight_path, airliner_fp
+    )
+    uav.location = next(waypoints).LOCATION
+    uav.waypoints = list(waypoints)
+
+    return uav
+
+
+def make_uav_flight_paths(
+    simulation_config: SimulationConfig,
+    fuel: Fuel,
+    airliner_fp: AirlinerFlightPath,
+) -> dict[AirportCode, dict[ServiceSide, dict[UavId, UavFlightPath]]]:
+    """Make the UAVs' flight paths (but not the UAVs or their waypoints), keyed like the UAVs that
+    ``make_airplanes`` makes.
+    """
+
+    uav_fps = {}
+    for uav_airport_code, x in simulation_config.n_uavs_per_flyover_airport.items():
+        airport_uav_idx = 0
+        uav_fps[uav_airport_code] = {}
+        for service_side, n_uavs in x.dict().items():
+            uav_fps[uav_airport_code][service_side] = {}
+            for service_side_uav_idx in range(n_uavs):
+                uav_id = f"{uav_airport_code}_UAV_{airport_uav_idx}"
+                uav_fps[uav_airport_code][service_side][uav_id] = make_uav_flight_path(
+                    simulation_config,
+                    fuel,
+                    airliner_fp,
+                    uav_airport_code,
+                    service_side,
+                    n_uavs,
+                    service_side_uav_idx,
+                )
+                airport_uav_idx += 1
+
+    return uav_fps
+
+
+def make_uav_flight_path(
+    simulation_config: SimulationConfig,
+    fuel: Fuel,
+    airliner_fp: AirlinerFlightPath,
+    uav_airport_code: AirportCode,
+    service_side: ServiceSide,
+    n_uavs: int,
+    service_side_uav_idx: int,
+) -> UavFlightPath:
+    uavs_config = simulation_config.uavs_config
     refueling_rate_kW = min(
         simulation_config.airliner_config.refueling_rate_kW,
         simulation_config.uavs_config.refueling_rate_kW,
     )
     refueling_distance_km = (
         uavs_config.airplane_spec.cruise_speed_kmph
-        * uav.refueling_energy_capacity_MJ
+        * get_uav_spec_entry(uavs_config.airplane_spec, fuel).refueling_energy_MJ
         / refueling_rate_kW
         / MJ_PER_KWH
     )
@@ -110,8 +173,7 @@ def _make_uav(
         else (n_uavs - service_side_uav_idx - 1)
     )
     uavs_fp_config = simulation_config.uavs_flight_path_config
-    # Instantiate the UAV Flight Path:
-    uav.flight_path = UavFlightPath(
+    return UavFlightPath(
         home_airport=uav_airport_code,
         takeoff_speed_kmph=uavs_fp_config.takeoff_speed_kmph,
         takeoff_distance_km=uavs_fp_config.takeoff_distance_km,
@@ -148,11 +210,3 @@ def _make_uav(
             + uavs_fp_config.inter_uav_vertical_distance_km * service_side_uav_idx
         ),
     )
-
-    waypoints = generate_all_uav_waypoints(
-        uav.id, service_side_uav_idx, n_uavs, uav.flight_path, airliner_fp
-    )
-    uav.location = waypoints.pop(0).LOCATION
-    uav.waypoints = waypoints
-
-    return uav
@@ -0,0 +1,309 @@
+"""A Monte Carlo ensemble of a ``SimulationConfig``'s mission under uncertainty in the refueling
+rates, the UAVs' launch times, the airliner's and UAVs' cruise speeds, and the airliner's and UAVs'
+initial energy levels, to estimate the distributions of the airliner's landing energy margin and of
+each UAV's docking-time slack, and the probability of a missed rendezvous.
+
+The flight paths are summarized phase by phase with ``flight_phases`` once, for the config's own
+(nominal) parameters. The sampled parameters are then carried along an ensemble axis (of
+``n_samples``) through the phases' timing and the airliner's energy accounting, such that the whole
+ensemble is evaluated in one vectorized pass rather than by simulating each sample:
+
+- The UAVs take off when scheduled for the nominal parameters (as in ``delay_uavs``), less a
+  ``launch_lead_mins`` to spare, but late by their sampled launch delays.
+- The airliner's cruise phases, and the UAVs' cruise and arc phases (those that they fly on their
+  own), take longer or shorter by the sampled cruise speeds. Docking runs are flown in formation at
+  the UAVs' nominal cruise speed, and the energy consumed per distance does not depend on speed.
+- A UAV that reaches its docking point after the airliner (by more than ``max_lateness_mins``)
+  misses its rendezvous and does not refuel the airliner. Otherwise, it refuels the airliner at its
+  sampled refueling rate throughout the nominal refueling window, or until its payload (at its
+  sampled initial refueling energy level) is empty.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.feasibility_study.spec_table import get_airliner_spec_entry, get_uav_spec_entry
+from src.modeling_objects import AirlinerFlightPath
+from src.three_d_sim.flight_phases import (
+    FlightPhase,
+    get_durations_h_to_tags,
+    get_energy_quantities_MJ,
+    summarize_airliner_flight_path,
+    summarize_uav_flight_path,
+)
+from src.three_d_sim.make_airplanes import make_uav_flight_paths
+from src.three_d_sim.simulation_config_schema import SimulationConfig
+from src.utils.utils import MJ_PER_KWH
+
+# Phases flown at the airliner's and at the UAVs' own cruise speeds:
+_AIRLINER_CRUISE_PHASES = ("cruise",)
+_UAV_CRUISE_PHASES = ("cruise", "arc")
+
+# Tolerance for simultaneous arrivals, in h:
+_DURATION_TOL_H = 1e-9
+
+
+@dataclasses.dataclass(frozen=True)
+class Uncertainties:
+    """The standard deviations of the sampled parameters, each of which is normally distributed
+    about its value in the config. Speeds and rates are sampled relative to their values (e.g.,
+    0.05 for 5%); energy levels are clipped to between empty and full.
+    """
+
+    refueling_rate_rel_std: float = 0.1
+    """Of each UAV's refueling rate."""
+    launch_delay_std_mins: float = 1.0
+    """Of each UAV's launch delay (positive if it takes off late)."""
+    airliner_cruise_speed_rel_std: float = 0.02
+    uav_cruise_speed_rel_std: float = 0.05
+    """Of each UAV's cruise speed."""
+    airliner_initial_energy_level_std_pc: float = 1.0
+    uav_initial_refueling_energy_level_std_pc: float = 2.0
+    """Of each UAV's initial refueling energy level."""
+
+
+@dataclasses.dataclass
+class MonteCarloEnsemble:
+    samples: pd.DataFrame
+    """One row per sample, with the airliner's sampled ``cruise_speed_kmph`` and
+    ``initial_energy_level_pc``, its ``landing_energy_margin_MJ`` and ``min_energy_margin_MJ``
+    (above the reserve), and its ``n_missed_rendezvous``.
+    """
+    rendezvous: pd.DataFrame
+    """One row per sample and UAV (indexed by ``sample`` and ``uav_id``), with the UAV's sampled
+    ``launch_delay_mins``, ``cruise_speed_kmph``, ``refueling_rate_kW``, and
+    ``initial_refueling_energy_level_pc``, its ``docking_slack_mins`` (the time by which it reaches
+    its docking point before the airliner), whether it ``missed`` its rendezvous, and the
+    ``refueling_energy_MJ`` that it delivered.
+    """
+
+    def get_summary(
+        self, quantiles: Sequence[float] = (0.01, 0.05, 0.5, 0.95, 0.99)
+    ) -> pd.DataFrame:
+        """Get the mean, standard deviation, and ``quantiles`` of the landing energy margin and of
+        each UAV's docking-time slack, and the probability of each UAV missing its rendezvous (and
+        of any UAV missing its rendezvous, or the landing energy margin being negative).
+        """
+
+        def _describe(x: pd.Series) -> dict[str, float]:
+            return dict(
+                mean=x.mean(),
+                std=x.std(),
+                **{f"q{q * 100:g}": x.quantile(q) for q in quantiles},
+            )
+
+        rows = {
+            "landing_energy_margin_MJ": dict(
+                **_describe(self.samples["landing_energy_margin_MJ"]),
+                probability=(self.samples["landing_energy_margin_MJ"] < 0).mean(),
+            ),
+            "missed_rendezvous": dict(
+                probability=(self.samples["n_missed_rendezvous"] > 0).mean()
+            ),
+        }
+        for uav_id, df in self.rendezvous.groupby("uav_id", sort=False):
+            rows[f"{uav_id}_docking_slack_mins"] = dict(
+                **_describe(df["docking_slack_mins"]),
+                probability=df["missed"].mean(),
+            )
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def run_monte_carlo(
+    simulation_config: SimulationConfig,
+    n_samples: int = 10000,
+    uncertainties: Uncertainties = Uncertainties(),
+    reserve_energy_thres_MJ: float = 0.0,
+    launch_lead_mins: float = 0.0,
+    max_lateness_mins: float = 0.0,
+    seed: Optional[int] = None,
+) -> MonteCarloEnsemble:
+    """Sample the config's uncertain parameters ``n_samples`` times and evaluate the mission with
+    each sample's.
+    """
+
+    rng = np.random.default_rng(seed)
+    airliner_config = simulation_config.airliner_config
+    uavs_config = simulation_config.uavs_config
+    airliner_spec = airliner_config.airplane_spec
+    uav_spec = uavs_config.airplane_spec
+    fuel = airliner_spec.fuel
+    airliner_fp = AirlinerFlightPath.from_configs(
+        simulation_config.airliner_flight_path_config, airliner_config
+    )
+    uav_fps = make_uav_flight_paths(simulation_config, fuel, airliner_fp)
+    airliner_phases = summarize_airliner_flight_path(
+        airliner_fp, uav_fps, airliner_spec.energy_consumption_rate_MJ_per_km
+    )
+    energy_capacity_MJ = get_airliner_spec_entry(airliner_spec).energy_capacity_MJ
+    refueling_energy_capacity_MJ = get_uav_spec_entry(
+        uav_spec, fuel
+    ).refueling_energy_MJ
+    refueling_rate_kW = min(
+        airliner_config.refueling_rate_kW, uavs_config.refueling_rate_kW
+    )
+
+    def _sample_factors(rel_std: float, size: tuple[int, ...]) -> np.ndarray:
+        # Clipped such that speeds and rates stay positive:
+        return np.maximum(1 + rel_std * rng.standard_normal(size), 1e-3)
+
+    def _sample_levels_pc(level_pc: float, std_pc: float, size: int) -> np.ndarray:
+        return np.clip(level_pc + std_pc * rng.standard_normal(size), 0, 100)
+
+    airliner_speed_factors = _sample_factors(
+        uncertainties.airliner_cruise_speed_rel_std, (n_samples,)
+    )
+    airliner_durations_h = _get_durations_h_to_tags(
+        airliner_phases, _AIRLINER_CRUISE_PHASES, airliner_speed_factors
+    )
+
+    uav_ids = []
+    refueling_windows_h = []
+    rendezvous = []
+    for x in uav_fps.values():
+        for service_side_uav_fps in x.values():
+            for j, (uav_id, uav_fp) in enumerate(service_side_uav_fps.items()):
+                uav_phases = summarize_uav_flight_path(
+                    uav_id,
+                    j,
+                    len(service_side_uav_fps),
+                    uav_fp,
+                    airliner_fp,
+                    uav_spec.energy_consumption_rate_MJ_per_km,
+                )
+                docking_tag = f"{uav_id}_on_airliner_docking_point"
+                # Takeoff time scheduled for the nominal parameters:
+                takeoff_h = (
+                    get_durations_h_to_tags(airliner_phases)[docking_tag]
+                    - get_durations_h_to_tags(uav_phases)[docking_tag]
+                    - launch_lead_mins / 60
+                )
+                launch_delays_h = (
+                    uncertainties.launch_delay_std_mins
+                    / 60
+                    * rng.standard_normal(n_samples)
+                )
+                speed_factors = _sample_factors(
+                    uncertainties.uav_cruise_speed_rel_std, (n_samples,)
+                )
+                docking_slacks_h = airliner_durations_h[docking_tag] - (
+                    takeoff_h
+                    + launch_delays_h
+                    + _get_durations_h_to_tags(
+                        uav_phases, _UAV_CRUISE_PHASES, speed_factors
+                    )[docking_tag]
+                )
+                uav_ids.append(uav_id)
+                refueling_windows_h.append(
+                    uav_fp.refueling_distance_km / uav_fp.cruise_speed_kmph
+                )
+                rendezvous.append(
+                    dict(
+                        launch_delay_mins=launch_delays_h * 60,
+                        cruise_speed_kmph=speed_factors * uav_fp.cruise_speed_kmph,
+                        refueling_rate_kW=(
+                            _sample_factors(
+                                uncertainties.refueling_rate_rel_std, (n_samples,)
+                            )
+                            * refueling_rate_kW
+                        ),
+                        initial_refueling_energy_level_pc=_sample_levels_pc(
+                            min(uavs_config.initial_refueling_energy_level_pc, 100),
+                            uncertainties.uav_initial_refueling_energy_level_std_pc,
+                            n_samples,
+                        ),
+                        docking_slack_mins=docking_slacks_h * 60,
+                        missed=(
+                            docking_slacks_h < -max_lateness_mins / 60 - _DURATION_TOL_H
+                        ),
+                    )
+                )
+    for x, refueling_window_h in zip(rendezvous, refueling_windows_h):
+        x["refueling_energy_MJ"] = np.where(
+            x["missed"],
+            0.0,
+            np.minimum(
+                x["refueling_rate_kW"] * MJ_PER_KWH * refueling_window_h,
+                x["initial_refueling_energy_level_pc"]
+                / 100
+                * refueling_energy_capacity_MJ,
+            ),
+        )
+
+    # The airliner's energy accounting, along the ensemble:
+    initial_energy_levels_pc = _sample_levels_pc(
+        airliner_config.initial_energy_level_pc,
+        uncertainties.airliner_initial_energy_level_std_pc,
+        n_samples,
+    )
+    refueling_energies_MJ = {
+        f"{uav_id}_on_airliner_undocking_point": x["refueling_energy_MJ"]
+        for uav_id, x in zip(uav_ids, rendezvous)
+    }
+    initial_energy_MJ = initial_energy_levels_pc / 100 * energy_capacity_MJ
+    energy_quantities_MJ = get_energy_quantities_MJ(
+        airliner_phases, initial_energy_MJ, refueling_energies_MJ, energy_capacity_MJ
+    )
+    energy_MJ = energy_quantities_MJ[-1]
+    min_energy_MJ = np.min([initial_energy_MJ, *energy_quantities_MJ], axis=0)
+
+    samples_df = pd.DataFrame(
+        dict(
+            cruise_speed_kmph=airliner_speed_factors * airliner_fp.cruise_speed_kmph,
+            initial_energy_level_pc=initial_energy_levels_pc,
+            landing_energy_margin_MJ=energy_MJ - reserve_energy_thres_MJ,
+            min_energy_margin_MJ=min_energy_MJ - reserve_energy_thres_MJ,
+            n_missed_rendezvous=sum(
+                (x["missed"].astype(int) for x in rendezvous),
+                np.zeros(n_samples, dtype=int),
+            ),
+        )
+    ).rename_axis("sample")
+    rendezvous_df = (
+        pd.concat(
+            [pd.DataFrame(x) for x in rendezvous],
+            keys=uav_ids,
+            names=["uav_id", "sample"],
+        )
+        .swaplevel()
+        .sort_index(level="sample", sort_remaining=False)
+    )
+    return MonteCarloEnsemble(samples=samples_df, rendezvous=rendezvous_df)
+
+
+def _get_durations_h_to_tags(
+    phases: list[FlightPhase], cruise_phases: tuple[str, ...], speed_factors: np.ndarray
+) -> dict[str, np.ndarray]:
+    """``get_durations_h_to_tags`` along the ensemble, with the ``cruise_phases`` flown at the
+    nominal cruise speed times each sample's ``speed_factors``.
+    """
+
+    durations_h = {}
+    cumulative_durations_h = np.zeros_like(speed_factors)
+    for phase in phases:
+        if phase.phase in cruise_phases:
+            cumulative_durations_h = cumulative_durations_h + (
+                phase.duration_h / speed_factors
+            )
+        else:
+            cumulative_durations_h = cumulative_durations_h + phase.duration_h
+        if phase.end_tag is not None:
+            durations_h[phase.end_tag] = cumulative_durations_h
+    return durations_h
+
+
+if __name__ == "__main__":
+    import time
+
+    simulation_config = SimulationConfig.from_yaml("configs/jfk_to_lax")
+    t0 = time.perf_counter()
+    ensemble = run_monte_carlo(
+        simulation_config, n_samples=100000, launch_lead_mins=5, seed=0
+    )
+    print(f"Evaluated in {time.perf_counter() - t0:.2f} s:")
+    print(ensemble.get_summary().to_string())
@@ -0,0 +1,259 @@
+"""A solver for the minimum number of UAVs on each service side of each flyover airport that keeps
+the airliner at or above a reserve energy threshold, with every UAV's (un)docking run fitting
+between the airports and every UAV able to fly its own flight path.
+
+Rather than running the simulation, each candidate number of UAVs is evaluated analytically with
+``flight_phases``, and the numbers are found by bisection. The service sides are solved in the
+order in which the airliner reaches them, each with as few UAVs as it needs for the airliner to
+reach the next service side's first UAV (or its destination airport) with its reserve energy.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import Callable, Optional
+
+import yaml
+
+from src.feasibility_study.spec_table import get_airliner_spec_entry, get_uav_spec_entry
+from src.modeling_objects import (
+    AirlinerFlightPath,
+    AirportCode,
+    ServiceSide,
+    UavFlightPath,
+    UavId,
+)
+from src.three_d_sim.flight_phases import (
+    get_energy_quantities_MJ,
+    summarize_airliner_flight_path,
+    summarize_uav_flight_path,
+)
+from src.three_d_sim.make_airplanes import make_uav_flight_paths
+from src.three_d_sim.simulation_config_schema import (
+    NUavsAtFlyOverAirport,
+    SimulationConfig,
+)
+
+SERVICE_SIDES: tuple[ServiceSide, ServiceSide] = ("to_airport", "from_airport")
+
+# Tolerance for phases of (practically) zero distance, in km:
+_DISTANCE_TOL_KM = 1e-9
+
+ServiceSideKey = tuple[AirportCode, ServiceSide]
+
+
+@dataclasses.dataclass(frozen=True)
+class _Evaluation:
+    fits: bool
+    """Whether the service side's UAVs' flight paths, and the airliner's up to the next service
+    side's first UAV, are geometrically feasible, and whether the UAVs have the energy to fly them.
+    """
+    min_energy_MJ: float
+    """The airliner's lowest energy quantity up to the next service side's first UAV (or its
+    destination airport).
+    """
+
+
+@dataclasses.dataclass
+class _Evaluator:
+    simulation_config: SimulationConfig
+
+    def __post_init__(self):
+        airliner_config = self.simulation_config.airliner_config
+        uavs_config = self.simulation_config.uavs_config
+        self.airliner_fp = AirlinerFlightPath.from_configs(
+            self.simulation_config.airliner_flight_path_config, airliner_config
+        )
+        airliner_spec = airliner_config.airplane_spec
+        self.uav_spec = uavs_config.airplane_spec
+        fuel = airliner_spec.fuel
+        self.energy_capacity_MJ = get_airliner_spec_entry(
+            airliner_spec
+        ).energy_capacity_MJ
+        self.initial_energy_MJ = (
+            airliner_config.initial_energy_level_pc / 100 * self.energy_capacity_MJ
+        )
+        # The simulation refuels the airliner at a constant rate for as long as a UAV is docked,
+        #     which is as long as it takes to transfer a full payload; count only the energy that
+        #     the UAV actually carries:
+        self.refueling_energy_MJ = (
+            min(uavs_config.initial_refueling_energy_level_pc, 100)
+            / 100
+            * get_uav_spec_entry(self.uav_spec, fuel).refueling_energy_MJ
+        )
+        self.uav_energy_MJ = (
+            uavs_config.initial_energy_level_pc
+            / 100
+            * get_uav_spec_entry(self.uav_spec, fuel).energy_capacity_MJ
+        )
+        self.airliner_energy_consumption_rate_MJ_per_km = (
+            airliner_spec.energy_consumption_rate_MJ_per_km
+        )
+        self.fuel = fuel
+
+    def evaluate(
+        self,
+        n_uavs: dict[AirportCode, dict[ServiceSide, int]],
+        service_side: ServiceSideKey,
+        next_service_side: Optional[ServiceSideKey],
+    ) -> _Evaluation:
+        simulation_config = self.simulation_config.model_copy(
+            update=dict(
+                n_uavs_per_flyover_airport={
+                    code: NUavsAtFlyOverAirport(**x) for code, x in n_uavs.items()
+                }
+            )
+        )
+        uav_fps = make_uav_flight_paths(simulation_config, self.fuel, self.airliner_fp)
+        airliner_phases = summarize_airliner_flight_path(
+            self.airliner_fp, uav_fps, self.airliner_energy_consumption_rate_MJ_per_km
+        )
+        if next_service_side is not None:
+            code, side = next_service_side
+            checkpoint_tag = (
+                f"{next(iter(uav_fps[code][side]))}_on_airliner_docking_point"
+            )
+            n_phases = 1 + next(
+                i for i, p in enumerate(airliner_phases) if p.end_tag == checkpoint_tag
+            )
+            airliner_phases = airliner_phases[:n_phases]
+
+        fits = all(p.distance_km >= -_DISTANCE_TOL_KM for p in airliner_phases)
+        code, side = service_side
+        service_side_uav_fps = uav_fps.get(code, {}).get(side, {})
+        for j, (uav_id, uav_fp) in enumerate(service_side_uav_fps.items()):
+            fits = fits and self._uav_fits(uav_id, j, len(service_side_uav_fps), uav_fp)
+
+        min_energy_MJ = min(
+            [
+                self.initial_energy_MJ,
+                *get_energy_quantities_MJ(
+                    airliner_phases,
+                    self.initial_energy_MJ,
+                    self.refueling_energy_MJ,
+                    self.energy_capacity_MJ,
+                ),
+            ]
+        )
+
+        return _Evaluation(fits, min_energy_MJ)
+
+    def _uav_fits(
+        self, uav_id: UavId, j: int, n_uavs: int, uav_fp: UavFlightPath
+    ) -> bool:
+        phases = summarize_uav_flight_path(
+            uav_id,
+            j,
+            n_uavs,
+            uav_fp,
+            self.airliner_fp,
+            self.uav_spec.energy_consumption_rate_MJ_per_km,
+        )
+        return all(p.distance_km >= -_DISTANCE_TOL_KM for p in phases) and (
+            sum(p.energy_MJ for p in phases) <= self.uav_energy_MJ
+        )
+
+
+def solve_n_uavs_per_flyover_airport(
+    simulation_config: SimulationConfig,
+    reserve_energy_thres_MJ: float,
+    max_n_uavs: int = 100,
+) -> dict[AirportCode, NUavsAtFlyOverAirport]:
+    """Find the minimum number of UAVs on each service side of each flyover airport (in the
+    ``simulation_config``'s airliner flight path) that keeps the airliner's energy at or above
+    ``reserve_energy_thres_MJ``, ignoring the ``simulation_config``'s own
+    ``n_uavs_per_flyover_airport``.
+
+    Raises:
+        ValueError: If no number of UAVs (up to ``max_n_uavs``) on some service side both fits and
+            keeps the airliner's energy at or above its reserve.
+    """
+
+    evaluator = _Evaluator(simulation_config)
+    flyover_airport_codes = (
+        simulation_config.airliner_flight_path_config.flyover_airport_codes
+    )
+    service_sides = [
+        (code, side) for code in flyover_airport_codes for side in SERVICE_SIDES
+    ]
+    n_uavs = {
+        code: {side: 0 for side in SERVICE_SIDES} for code in flyover_airport_codes
+    }
+    # More UAVs than would fill the airliner up from empty cannot help:
+    if evaluator.refueling_energy_MJ > 0:
+        max_n_uavs = min(
+            max_n_uavs,
+            int(evaluator.energy_capacity_MJ // evaluator.refueling_energy_MJ) + 1,
+        )
+    else:
+        max_n_uavs = 0
+
+    for i, (code, side) in enumerate(service_sides):
+        next_service_side = service_sides[i + 1] if i + 1 < len(service_sides) else None
+
+        def _evaluate(n: int) -> _Evaluation:
+            x = {k: dict(v) for k, v in n_uavs.items()}
+            x[code][side] = n
+            if next_service_side is not None:
+                # Place a single UAV on the next service side to know where it would dock:
+                x[next_service_side[0]][next_service_side[1]] = 1
+            return evaluator.evaluate(x, (code, side), next_service_side)
+
+        # Fitting is monotonically decreasing in the number of UAVs, and the airliner's lowest
+        #     energy is monotonically increasing:
+        n_uavs_fitting = _bisect(lambda n: not _evaluate(n).fits, 0, max_n_uavs)
+        if n_uavs_fitting == 0:
+            raise ValueError(
+                f"The airliner's flight path to the first UAV after the {side} side of {code} "
+                "does not fit between the airports."
+            )
+        n_uavs[code][side] = _bisect(
+            lambda n: _evaluate(n).min_energy_MJ >= reserve_energy_thres_MJ,
+            0,
+            n_uavs_fitting - 1,
+        )
+        if n_uavs[code][side] == n_uavs_fitting:
+            raise ValueError(
+                f"No number of UAVs on the {side} side of {code} that fits keeps the airliner's "
+                f"energy at or above {reserve_energy_thres_MJ} MJ."
+            )
+
+    return {code: NUavsAtFlyOverAirport(**x) for code, x in n_uavs.items()}
+
+
+def _bisect(predicate: Callable[[int], bool], lo: int, hi: int) -> int:
+    """Find the smallest integer in [``lo``, ``hi``] for which the (monotonic) ``predicate`` is
+    true, or ``hi + 1`` if there is none.
+    """
+
+    hi += 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def to_config_yaml(
+    n_uavs_per_flyover_airport: dict[AirportCode, NUavsAtFlyOverAirport],
+) -> str:
+    """Get a ``n_uavs_per_flyover_airport`` block to paste into a simulation config."""
+
+    return yaml.safe_dump(
+        {
+            "n_uavs_per_flyover_airport": {
+                code: x.model_dump() for code, x in n_uavs_per_flyover_airport.items()
+            }
+        },
+        sort_keys=False,
+    )
+
+
+if __name__ == "__main__":
+    n_uavs_per_flyover_airport = solve_n_uavs_per_flyover_airport(
+        SimulationConfig.from_yaml("configs/jfk_to_lax"),
+        reserve_energy_thres_MJ=0,
+    )
+    print(to_config_yaml(n_uavs_per_flyover_airport), end="")
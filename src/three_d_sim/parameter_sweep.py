@@ -0,0 +1,363 @@
+"""Parameter sweeps over simulation configs: what-if studies of many variations of a base config,
+each simulated headlessly, with the KPIs of every run collected into a single table.
+
+A sweep varies fields of the base config given by dotted paths (e.g.,
+``airliner_flight_path_config.turning_radius_km`` or
+``n_uavs_per_flyover_airport.PIT.to_airport``), either over the cartesian product of lists of
+values (``GridSweep``) or by sampling them at random (``RandomSweep``). Runs are identified by a
+hash of their (varied) config and of the values of the specs it names, and their KPIs are stored in
+a local SQLite database as soon as they finish, such that an interrupted sweep resumes where it left
+off (and runs shared between sweeps are only simulated once). Runs that could not be simulated are
+simulated again upon resuming.
+
+Runs are fanned out over a pool of processes, each of which is replaced after a number of runs,
+and only a few more runs than there are processes are in flight at once, such that memory stays
+bounded over sweeps of thousands of runs.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
+import dataclasses
+import datetime as dt
+import itertools
+import json
+import os
+import time
+import traceback
+from typing import Any, Iterator, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.modeling_objects import AirplanesState, Uav
+from src.results_cache import (
+    CachedResults,
+    connect_sqlite,
+    describe_simulation_config,
+)
+from src.three_d_sim.config_screening import screen_simulation_config
+from src.three_d_sim.environments.environment import Environment
+from src.three_d_sim.simulation import (
+    get_airliner_reference_times,
+    get_end_time,
+    make_airplanes_simulator,
+)
+from src.three_d_sim.simulation_config_schema import (
+    Ratepoint,
+    SimulationConfig,
+    evaluate_timepoints,
+)
+
+SWEEP_RESULTS = CachedResults("simulation_sweep_results.sqlite", version=1)
+SWEEP_RESULTS_DB_PATH = SWEEP_RESULTS.path
+
+
+@dataclasses.dataclass(frozen=True)
+class GridSweep:
+    values: Mapping[str, Sequence[Any]]
+    """Values of each field to vary, by dotted path."""
+
+    def iter_overrides(self) -> Iterator[dict[str, Any]]:
+        paths = list(self.values.keys())
+        for x in itertools.product(*self.values.values()):
+            yield dict(zip(paths, x))
+
+
+@dataclasses.dataclass(frozen=True)
+class Uniform:
+    low: float
+    high: float
+    integer: bool = False
+    """Whether to sample integers (including ``high``) rather than floats."""
+
+
+@dataclasses.dataclass(frozen=True)
+class RandomSweep:
+    distributions: Mapping[str, Union[Uniform, Sequence[Any]]]
+    """Distribution of each field to vary, by dotted path: uniform or a choice among values."""
+    n_runs: int
+    seed: int = 0
+
+    def iter_overrides(self) -> Iterator[dict[str, Any]]:
+        rng = np.random.default_rng(self.seed)
+        for _ in range(self.n_runs):
+            overrides = {}
+            for path, distribution in self.distributions.items():
+                if not isinstance(distribution, Uniform):
+                    overrides[path] = distribution[rng.integers(len(distribution))]
+                elif distribution.integer:
+                    overrides[path] = int(
+                        rng.integers(distribution.low, distribution.high, endpoint=True)
+                    )
+                else:
+                    overrides[path] = float(
+                        rng.uniform(distribution.low, distribution.high)
+                    )
+            yield overrides
+
+
+Sweep = Union[GridSweep, RandomSweep]
+
+
+def apply_overrides(
+    base_config: SimulationConfig, overrides: Mapping[str, Any]
+) -> SimulationConfig:
+    """Get a (validated) copy of the base config with the fields at the given dotted paths set to
+    the given values.
+
+    Raises:
+        ValueError: If any path is not that of a field of the config.
+    """
+
+    data = base_config.model_dump()
+    for path, value in overrides.items():
+        *keys, last_key = path.split(".")
+        x = data
+        try:
+            for key in keys:
+                x = x[key]
+            if not isinstance(x, dict) or last_key not in x:
+                raise KeyError(last_key)
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"{path!r} is not the path of a field of the config."
+            ) from None
+        x[last_key] = value
+    return SimulationConfig.model_validate(data)
+
+
+def get_run_id(
+    simulation_config: SimulationConfig, time_step_s: Optional[float]
+) -> str:
+    """Get an ID of a run that is the same for the same (headless) simulation, across sweeps."""
+
+    return SWEEP_RESULTS.get_key(
+        dict(**describe_simulation_config(simulation_config), time_step_s=time_step_s),
+        length=16,
+    )
+
+
+def run_headless_simulation(
+    simulation_config: SimulationConfig,
+    time_step_s: Optional[float] = None,
+    screen: bool = True,
+) -> dict[str, Any]:
+    """Simulate the config without visualization (or printing) and get its KPIs.
+
+    Args:
+        time_step_s: If given, the constant time step with which to simulate, rather than the
+            config's ``ratepoints``.
+        screen: Whether to screen the config (with ``screen_simulation_config``) first, and not
+            simulate it if it has violations.
+
+    Returns:
+        The KPIs:
+            n_uavs: Total number of UAVs.
+            flight_time_mins: Minutes from the airliner's takeoff until it has landed.
+            airliner_min_energy_MJ: The airliner's lowest energy level during the simulation.
+            airliner_final_energy_MJ: The airliner's energy level at the end of the simulation.
+            uavs_min_final_energy_MJ: The lowest of the UAVs' energy levels at the end of the
+                simulation.
+            feasible: Whether no airplane ran out of energy.
+            error: Why the config could not be simulated (its violations or the exception raised),
+                if it could not be.
+            runtime_s: Wall-clock time of the run.
+    """
+
+    start_time = time.perf_counter()
+    kpis: dict[str, Any] = dict(
+        n_uavs=sum(
+            x.to_airport + x.from_airport
+            for x in simulation_config.n_uavs_per_flyover_airport.values()
+        ),
+        flight_time_mins=np.nan,
+        airliner_min_energy_MJ=np.nan,
+        airliner_final_energy_MJ=np.nan,
+        uavs_min_final_energy_MJ=np.nan,
+        feasible=False,
+        error=None,
+    )
+    # Visualization aside, as the simulation is headless:
+    violations = [
+        x
+        for x in (screen_simulation_config(simulation_config) if screen else [])
+        if not x.field.startswith("viz_config")
+    ]
+    if violations:
+        kpis["error"] = "; ".join(str(x) for x in violations)
+        kpis["runtime_s"] = time.perf_counter() - start_time
+        return kpis
+
+    airliner_min_energy_MJ = np.inf
+
+    def _observe(current_time: dt.timedelta, state: AirplanesState) -> None:
+        nonlocal airliner_min_energy_MJ
+        airliner_min_energy_MJ = min(
+            airliner_min_energy_MJ, state.airplanes["Airliner"].energy_level_MJ
+        )
+
+    try:
+        with open(os.devnull, "w") as f, contextlib.redirect_stdout(f):
+            airliner, _, airplanes_emulator = make_airplanes_simulator(
+                simulation_config
+            )
+            if time_step_s is None:
+                ratepoints = simulation_config.ratepoints
+                evaluate_timepoints(ratepoints, get_airliner_reference_times(airliner))
+            else:
+                ratepoints = [Ratepoint(elapsed_mins=0, time_step_s=time_step_s)]
+            environment = Environment(
+                ev_taxis_emulator_or_interface=airplanes_emulator,
+                ratepoints=ratepoints,
+                end_time=get_end_time(airplanes_emulator),
+                state_observers=[_observe],
+            )
+            environment.run()
+    except Exception:
+        kpis["error"] = traceback.format_exc(limit=-1).strip()
+        kpis["runtime_s"] = time.perf_counter() - start_time
+        return kpis
+
+    airliner_reference_times = get_airliner_reference_times(airliner)
+    final_state = airplanes_emulator.current_state
+    uavs_final_energies_MJ = [
+        x.energy_level_MJ for x in final_state.airplanes.values() if isinstance(x, Uav)
+    ]
+    kpis.update(
+        flight_time_mins=(
+            airliner_reference_times["Airliner_landed_point"]
+            - airliner_reference_times["Airliner_takeoff_point"]
+        ),
+        airliner_min_energy_MJ=airliner_min_energy_MJ,
+        airliner_final_energy_MJ=final_state.airplanes["Airliner"].energy_level_MJ,
+        uavs_min_final_energy_MJ=min(uavs_final_energies_MJ, default=np.nan),
+    )
+    kpis["feasible"] = bool(
+        kpis["airliner_min_energy_MJ"] >= 0
+        and all(x >= 0 for x in uavs_final_energies_MJ)
+    )
+    kpis["runtime_s"] = time.perf_counter() - start_time
+    return kpis
+
+
+def run_sweep(
+    base_config: SimulationConfig,
+    sweep: Sweep,
+    results_path: str = SWEEP_RESULTS_DB_PATH,
+    n_workers: Optional[int] = None,
+    max_runs_per_worker: int = 50,
+    time_step_s: Optional[float] = None,
+    screen: bool = True,
+) -> pd.DataFrame:
+    """Run (or resume) a sweep, simulating only the runs whose KPIs are not stored yet (or that
+    could not be simulated before).
+
+    Args:
+        n_workers: The number of processes among which to run the sweep (by default, the number of
+            CPUs).
+        max_runs_per_worker: The number of runs after which each process is replaced, to bound its
+            memory.
+        time_step_s, screen: As in ``run_headless_simulation``.
+
+    Returns:
+        One row per run (indexed by ``run_id``, in the sweep's order), with the values of the
+        varied fields (by dotted path) and the KPIs of ``run_headless_simulation``.
+    """
+
+    connection = connect_sqlite(results_path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, overrides TEXT, kpis TEXT)"
+        )
+    # (Runs stored with an error, be it their violations or an exception raised, are retried.)
+    stored_run_ids = {
+        run_id
+        for (run_id,) in connection.execute(
+            "SELECT run_id FROM runs WHERE json_extract(kpis, '$.error') IS NULL"
+        )
+    }
+
+    # Only the overrides of the runs are kept, with their configs made again when they are
+    #     submitted, such that thousands of configs are never in memory at once:
+    run_ids: dict[str, dict[str, Any]] = {}  # In the sweep's order, without duplicates.
+    for overrides in sweep.iter_overrides():
+        run_id = get_run_id(apply_overrides(base_config, overrides), time_step_s)
+        run_ids.setdefault(run_id, overrides)
+    pending = [run_id for run_id in run_ids if run_id not in stored_run_ids]
+    if pending:
+        print(
+            f"Simulating {len(pending)} of {len(run_ids)} runs "
+            f"({len(run_ids) - len(pending)} already stored)..."
+        )
+
+    def _store(run_id: str, kpis: dict[str, Any]) -> None:
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?)",
+                (
+                    run_id,
+                    json.dumps(run_ids[run_id]),
+                    json.dumps(kpis, default=float),
+                ),
+            )
+
+    n_workers = n_workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=n_workers, max_tasks_per_child=max_runs_per_worker
+    ) as executor:
+        pending_run_ids = iter(pending)
+        in_flight: dict[concurrent.futures.Future, str] = {}
+        n_done = 0
+        while True:
+            while len(in_flight) < 2 * n_workers:
+                run_id = next(pending_run_ids, None)
+                if run_id is None:
+                    break
+                future = executor.submit(
+                    run_headless_simulation,
+                    apply_overrides(base_config, run_ids[run_id]),
+                    time_step_s,
+                    screen,
+                )
+                in_flight[future] = run_id
+            if not in_flight:
+                break
+            done, _ = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                _store(in_flight.pop(future), future.result())
+                n_done += 1
+            print(f"{n_done} / {len(pending)} runs simulated")
+
+    # The values of the varied fields are this sweep's own, as a run shared with another sweep
+    #     is stored with the other sweep's overrides (of other fields, perhaps):
+    kpis_by_run_id = {}
+    for run_id, kpis in connection.execute("SELECT run_id, kpis FROM runs"):
+        if run_id in run_ids:
+            kpis_by_run_id[run_id] = json.loads(kpis)
+    connection.close()
+    return pd.DataFrame.from_dict(
+        {
+            run_id: {**overrides, **kpis_by_run_id[run_id]}
+            for run_id, overrides in run_ids.items()
+        },
+        orient="index",
+    ).rename_axis("run_id")
+
+
+if __name__ == "__main__":
+    results_df = run_sweep(
+        base_config=SimulationConfig.from_yaml("configs/jfk_to_lax"),
+        sweep=GridSweep(
+            {
+                "airliner_flight_path_config.turning_radius_km": [25, 50, 100],
+                "uavs_flight_path_config.arc_radius_km": [1, 5],
+                "n_uavs_per_flyover_airport.DEN.to_airport": [2, 3],
+            }
+        ),
+        time_step_s=10,
+    )
+    print(results_df.drop(columns="error").to_string())
@@ -1,8 +1,6 @@
 from typing import List
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 
 l = lambda _m, _b: lambda x: _m * x + _b
 
@@ -89,6 +87,8 @@ def generate_planar_curve_points(
 
     ###
 
+    import pandas as pd
+
     solutions_df = pd.DataFrame([[*i_12.T], [*i_23.T], [*c.T]]).T
     solutions_df.columns = ["i_12", "i_23", "c"]
     solutions_df.index.name = "solution_idx"
@@ -123,6 +123,8 @@ def generate_planar_curve_points(
     )
 
     if plot:
+        import matplotlib.pyplot as plt
+
         plt.plot(*np.array([p1, p2, p3]).T, "o")
         plt.plot(*c, "o")
         plt.plot(*i_12, "o")
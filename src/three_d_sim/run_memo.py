@@ -0,0 +1,276 @@
+"""Memoization of whole simulation runs, such that the many visualizations (side, tail, and map
+views and graphs, of each airplane) and analyses of one scenario simulate it only once.
+
+A headless run is recorded as the airplanes in their initial state and, at every time step, each
+airplane's location, heading, energy levels, and progress along its waypoints (and the airliner's
+docked UAV). Recordings are stored under a hash of the normalized ``SimulationConfig`` (as JSON,
+without its ``viz_config``, which does not affect the simulation) and of the values of the specs it
+names (as from ``describe_simulation_config``), and are replayed by an ``AirplanesReplayer`` in
+place of the ``AirplanesSimulator``. The least recently used recordings are evicted once the memo
+grows beyond its maximum size.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import glob
+import os
+import pickle
+from copy import deepcopy
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from src import modeling_objects
+from src.modeling_objects import (
+    Airliner,
+    AirplaneId,
+    AirplanesState,
+    AirportCode,
+    Location,
+    ServiceSide,
+    Uav,
+    UavId,
+)
+from src.results_cache import CachedResults, describe_simulation_config
+from src.three_d_sim.simulation_config_schema import SimulationConfig
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SIMULATION_RUNS = CachedResults("simulation_runs", version=1)
+RUN_MEMO_DIR = SIMULATION_RUNS.path
+
+
+def get_config_key(
+    simulation_config: SimulationConfig, tracked_uav_id: Optional[UavId] = None
+) -> str:
+    """Get the key of a config's run: a hash of its description (as from
+    ``describe_simulation_config``) and of the UAV tracked (if any), whose reference times the
+    ratepoints may also refer to.
+
+    Must be called before the config's timepoints are evaluated.
+    """
+
+    return SIMULATION_RUNS.get_key(
+        dict(
+            **describe_simulation_config(simulation_config),
+            true_lat_lon=modeling_objects.TRUE_LAT_LON,
+            tracked_uav_id=tracked_uav_id,
+        ),
+        length=32,
+    )
+
+
+@dataclasses.dataclass
+class SimulationRecording:
+    airliner: Airliner
+    uavs: dict[AirportCode, dict[ServiceSide, dict[UavId, Uav]]]
+    """The airplanes in their initial state."""
+    times_us: np.ndarray
+    """Microseconds into the simulation at each time step."""
+    airplane_ids: list[AirplaneId]
+    locations_km: np.ndarray
+    """Coordinates (x, y, and altitude) of each airplane at each time step."""
+    headings: np.ndarray
+    energy_levels_pc: np.ndarray
+    refueling_energy_levels_pc: np.ndarray
+    """NaN for the airliner."""
+    n_reached_waypoints: np.ndarray
+    docked_uav_idxs: np.ndarray
+    """Index (into ``airplane_ids``) of the UAV docked with the airliner at each time step (or
+    -1).
+    """
+
+    def get_telemetry_df(self) -> pd.DataFrame:
+        """Get the recording as one row per time step and airplane."""
+
+        import pandas as pd
+
+        n_times, n_airplanes = self.energy_levels_pc.shape
+        return pd.DataFrame(
+            {
+                "elapsed_mins": np.repeat(self.times_us / 60e6, n_airplanes),
+                "airplane_id": np.tile(np.array(self.airplane_ids), n_times),
+                "x_km": self.locations_km[:, :, 0].ravel(),
+                "y_km": self.locations_km[:, :, 1].ravel(),
+                "altitude_km": self.locations_km[:, :, 2].ravel(),
+                "energy_level_pc": self.energy_levels_pc.ravel(),
+                "refueling_energy_level_pc": self.refueling_energy_levels_pc.ravel(),
+            }
+        )
+
+
+@dataclasses.dataclass
+class SimulationRecorder:
+    """Records a run, when used as one of an ``Environment``'s ``state_observers``."""
+
+    airliner: Airliner
+    uavs: dict[AirportCode, dict[ServiceSide, dict[UavId, Uav]]]
+    initial_state: AirplanesState
+
+    def __post_init__(self):
+        self.airplane_ids = list(self.initial_state.airplanes.keys())
+        self._n_waypoints = np.array(
+            [len(x.waypoints) for x in self.initial_state.airplanes.values()]
+        )
+        self._rows = []
+
+    def __call__(self, current_time: dt.timedelta, state: AirplanesState) -> None:
+        airplanes = [state.airplanes[airplane_id] for airplane_id in self.airplane_ids]
+        docked_uav = state.airplanes["Airliner"].docked_uav
+        self._rows.append(
+            (
+                current_time // dt.timedelta(microseconds=1),
+                [x.location.xyz_coords for x in airplanes],
+                [
+                    np.full(3, np.nan) if x.heading is None else x.heading
+                    for x in airplanes
+                ],
+                [x.energy_level_pc for x in airplanes],
+                [getattr(x, "refueling_energy_level_pc", np.nan) for x in airplanes],
+                [len(x.waypoints) for x in airplanes],
+                -1 if docked_uav is None else self.airplane_ids.index(docked_uav),
+            )
+        )
+
+    def get_recording(self) -> SimulationRecording:
+        columns = list(zip(*self._rows))
+        return SimulationRecording(
+            airliner=self.airliner,
+            uavs=self.uavs,
+            times_us=np.array(columns[0], dtype=np.int64),
+            airplane_ids=self.airplane_ids,
+            locations_km=np.array(columns[1], dtype=float),
+            headings=np.array(columns[2], dtype=float),
+            energy_levels_pc=np.array(columns[3], dtype=float),
+            refueling_energy_levels_pc=np.array(columns[4], dtype=float),
+            n_reached_waypoints=self._n_waypoints - np.array(columns[5], dtype=int),
+            docked_uav_idxs=np.array(columns[6], dtype=int),
+        )
+
+
+@dataclasses.dataclass
+class AirplanesReplayer:
+    """Replays a recording in place of an ``AirplanesSimulator``, with the airplanes' state at the
+    recorded time step at or before the given time, or interpolated linearly between it and the
+    next time step.
+    """
+
+    recording: SimulationRecording
+    initial_state: AirplanesState = dataclasses.field(init=False)
+    current_state: AirplanesState = dataclasses.field(init=False)
+    current_time: dt.timedelta = dataclasses.field(init=False)
+
+    def __post_init__(self):
+        self.initial_state = AirplanesState(
+            airplanes={
+                x.id: x
+                for x in [
+                    self.recording.airliner,
+                    *(
+                        uav
+                        for uavs in self.recording.uavs.values()
+                        for service_side_uavs in uavs.values()
+                        for uav in service_side_uavs.values()
+                    ),
+                ]
+            }
+        )
+        self.current_state = deepcopy(self.initial_state)
+        self.current_time = dt.timedelta(0)
+        self._all_waypoints = {
+            airplane_id: list(x.waypoints)
+            for airplane_id, x in self.current_state.airplanes.items()
+        }
+
+    def update_state(self, time: dt.timedelta) -> None:
+        r = self.recording
+        self.current_time = time
+        time_us = time // dt.timedelta(microseconds=1)
+        i = max(int(np.searchsorted(r.times_us, time_us, side="right")) - 1, 0)
+        if i + 1 < len(r.times_us) and r.times_us[i] < time_us:
+            f = (time_us - r.times_us[i]) / (r.times_us[i + 1] - r.times_us[i])
+        else:
+            f = 0.0
+
+        def _interpolate(x: np.ndarray) -> np.ndarray:
+            return x[i] if f == 0 else x[i] + f * (x[i + 1] - x[i])
+
+        locations_km = _interpolate(r.locations_km)
+        energy_levels_pc = _interpolate(r.energy_levels_pc)
+        refueling_energy_levels_pc = _interpolate(r.refueling_energy_levels_pc)
+        for j, airplane_id in enumerate(r.airplane_ids):
+            x = self.current_state.airplanes[airplane_id]
+            x.location = Location(*locations_km[j])
+            if not np.isnan(r.headings[i, j]).any():
+                x.heading = r.headings[i, j].copy()
+            x.energy_level_pc = energy_levels_pc[j]
+            if isinstance(x, Uav):
+                x.refueling_energy_level_pc = refueling_energy_levels_pc[j]
+            x.waypoints = self._all_waypoints[airplane_id][
+                r.n_reached_waypoints[i, j] :
+            ]
+        docked_uav_idx = r.docked_uav_idxs[i]
+        self.current_state.airplanes["Airliner"].docked_uav = (
+            None if docked_uav_idx == -1 else r.airplane_ids[docked_uav_idx]
+        )
+
+
+class RunMemo:
+    """A directory of recordings, by key (as from ``get_config_key``), of at most ``max_size_MB``
+    in total.
+    """
+
+    def __init__(self, dir: str = RUN_MEMO_DIR, max_size_MB: float = 2048):
+        self.dir = dir
+        self.max_size_MB = max_size_MB
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[SimulationRecording]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                recording = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        # Mark the recording as recently used:
+        os.utime(path)
+        return recording
+
+    def put(self, key: str, recording: SimulationRecording) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        path = self._path(key)
+        # Write to a temporary file first such that concurrent readers never see a partial
+        #     recording:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(recording, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+
+    def _evict(self, keep: str) -> None:
+        """Remove the least recently used recordings (other than ``keep``) until the memo is no
+        larger than its maximum size.
+        """
+
+        stats = []
+        for path in glob.glob(os.path.join(self.dir, "*.pkl")):
+            try:
+                stats.append((os.stat(path), path))
+            except FileNotFoundError:
+                pass
+        size_B = sum(stat.st_size for stat, _ in stats)
+        for stat, path in sorted(stats, key=lambda x: x[0].st_mtime_ns):
+            if size_B <= self.max_size_MB * 1e6:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size_B -= stat.st_size
@@ -4,39 +4,47 @@ import os
 import subprocess
 from typing import Literal
 
+from src import modeling_objects
 from src.airplanes_simulator import AirplanesSimulator
-from src.modeling_objects import AirplanesState
-from src.three_d_sim.airplane_waypoints_generation import delay_uavs
-from src.three_d_sim.environments.airplanes_visualizer_environment import (
-    AirplanesVisualizerEnvironment,
-    ScreenRecorder,
-    View,
+from src.modeling_objects import (
+    Airliner,
+    AirplanesState,
+    AirportCode,
+    ServiceSide,
+    Uav,
+    UavId,
 )
+from src.three_d_sim.airplane_waypoints_generation import delay_uavs
+from src.three_d_sim.environments.environment import Environment
+from src.three_d_sim.environments.view import View
 from src.three_d_sim.make_airplanes import make_airplanes
+from src.three_d_sim.run_memo import (
+    AirplanesReplayer,
+    RUN_MEMO_DIR,
+    RunMemo,
+    SimulationRecorder,
+    SimulationRecording,
+    get_config_key,
+)
 from src.three_d_sim.simulation_config_schema import (
     SimulationConfig,
     ViewportSize,
     Zoompoint,
+    evaluate_timepoints,
 )
 from src.utils.utils import timedelta_to_minutes
 
 
-def run_simulation(
+def make_airplanes_simulator(
     simulation_config: SimulationConfig,
-    simulation_viz_enabled: bool,
-    view: View,
-    track_airplane_id: str | None,
-    record: Literal["viewport", "graphs"],
-) -> None:
-    if not simulation_viz_enabled:
-        assert view is None
-        assert track_airplane_id is None
-    else:
-        assert view is not None
-        if view == View.MAP_VIEW:
-            assert track_airplane_id is None
-        else:
-            assert track_airplane_id is not None
+) -> tuple[
+    Airliner,
+    dict[AirportCode, dict[ServiceSide, dict[UavId, Uav]]],
+    AirplanesSimulator,
+]:
+    """Make the airliner and UAVs (with the UAVs delayed such that they meet the airliner) and a
+    simulator of them.
+    """
 
     airliner, uavs = make_airplanes(simulation_config)
 
@@ -55,8 +63,14 @@ def run_simulation(
             airplanes={airplane.id: airplane for airplane in airplanes},
         ),
     )
+    return airliner, uavs, airplanes_emulator
+
+
+def get_airliner_reference_times(airliner: Airliner) -> dict[str, float]:
+    """Get the minutes into the simulation at each of the airliner's tagged waypoints and at the
+    midpoint of each of its curves over a flyover airport, to which timepoints can refer.
+    """
 
-    skip_timedelta = dt.timedelta(minutes=0)
     airliner_reference_times = airliner.get_elapsed_time_at_tagged_waypoints()
     airliner_reference_times = {
         k: timedelta_to_minutes(v) for k, v in airliner_reference_times.items()
@@ -66,6 +80,141 @@ def run_simulation(
             airliner_reference_times[f"Airliner_curve_over_{airport.CODE}_start_point"]
             + airliner_reference_times[f"Airliner_curve_over_{airport.CODE}_end_point"]
         ) / 2
+    return airliner_reference_times
+
+
+def get_uav_reference_times(
+    uavs: dict[AirportCode, dict[ServiceSide, dict[UavId, Uav]]], uav_id: UavId
+) -> dict[str, float]:
+    """Get the reference times (in minutes) of a UAV's tagged waypoints, without its ID prefix."""
+
+    uav = next(
+        service_side_uavs[uav_id]
+        for airport_uavs in uavs.values()
+        for service_side_uavs in airport_uavs.values()
+        if uav_id in service_side_uavs
+    )
+    return {
+        k.removeprefix(f"{uav_id}_"): timedelta_to_minutes(v)
+        for k, v in uav.get_elapsed_time_at_tagged_waypoints().items()
+    }
+
+
+def get_ratepoints_reference_times(
+    airliner: Airliner,
+    uavs: dict[AirportCode, dict[ServiceSide, dict[UavId, Uav]]],
+    track_airplane_id: str | None,
+) -> dict[str, float]:
+    """Get the reference times to evaluate the ratepoints with: the airliner's, and the tracked
+    UAV's (if a UAV is tracked).
+    """
+
+    reference_times = get_airliner_reference_times(airliner)
+    if track_airplane_id not in (None, "Airliner"):
+        reference_times.update(get_uav_reference_times(uavs, track_airplane_id))
+    return reference_times
+
+
+def get_end_time(airplanes_emulator: AirplanesSimulator) -> dt.timedelta:
+    """Get the time at which the last airplane reaches its last tagged waypoint."""
+
+    return max(
+        max(airplane.get_elapsed_time_at_tagged_waypoints().values())
+        for airplane in airplanes_emulator.initial_state.airplanes.values()
+    )
+
+
+def record_simulation(
+    simulation_config: SimulationConfig, track_airplane_id: str | None = None
+) -> SimulationRecording:
+    """Run the simulation headlessly, recording every time step, with the ratepoints evaluated as
+    when tracking ``track_airplane_id``.
+    """
+
+    airliner, uavs, airplanes_emulator = make_airplanes_simulator(simulation_config)
+    evaluate_timepoints(
+        simulation_config.ratepoints,
+        get_ratepoints_reference_times(airliner, uavs, track_airplane_id),
+    )
+    recorder = SimulationRecorder(airliner, uavs, airplanes_emulator.initial_state)
+    environment = Environment(
+        ev_taxis_emulator_or_interface=airplanes_emulator,
+        ratepoints=simulation_config.ratepoints,
+        end_time=get_end_time(airplanes_emulator),
+        state_observers=[recorder],
+    )
+    environment.run()
+    return recorder.get_recording()
+
+
+def run_simulation(
+    simulation_config: SimulationConfig,
+    simulation_viz_enabled: bool,
+    view: View,
+    track_airplane_id: str | None,
+    record: Literal["viewport", "graphs"],
+    run_memo: RunMemo | None = None,
+    pipelined: bool = False,
+    real_time_pacing: bool = False,
+) -> None:
+    """Run the simulation, visualizing it if ``simulation_viz_enabled``.
+
+    If a ``run_memo`` is given, the run is replayed from it rather than simulated, if it has been
+    recorded before (and headlessly, if the visualization is not enabled), and recorded otherwise.
+    If ``pipelined``, the visualization is rendered while
+    the simulation runs ahead in a separate thread. If ``real_time_pacing``, frames that are
+    rendered too late to be played back in real time are dropped.
+    """
+
+    if not simulation_viz_enabled:
+        assert view is None
+        assert track_airplane_id is None
+    else:
+        assert view is not None
+        if view == View.MAP_VIEW:
+            assert track_airplane_id is None
+        else:
+            assert track_airplane_id is not None
+
+    if run_memo is not None:
+        key = get_config_key(
+            simulation_config,
+            tracked_uav_id=(
+                None if track_airplane_id == "Airliner" else track_airplane_id
+            ),
+        )
+        recording = run_memo.get(key)
+        if recording is None:
+            recording = record_simulation(simulation_config, track_airplane_id)
+            run_memo.put(key, recording)
+            if not simulation_viz_enabled:
+                return  # The run has just been simulated headlessly.
+        else:
+            print(f"Replaying the run recorded under {key}...")
+        airliner, uavs = recording.airliner, recording.uavs
+        airplanes_emulator = AirplanesReplayer(recording)
+    else:
+        airliner, uavs, airplanes_emulator = make_airplanes_simulator(simulation_config)
+
+    skip_timedelta = dt.timedelta(minutes=0)
+    airliner_reference_times = get_airliner_reference_times(airliner)
+    if not simulation_viz_enabled:
+        evaluate_timepoints(simulation_config.ratepoints, airliner_reference_times)
+        environment = Environment(
+            ev_taxis_emulator_or_interface=airplanes_emulator,
+            ratepoints=simulation_config.ratepoints,
+            end_time=get_end_time(airplanes_emulator),
+        )
+        environment.run()
+        return
+
+    # Imported only when visualizing, as importing VPython (and OpenCV and PyAutoGUI) is slow, and
+    #     importing VPython serves the visualization:
+    from src.three_d_sim.environments.airplanes_visualizer_environment import (
+        AirplanesVisualizerEnvironment,
+        ScreenRecorder,
+    )
+
     if view != "map-view":
         assert track_airplane_id is not None
         models_scale_factor = 1
@@ -73,8 +222,7 @@ def run_simulation(
             zoompoints = (
                 simulation_config.viz_config.zoompoints_config.airliner_zoompoints
             )
-            for zp in zoompoints:
-                zp.evaluate_elapsed_mins(airliner_reference_times)
+            evaluate_timepoints(zoompoints, airliner_reference_times)
         else:
             uav_id = track_airplane_id
             uav_airport_code = track_airplane_id[:3]
@@ -83,13 +231,7 @@ def run_simulation(
                 if uav_id in uavs[uav_airport_code]["to_airport"]
                 else "from_airport"
             )
-            uav_reference_times = uavs[uav_airport_code][service_side][
-                uav_id
-            ].get_elapsed_time_at_tagged_waypoints()
-            uav_reference_times = {
-                k.removeprefix(f"{track_airplane_id}_"): timedelta_to_minutes(v)
-                for k, v in uav_reference_times.items()
-            }
+            uav_reference_times = get_uav_reference_times(uavs, uav_id)
 
             airport_last_uav_id = list(uavs[uav_airport_code]["from_airport"].keys())[
                 -1
@@ -116,8 +258,7 @@ def run_simulation(
                     zoom=zoompoints[-1].zoom,
                 )
             )
-            for zp in zoompoints:
-                zp.evaluate_elapsed_mins(uav_reference_times)
+            evaluate_timepoints(zoompoints, uav_reference_times)
 
             if uav_airport_code != airliner.flight_path.flyover_airports[0].CODE:
                 previous_airport = airliner.flight_path.flyover_airports[
@@ -179,11 +320,10 @@ def run_simulation(
     else:
         screen_recorders = []
 
-    reference_times = airliner_reference_times
-    if "uav_reference_times" in locals():
-        reference_times.update(uav_reference_times)
-    for rp in simulation_config.ratepoints:
-        rp.evaluate_elapsed_mins(reference_times)
+    evaluate_timepoints(
+        simulation_config.ratepoints,
+        get_ratepoints_reference_times(airliner, uavs, track_airplane_id),
+    )
 
     environment = AirplanesVisualizerEnvironment(
         ratepoints=simulation_config.ratepoints,
@@ -205,6 +345,8 @@ def run_simulation(
         models_scale_factor=models_scale_factor,
         captions=captions,
         screen_recorders=screen_recorders,
+        pipelined=pipelined,
+        real_time_pacing=real_time_pacing,
     )
     environment.run()
     for screen_recorder in screen_recorders:
@@ -228,7 +370,7 @@ def parse_cli_args() -> argparse.Namespace:
     parser.add_argument(
         "--simulation-viz-enabled",
         default=True,
-        type=bool,
+        type=lambda x: x.lower() == "true",
         help=(
             "Whether to visualize the airliner and UAVs in-browser while the simulation runs. "
             "Defaults to true. "
@@ -269,19 +411,74 @@ def parse_cli_args() -> argparse.Namespace:
             "`--viz-enabled=true`."
         ),
     )
+    parser.add_argument(
+        "--true-lat-lon",
+        action="store_true",
+        help=(
+            "Whether to measure distances (and so travel durations and energy consumption) "
+            "along great circles between true geographic coordinates, rather than between "
+            "(lat, lon) coordinates treated as cartesian coordinates."
+        ),
+    )
+    parser.add_argument(
+        "--run-memo-enabled",
+        default=False,
+        type=lambda x: x.lower() == "true",
+        help=(
+            "Whether to replay the simulation from a recording of a previous run of the same "
+            "config (other than its `viz_config`) and specs, if any, rather than simulating it "
+            "again, and to record it otherwise. Defaults to false. "
+            f"Recordings are stored in `{RUN_MEMO_DIR}`, with the least recently used removed "
+            "once they take more than `--run-memo-max-size-mb`."
+        ),
+    )
+    parser.add_argument(
+        "--run-memo-max-size-mb",
+        default=2048,
+        type=float,
+        help="The maximum size (in MB) of the stored recordings. Defaults to 2048.",
+    )
+    parser.add_argument(
+        "--pipelined-viz-enabled",
+        default=False,
+        type=lambda x: x.lower() == "true",
+        help=(
+            "Whether to run the simulation in a separate thread, ahead of the visualization, such "
+            "that slow frames (e.g., screenshots when `--record` is given) and slow simulation "
+            "steps do not hold each other up. Defaults to false."
+        ),
+    )
+    parser.add_argument(
+        "--real-time-pacing-enabled",
+        default=False,
+        type=lambda x: x.lower() == "true",
+        help=(
+            "Whether to drop frames that would otherwise make the visualization (and any "
+            "recording) play back more slowly than the `max_frame_rate_fps`, such that it stays "
+            "in real time. Defaults to false."
+        ),
+    )
     args = parser.parse_args()
     return args
 
 
 if __name__ == "__main__":
     args = parse_cli_args()
+    modeling_objects.TRUE_LAT_LON = args.true_lat_lon
     simulation_config = SimulationConfig.from_yaml(args.config_dir)
     if args.simulation_viz_enabled:
         subprocess.Popen(["google-chrome", "--guest", "--start-maximized"])
     run_simulation(
         simulation_config=simulation_config,
         simulation_viz_enabled=args.simulation_viz_enabled,
-        view=View(args.view),
+        view=View(args.view) if args.view is not None else None,
         track_airplane_id=args.track_airplane_id,
         record=args.record,
+        run_memo=(
+            RunMemo(max_size_MB=args.run_memo_max_size_mb)
+            if args.run_memo_enabled
+            else None
+        ),
+        pipelined=args.pipelined_viz_enabled,
+        real_time_pacing=args.real_time_pacing_enabled,
     )
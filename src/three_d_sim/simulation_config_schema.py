@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-import datetime as dt
+import dataclasses
+import difflib
+import functools
 import json
+import re
 from enum import Enum
 from pathlib import Path
-from typing import Literal, Optional, Union
+from typing import Literal, Mapping, Optional, Sequence, Union
 
+import numpy as np
 import yaml
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from src.feasibility_study.modeling_objects import BaseAirliner as AirlinerSpec
 from src.feasibility_study.modeling_objects import Uav as UavSpec
@@ -306,14 +310,98 @@ class Timepoint(Model):
     `landed_point`
     """
 
-    def evaluate_elapsed_mins(self, reference_times: dict[str, int]) -> dt.timedelta:
-        self.elapsed_mins = eval(str(self.elapsed_mins), reference_times)
+    @field_validator("elapsed_mins")
+    @classmethod
+    def _compile_elapsed_mins(
+        cls, elapsed_mins: Union[float, str]
+    ) -> Union[float, str]:
+        # Such that syntax errors surface when the config is loaded:
+        compile_elapsed_mins(elapsed_mins)
+        return elapsed_mins
+
+    def evaluate_elapsed_mins(self, reference_times: Mapping[str, float]) -> None:
+        evaluate_timepoints([self], reference_times)
 
     @property
     def value(self) -> float:
         raise NotImplementedError
 
 
+@dataclasses.dataclass(frozen=True)
+class CompiledElapsedMins:
+    """An `elapsed_mins`, compiled to its variable (if any) and the offset to add to it."""
+
+    variable: Optional[str]
+    offset_mins: float
+
+
+_NUMBER_PATTERN = r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?"
+_ELAPSED_MINS_PATTERN = re.compile(
+    rf"\s*(?:(?P<number>{_NUMBER_PATTERN})|(?P<variable>[A-Za-z_]\w*))"
+    rf"\s*(?:(?P<sign>[+-])\s*(?P<offset>{_NUMBER_PATTERN}))?\s*"
+)
+
+
+@functools.cache
+def compile_elapsed_mins(elapsed_mins: Union[float, str]) -> CompiledElapsedMins:
+    """Parse an `elapsed_mins` in any of the formats documented in `Timepoint.elapsed_mins`.
+
+    Raises:
+        ValueError: If it is in none of them.
+    """
+
+    if not isinstance(elapsed_mins, str):
+        return CompiledElapsedMins(variable=None, offset_mins=float(elapsed_mins))
+    match = _ELAPSED_MINS_PATTERN.fullmatch(elapsed_mins)
+    if match is None:
+        raise ValueError(
+            f"{elapsed_mins!r} is not of the form `{{number}}`, `{{variable}}`, "
+            "`{number} +/- {number}`, or `{variable} +/- {number}`."
+        )
+    offset_mins = float(match["number"] or 0)
+    if match["offset"] is not None:
+        # (Combining the signs explicitly, such that, e.g., `x - -1` is `x + 1`.)
+        offset_mins += (-1 if match["sign"] == "-" else 1) * float(match["offset"])
+    return CompiledElapsedMins(variable=match["variable"], offset_mins=offset_mins)
+
+
+def evaluate_timepoints(
+    timepoints: Sequence[Timepoint], reference_times: Mapping[str, float]
+) -> None:
+    """Evaluate the timepoints' `elapsed_mins` (in place) given the reference times (in minutes) of
+    the variables, all at once.
+
+    Raises:
+        ValueError: If any timepoint refers to a variable that is not in `reference_times`.
+    """
+
+    compiled = [compile_elapsed_mins(tp.elapsed_mins) for tp in timepoints]
+    variable_idxs = {variable: i for i, variable in enumerate(reference_times)}
+    unknown = [
+        (i, x.variable)
+        for i, x in enumerate(compiled)
+        if x.variable is not None and x.variable not in variable_idxs
+    ]
+    if unknown:
+        messages = []
+        for i, variable in unknown:
+            message = f"{variable!r} (timepoint {i})"
+            close_matches = difflib.get_close_matches(variable, variable_idxs, n=1)
+            if close_matches:
+                message += f", did you mean {close_matches[0]!r}?"
+            messages.append(message)
+        raise ValueError(
+            "Unknown variable(s) in `elapsed_mins`: " + "; ".join(messages)
+        )
+
+    # The last element stands for no variable:
+    values = np.r_[np.fromiter(reference_times.values(), dtype=float), 0.0]
+    idxs = np.array([variable_idxs.get(x.variable, -1) for x in compiled], dtype=int)
+    elapsed_mins = values[idxs] + np.array([x.offset_mins for x in compiled])
+    for tp, x in zip(timepoints, elapsed_mins.tolist()):
+        tp.elapsed_mins = x
+
+
 class Ratepoint(Timepoint):
     time_step_s: float = Field(title="Time Step (s)")
     """The time step (in seconds) with which to advance the simulation time at `elapsed_mins`."""
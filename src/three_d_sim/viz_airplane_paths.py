@@ -18,12 +18,12 @@ def write_airplane_paths(airplanes: list[Airplane]) -> None:
     for airplane in airplanes:
         fpath = Path(f"tmp/airplane_paths/{airplane.id}.csv")
         fpath.parent.mkdir(parents=True, exist_ok=True)
-        pd.DataFrame(airplane.all_locations).to_csv(
-            fpath,
-            header=False,
-            index=False,
-            float_format="%f",
-        )
+        with fpath.open("w") as f:
+            # Stream the locations row by row rather than materializing them all in a DataFrame:
+            f.writelines(
+                ",".join(f"{coord:f}" for coord in location) + "\n"
+                for location in airplane.iter_locations()
+            )
 
 
 def write_airplane_tagged_waypoints(airplanes: list[Airplane]) -> None:
@@ -0,0 +1,67 @@
+"""Great-circle distance and interpolation between (latitude, longitude) coordinates on a spherical
+Earth, vectorized over arrays of coordinates (in degrees) that broadcast against one another.
+"""
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+# TODO: Change when optimizing EV taxis operations on Mars.
+
+
+def haversine_distance_km(
+    lat_a: np.ndarray, lon_a: np.ndarray, lat_b: np.ndarray, lon_b: np.ndarray
+) -> np.ndarray:
+    """Get the great-circle distances between points a and b.
+
+    https://www.omnicalculator.com/other/latitude-longitude-distance
+    """
+
+    lat_a, lon_a, lat_b, lon_b = (np.deg2rad(x) for x in (lat_a, lon_a, lat_b, lon_b))
+    h = (
+        np.sin((lat_b - lat_a) / 2) ** 2
+        + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Get the unit vectors (in Earth-centered cartesian coordinates) pointing to points."""
+
+    lat, lon = np.deg2rad(lat), np.deg2rad(lon)
+    return np.stack(
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1
+    )
+
+
+def great_circle_interpolate(
+    lat_a: np.ndarray,
+    lon_a: np.ndarray,
+    lat_b: np.ndarray,
+    lon_b: np.ndarray,
+    fractions: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the (latitude, longitude) coordinates of the points at the given fractions of the way
+    along the great circles from points a to points b.
+    """
+
+    a = unit_vectors(lat_a, lon_a)
+    b = unit_vectors(lat_b, lon_b)
+    fractions = np.asarray(fractions, dtype=float)
+    # Central angles, from chord lengths (which is accurate for small angles too):
+    angles = 2 * np.arcsin(np.clip(np.linalg.norm(b - a, axis=-1) / 2, 0, 1))
+    sin_angles = np.sin(angles)
+    # Spherical linear interpolation, falling back to linear interpolation (then normalization)
+    #     between (nearly) coincident points:
+    coincident = sin_angles < 1e-12
+    safe_sin_angles = np.where(coincident, 1.0, sin_angles)
+    weights_a = np.where(
+        coincident, 1 - fractions, np.sin((1 - fractions) * angles) / safe_sin_angles
+    )
+    weights_b = np.where(
+        coincident, fractions, np.sin(fractions * angles) / safe_sin_angles
+    )
+    points = weights_a[..., np.newaxis] * a + weights_b[..., np.newaxis] * b
+    points /= np.linalg.norm(points, axis=-1, keepdims=True)
+    lat = np.rad2deg(np.arcsin(np.clip(points[..., 2], -1, 1)))
+    lon = np.rad2deg(np.arctan2(points[..., 1], points[..., 0]))
+    return lat, lon
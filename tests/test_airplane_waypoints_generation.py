@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.modeling_objects import Location, Waypoint
+from src.three_d_sim import airplane_waypoints_generation
+from src.three_d_sim.make_airplanes import make_airplanes
+from src.three_d_sim.simulation_config_schema import SimulationConfig
+
+
+def _intermediate_points_between_one_by_one(point1, point2, intermediate_distances):
+    return np.array(
+        [
+            airplane_waypoints_generation._intermediate_point_between(point1, point2, d)
+            for d in intermediate_distances
+        ]
+    )
+
+
+def _make_waypoints_row_by_row(
+    points, speeds_kmph, altitude_km=None, **waypoint_kwargs
+):
+    if np.ndim(speeds_kmph) == 0:
+        speeds_kmph = [speeds_kmph] * len(points)
+    location_kwargs = {} if altitude_km is None else dict(ALTITUDE_KM=altitude_km)
+    return [
+        Waypoint(Location(*point, **location_kwargs), speed_kmph, **waypoint_kwargs)
+        for point, speed_kmph in zip(points, speeds_kmph)
+    ]
+
+
+def _get_paths(n_uavs_per_side: int) -> dict[str, tuple[str, list[str]]]:
+    simulation_config = SimulationConfig.from_yaml("configs/jfk_to_lax")
+    for n_uavs in simulation_config.n_uavs_per_flyover_airport.values():
+        n_uavs.to_airport = n_uavs.from_airport = n_uavs_per_side
+    airliner, uavs = make_airplanes(simulation_config)
+    airplanes = [airliner] + [
+        uav for x in uavs.values() for xx in x.values() for uav in xx.values()
+    ]
+    return {
+        airplane.id: (repr(airplane.location), [repr(w) for w in airplane.waypoints])
+        for airplane in airplanes
+    }
+
+
+@pytest.mark.parametrize("n_uavs_per_side", [1, 3, 50])
+def test_waypoints_are_exactly_as_generated_point_by_point(
+    monkeypatch, n_uavs_per_side
+):
+    paths = _get_paths(n_uavs_per_side)
+    monkeypatch.setattr(
+        airplane_waypoints_generation,
+        "_intermediate_points_between",
+        _intermediate_points_between_one_by_one,
+    )
+    monkeypatch.setattr(
+        airplane_waypoints_generation, "_make_waypoints", _make_waypoints_row_by_row
+    )
+    assert _get_paths(n_uavs_per_side) == paths
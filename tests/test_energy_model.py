@@ -0,0 +1,30 @@
+import numpy as np
+
+from src.feasibility_study.modeling_objects import calculate_n_refuels_needed
+
+
+def test_n_refuels_needed_reaches_reserve_or_capacity():
+    n_refuels = calculate_n_refuels_needed(
+        energy_quantity_MJ=100.0,
+        next_leg_energy_MJ=250.0,
+        reserve_energy_thres_MJ=50.0,
+        energy_capacity_MJ=1000.0,
+        refueling_energy_MJ=100.0,
+    )
+    assert n_refuels == 2
+    # Limited by capacity:
+    assert calculate_n_refuels_needed(100.0, 2000.0, 50.0, 1000.0, 100.0) == 9
+    # No refuels if refuels deliver no energy:
+    assert calculate_n_refuels_needed(100.0, 250.0, 50.0, 1000.0, 0.0) == 0
+
+
+def test_n_refuels_needed_is_vectorized():
+    energy_quantities_MJ = np.array([100.0, 400.0, 950.0])
+    n_refuels = calculate_n_refuels_needed(
+        energy_quantities_MJ, 250.0, 50.0, 1000.0, 100.0
+    )
+    assert n_refuels.tolist() == [
+        calculate_n_refuels_needed(x, 250.0, 50.0, 1000.0, 100.0)
+        for x in energy_quantities_MJ
+    ]
+    assert n_refuels.tolist() == [2, 0, 0]
@@ -0,0 +1,99 @@
+import pytest
+
+from src.three_d_sim.flight_phases import (
+    get_durations_h_to_tags,
+    summarize_airliner_flight_path,
+    summarize_uav_flight_path,
+)
+from src.three_d_sim.make_airplanes import make_airplanes
+from src.three_d_sim.simulation import get_airliner_reference_times
+from src.three_d_sim.simulation_config_schema import SimulationConfig
+from src.utils.utils import timedelta_to_minutes
+
+# Tolerance on the minutes to tagged waypoints, which should agree up to rounding:
+_TOL_MINS = 1e-4
+
+
+@pytest.fixture(scope="module")
+def simulation_config() -> SimulationConfig:
+    return SimulationConfig.from_yaml("configs/jfk_to_lax")
+
+
+@pytest.fixture(scope="module")
+def airplanes(simulation_config):
+    return make_airplanes(simulation_config)
+
+
+@pytest.fixture(scope="module")
+def uav_fps(airplanes):
+    _, uavs = airplanes
+    return {
+        code: {
+            service_side: {uav_id: uav.flight_path for uav_id, uav in x.items()}
+            for service_side, x in xx.items()
+        }
+        for code, xx in uavs.items()
+    }
+
+
+def _get_minutes_to_tags(phases) -> dict[str, float]:
+    return {k: v * 60 for k, v in get_durations_h_to_tags(phases).items()}
+
+
+def _assert_minutes_match(analytic_mins: dict, waypoint_mins: dict) -> None:
+    common_tags = analytic_mins.keys() & waypoint_mins.keys()
+    assert common_tags
+    for tag in common_tags:
+        assert analytic_mins[tag] == pytest.approx(waypoint_mins[tag], abs=_TOL_MINS), (
+            tag
+        )
+
+
+def test_airliner_matches_reference_times(simulation_config, airplanes, uav_fps):
+    airliner, _ = airplanes
+    phases = summarize_airliner_flight_path(
+        airliner.flight_path,
+        uav_fps,
+        simulation_config.airliner_config.airplane_spec.energy_consumption_rate_MJ_per_km,
+    )
+    _assert_minutes_match(
+        _get_minutes_to_tags(phases), get_airliner_reference_times(airliner)
+    )
+
+
+def test_airliner_matches_waypoints(simulation_config, airplanes, uav_fps):
+    airliner, _ = airplanes
+    phases = summarize_airliner_flight_path(
+        airliner.flight_path,
+        uav_fps,
+        simulation_config.airliner_config.airplane_spec.energy_consumption_rate_MJ_per_km,
+    )
+    analytic_mins = _get_minutes_to_tags(phases)
+    waypoint_mins = {
+        k: timedelta_to_minutes(v)
+        for k, v in airliner.get_travel_durations_to_tagged_waypoints().items()
+    }
+    assert analytic_mins.keys() == waypoint_mins.keys()
+    _assert_minutes_match(analytic_mins, waypoint_mins)
+
+
+def test_uavs_match_waypoints(simulation_config, airplanes):
+    airliner, uavs = airplanes
+    for x in uavs.values():
+        for service_side_uavs in x.values():
+            for j, (uav_id, uav) in enumerate(service_side_uavs.items()):
+                phases = summarize_uav_flight_path(
+                    uav_id,
+                    j,
+                    len(service_side_uavs),
+                    uav.flight_path,
+                    airliner.flight_path,
+                    simulation_config.uavs_config.airplane_spec.energy_consumption_rate_MJ_per_km,
+                )
+                _assert_minutes_match(
+                    _get_minutes_to_tags(phases),
+                    {
+                        k: timedelta_to_minutes(v)
+                        for k, v in uav.get_travel_durations_to_tagged_waypoints().items()
+                    },
+                )
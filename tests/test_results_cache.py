@@ -0,0 +1,36 @@
+import pytest
+
+from src import specs
+from src.three_d_sim.parameter_sweep import get_run_id
+from src.three_d_sim.run_memo import get_config_key
+from src.three_d_sim.simulation_config_schema import SimulationConfig
+
+
+@pytest.fixture
+def simulation_config() -> SimulationConfig:
+    return SimulationConfig.from_yaml("configs/jfk_to_lax")
+
+
+@pytest.mark.parametrize(
+    "spec, attr",
+    [
+        (specs.Lh2FueledA320, "fuel_capacity_L"),
+        (specs.At200, "payload_volume_L"),
+    ],
+)
+def test_run_memo_key_changes_with_spec_values(
+    simulation_config, monkeypatch, spec, attr
+):
+    key = get_config_key(simulation_config)
+    monkeypatch.setattr(spec, attr, getattr(spec, attr) * 1.1)
+    assert get_config_key(simulation_config) != key
+
+
+def test_sweep_run_id_changes_with_spec_values(simulation_config, monkeypatch):
+    run_id = get_run_id(simulation_config, time_step_s=10)
+    monkeypatch.setattr(
+        specs.Lh2FueledA320,
+        "cruise_speed_kmph",
+        specs.Lh2FueledA320.cruise_speed_kmph + 1,
+    )
+    assert get_run_id(simulation_config, time_step_s=10) != run_id
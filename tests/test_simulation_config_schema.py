@@ -0,0 +1,55 @@
+import pydantic
+import pytest
+
+from src.three_d_sim.simulation_config_schema import (
+    Ratepoint,
+    compile_elapsed_mins,
+    evaluate_timepoints,
+)
+
+_REFERENCE_TIMES = {"x": 10.0, "Airliner_landed_point": 300.0}
+
+
+@pytest.mark.parametrize(
+    "elapsed_mins, expected",
+    [
+        ("x", 10.0),
+        ("x - 1.5", 8.5),
+        ("x+-1", 9.0),
+        ("x - -1", 11.0),
+        ("-3", -3.0),
+        (".5", 0.5),
+        ("1e2", 100.0),
+        ("3 - 1", 2.0),
+        (7, 7.0),
+    ],
+)
+def test_elapsed_mins_evaluate_as_expressions(elapsed_mins, expected):
+    # As the expressions used to be evaluated, with `eval`:
+    if isinstance(elapsed_mins, str):
+        assert eval(elapsed_mins, dict(_REFERENCE_TIMES)) == expected
+    timepoint = Ratepoint(elapsed_mins=elapsed_mins, time_step_s=1)
+    evaluate_timepoints([timepoint], _REFERENCE_TIMES)
+    assert timepoint.elapsed_mins == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("elapsed_mins", ["x*2", "x - 1 - 2"])
+def test_elapsed_mins_of_other_forms_are_rejected(elapsed_mins):
+    with pytest.raises(ValueError, match="is not of the form"):
+        compile_elapsed_mins(elapsed_mins)
+    # Upon loading the config:
+    with pytest.raises(pydantic.ValidationError):
+        Ratepoint(elapsed_mins=elapsed_mins, time_step_s=1)
+
+
+def test_unknown_variables_are_reported_with_close_matches():
+    timepoints = [
+        Ratepoint(elapsed_mins="x", time_step_s=1),
+        Ratepoint(elapsed_mins="landed_point + 5", time_step_s=1),
+    ]
+    with pytest.raises(ValueError) as exc_info:
+        evaluate_timepoints(timepoints, _REFERENCE_TIMES)
+    assert str(exc_info.value) == (
+        "Unknown variable(s) in `elapsed_mins`: 'landed_point' (timepoint 1), "
+        "did you mean 'Airliner_landed_point'?"
+    )
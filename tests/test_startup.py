@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules that are slow to import and only needed for visualization, plotting, or tables:
+_HEAVY_MODULES = ["cv2", "matplotlib", "pandas", "pyautogui", "vpython"]
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "src.modeling_objects",
+        "src.three_d_sim.make_airplanes",
+        "src.three_d_sim.simulation",
+    ],
+)
+def test_import_does_not_load_heavy_modules(module):
+    # In a fresh interpreter, as the test session itself may have imported them:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; "
+            f"print(*[m for m in {_HEAVY_MODULES!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == []